@@ -0,0 +1,125 @@
+"""
+Benchmark de TokenDB: lecturas y escrituras con lectores concurrentes.
+
+Uso:
+    python benchmarks/token_db_bench.py [--readers 8] [--seconds 5] [--journal wal|delete]
+
+Crea una base de datos temporal, lanza N hilos lectores (consulta de la cuenta
+activa, como /token) y un hilo escritor (update_tokens, como el refresh) y
+reporta throughput, latencias, errores "database is locked" y métricas del pool.
+"""
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.token_db import TokenDB  # noqa: E402
+
+ACCOUNTS = 50
+
+
+def seed(db: TokenDB) -> None:
+    expires = int(time.time()) + 3600
+    for i in range(ACCOUNTS):
+        db.save_user(
+            f"account_{i}",
+            {
+                "access_token": f"token_{i}",
+                "refresh_token": f"refresh_{i}",
+                "organization_id": f"org_{i}",
+                "api_domain": "https://www.zohoapis.com",
+                "region": "com",
+                "expires_at": expires,
+                "email": f"user{i}@example.com",
+                "company_name": f"Company {i}",
+            },
+        )
+    db.activate("account_0")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def run(readers: int, seconds: float, journal: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TokenDB(str(Path(tmp) / "bench.db"))
+        with db._pool.writer() as conn:
+            conn.execute(f"PRAGMA journal_mode = {journal}")
+        seed(db)
+
+        stop = threading.Event()
+        read_latencies, write_latencies = [], []
+        errors = {"read": 0, "write": 0}
+        lock = threading.Lock()
+
+        def reader():
+            local = []
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    db.get_account("account_0")
+                    local.append(time.perf_counter() - start)
+                except sqlite3.OperationalError:
+                    with lock:
+                        errors["read"] += 1
+            with lock:
+                read_latencies.extend(local)
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                expires = int(time.time()) + 3600
+                start = time.perf_counter()
+                try:
+                    db.update_tokens(f"account_{i % ACCOUNTS}", f"new_{i}", expires)
+                    write_latencies.append(time.perf_counter() - start)
+                except sqlite3.OperationalError:
+                    errors["write"] += 1
+                i += 1
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads.append(threading.Thread(target=writer))
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        pool = db.pool_stats()
+        db.close()
+
+    print(f"📊 journal={journal} readers={readers} seconds={seconds}")
+    for name, samples in (("reads", read_latencies), ("writes", write_latencies)):
+        print(
+            f"   {name:<6} {len(samples) / seconds:>10.0f}/s  "
+            f"p50={statistics.median(samples) * 1e6 if samples else 0:>8.1f}µs  "
+            f"p99={percentile(samples, 99) * 1e6:>8.1f}µs  "
+            f"errors={errors[name[:-1]]}"
+        )
+    for kind in ("reader", "writer"):
+        print(
+            f"   pool {kind:<6} checkouts={pool[kind]['checkouts']}  "
+            f"wait_avg={pool[kind]['wait_avg_ms']:.3f}ms  "
+            f"wait_max={pool[kind]['wait_max_ms']:.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--journal", choices=["wal", "delete"], default="wal")
+    args = parser.parse_args()
+
+    run(args.readers, args.seconds, args.journal)
@@ -17,6 +17,39 @@ class Config:
     # OAuth Server URL
     oauth_server_url = os.getenv("OAUTH_SERVER_URL", "http://localhost:8081")
 
+    # Origen de credenciales: "oauth" (HTTP /token), "sqlite" (TokenDB directa)
+    # o "redis" (TokenStore compartido entre réplicas)
+    credentials_source = os.getenv("CREDENTIALS_SOURCE", "oauth").lower()
+
+    # Índice de tools (JSON) que el servidor OAuth usa para /tools/docs
+    tool_index_path = Path(
+        os.getenv(
+            "TOOL_INDEX_PATH", str(project_root / "oauth_page" / "tool_index.json")
+        )
+    )
+
+    # Límites de la API de Zoho por organización (ver plan contratado)
+    zoho_rate_limit = int(os.getenv("ZOHO_RATE_LIMIT", "100"))  # peticiones/minuto
+    zoho_max_concurrency = int(os.getenv("ZOHO_MAX_CONCURRENCY", "5"))
+    # Tramos en paralelo al auto-paginar un rango date_start/date_end
+    scan_shards = int(os.getenv("SCAN_SHARDS", "4"))
+    # GET simultáneos de una tool get_*_batch (además del límite anterior)
+    batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "5"))
+    # Ventana (ms) para juntar GET por id concurrentes en una lectura masiva
+    lookup_window_ms = int(os.getenv("LOOKUP_WINDOW_MS", "5"))
+
+    # Compactación de respuestas: "off", "empty" (quita vacíos) o "defaults"
+    # (también false / 0 / "0.00")
+    compact_responses = os.getenv("COMPACT_RESPONSES", "off").lower()
+
+    # Presupuesto por resultado (tokens aprox.) y TTL del resto para fetch_more
+    result_max_tokens = int(os.getenv("RESULT_MAX_TOKENS", "25000"))
+    result_ttl = int(os.getenv("RESULT_TTL", "600"))
+
+    # "all": todas las tools en tools/list · "discovery": solo search_tools,
+    # describe_tool y call_tool (los schemas se piden bajo demanda)
+    tool_exposure = os.getenv("TOOL_EXPOSURE", "all").lower()
+
     # MCP Server Config
     mcp_host = os.getenv("MCP_HOST", "0.0.0.0")
     mcp_port = int(os.getenv("MCP_PORT", "8080"))
@@ -29,5 +62,6 @@ class Config:
 
         logger.info(f"✅ Config loaded:")
         logger.info(f"   OAuth Server: {cls.oauth_server_url}")
+        logger.info(f"   Credentials Source: {cls.credentials_source}")
         logger.info(f"   MCP Host: {cls.mcp_host}")
         logger.info(f"   MCP Port: {cls.mcp_port}")
@@ -1,13 +1,25 @@
+import asyncio
 import logging
 import os
 
 os.environ["FASTMCP_HOST"] = "0.0.0.0"
 os.environ["FASTMCP_PORT"] = "8080"
 
+from config import Config
 from fastmcp import FastMCP
 from fastmcp.experimental.server.openapi import MCPType, RouteMap
+from src.batch import batch_operations
+from src.compaction import Compactor, add_compaction_note
+from src.discovery import EXPOSURE_MODES, META_TOOLS, discovery_server
+from src.lookups import LookupBatcher, bulk_lookups
 from src.openapi_loader import load_and_process_openapi
+from src.operations import OperationIndex
+from src.pipeline import register_run_pipeline
+from src.rate_limiter import RateLimiter
+from src.result_budget import ResultBudget, ResultStore, register_fetch_more
+from src.tabular import table_views
 from src.token_service import get_credentials  # ← Cambiado
+from src.tool_index import ToolIndex
 from src.zoho_client import ZohoAsyncClient
 
 logging.basicConfig(
@@ -33,20 +45,45 @@ def build_mcp() -> FastMCP:
     logger.info(f"📧 Email: {credentials['email']}")
     logger.info(f"🌐 Region: {credentials['region']}")
 
+    # Cargar y procesar OpenAPI specs
+    tool_index = ToolIndex()
+    combined_spec = load_and_process_openapi(tool_index=tool_index)
+    # Con compactación, cada tool explica cómo leer su resultado (same_as)
+    combined_spec = add_compaction_note(combined_spec, Config.compact_responses)
+
+    # Resultados que superan el presupuesto: el resto queda para fetch_more
+    result_budget = ResultBudget(
+        ResultStore(ttl=Config.result_ttl), Config.result_max_tokens
+    )
+
     # Crear cliente con credenciales dinámicas
     client = ZohoAsyncClient(
         base_url=api_domain,  # ← Dinámico desde OAuth
         headers={"Authorization": f"Zoho-oauthtoken {access_token}"},
         params={"organization_id": organization_id},  # ← Dinámico desde OAuth
         timeout=30.0,
+        # Con TokenDB o Redis las credenciales se leen en cada request (memoria)
+        credentials_provider=(
+            get_credentials
+            if Config.credentials_source in ("sqlite", "redis")
+            else None
+        ),
+        rate_limiter=RateLimiter(Config.zoho_rate_limit, Config.zoho_max_concurrency),
+        scan_shards=Config.scan_shards,
+        operations=OperationIndex.from_spec(combined_spec),
+        compactor=Compactor(Config.compact_responses),
+        table_views=table_views(combined_spec),
+        result_budget=result_budget,
+        batches=batch_operations(combined_spec),
+        batch_concurrency=Config.batch_concurrency,
+        lookups=LookupBatcher(
+            bulk_lookups(combined_spec), window=Config.lookup_window_ms / 1000
+        ),
     )
 
     logger.info(f"🔗 API Domain: {api_domain}")
     logger.info(f"🏢 Org ID: {organization_id}")
 
-    # Cargar y procesar OpenAPI specs
-    combined_spec = load_and_process_openapi()
-
     # Crear servidor MCP
     mcp_server = FastMCP.from_openapi(
         openapi_spec=combined_spec,
@@ -57,6 +94,26 @@ def build_mcp() -> FastMCP:
         ],
         name="zoho-books-mcp",
     )
+    register_fetch_more(mcp_server, result_budget)
+    register_run_pipeline(mcp_server)
+
+    # Modo discovery: tools/list pequeño, schemas bajo demanda
+    if Config.tool_exposure not in EXPOSURE_MODES:
+        raise ValueError(
+            f"TOOL_EXPOSURE must be one of {EXPOSURE_MODES}, got {Config.tool_exposure!r}"
+        )
+    discovery = discovery_server(mcp_server)
+
+    # /tools/docs: tools del spec + las del servidor (meta-tools en cualquier modo)
+    tool_index.add_server_tools(asyncio.run(mcp_server.get_tools()).values(), "mcp")
+    tool_index.add_server_tools(
+        asyncio.run(discovery.get_tools()).values(), "discovery"
+    )
+    tool_index.write(Config.tool_index_path)
+
+    if Config.tool_exposure == "discovery":
+        logger.info(f"🔎 Discovery mode: exposing only {', '.join(META_TOOLS)}")
+        mcp_server = discovery
 
     logger.info("✅ MCP server ready")
     return mcp_server
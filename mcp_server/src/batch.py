@@ -0,0 +1,274 @@
+"""
+Variantes batch de las tools get_* (get_invoices_batch, get_contacts_batch...).
+
+Cada una recibe una lista de ids y hace los GET individuales en paralelo,
+con un límite de concurrencia por llamada y dentro del RateLimiter de la
+organización. El resultado junta los registros (en el orden de los ids) y
+los errores por id:
+
+    {"code": "0", "invoices": [{...}, ...], "errors": [{"id": "...", ...}]}
+
+Las operaciones batch se agregan al spec como paths sintéticos
+(/invoices/batch) marcados con x-batch-get; ZohoAsyncClient las intercepta
+y nunca llegan a Zoho como tales.
+"""
+
+import asyncio
+import copy
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from src.pagination import Progress, report_progress
+from src.tabular import output_format_param
+
+logger = logging.getLogger(__name__)
+
+IDS_PARAM = "ids"
+BATCH_EXTENSION = "x-batch-get"
+MAX_BATCH_IDS = 100
+META_KEYS = {"code", "message", "page_context"}
+# Parámetros del get_* que no tienen sentido al combinar (pdf/html)
+SKIPPED_PARAMS = {"print", "accept"}
+
+# id -> respuesta de Zoho para ese id
+FetchOne = Callable[[str], Awaitable[httpx.Response]]
+
+
+@dataclass(frozen=True)
+class BatchOperation:
+    path: str  # path del get_* (/invoices/{invoice_id})
+    id_param: str
+    key: str  # clave de la lista en el resultado (invoices)
+
+
+def _plural(name: str) -> str:
+    if name.endswith("y") and name[-2:-1] not in "aeiou":
+        return name[:-1] + "ies"
+    if name.endswith(("s", "x", "ch", "sh")):
+        return name + "es"
+    return name + "s"
+
+
+def _result_schema(operation: Dict, key: str) -> Dict:
+    """Schema del resultado: la lista de objetos del get_* + errores por id"""
+    content = operation.get("responses", {}).get("200", {}).get("content", {})
+    schema = content.get("application/json", {}).get("schema", {})
+    item = next(
+        (
+            prop
+            for name, prop in schema.get("properties", {}).items()
+            if name not in META_KEYS
+        ),
+        {"type": "object"},
+    )
+    return {
+        "type": "object",
+        "properties": {
+            "code": {"type": "string"},
+            "message": {"type": "string"},
+            key: {"type": "array", "items": item},
+            "errors": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "status": {"type": "integer"},
+                        "code": {"type": "string"},
+                        "message": {"type": "string"},
+                    },
+                },
+            },
+        },
+    }
+
+
+def add_batch_operations(spec: dict) -> dict:
+    """
+    Agrega get_<entidades>_batch por cada GET get_* cuyo path termina en un
+    id ({invoice_id}). Llamar DESPUÉS de filtrar con ALLOWED_TOOLS (solo se
+    generan para los get_* permitidos) y antes de quitar los schemas de
+    respuesta.
+    """
+    logger.info("📦 Adding batch get operations...")
+    paths = spec.get("paths", {})
+    added = 0
+
+    for path, path_item in list(paths.items()):
+        operation = path_item.get("get")
+        if not isinstance(operation, dict):
+            continue
+        operation_id = operation.get("operationId", "")
+        match = re.fullmatch(r"(.*)/\{([^}/]+)\}", path)
+        if not operation_id.startswith("get_") or match is None:
+            continue
+        prefix, id_param = match.groups()
+        batch_path = f"{prefix}/batch"
+        if batch_path in paths:
+            logger.warning(
+                f"⚠️ {batch_path} already exists, no batch for {operation_id}"
+            )
+            continue
+
+        key = _plural(operation_id[len("get_") :])
+        params = [
+            {
+                "name": IDS_PARAM,
+                "in": "query",
+                "required": True,
+                "description": (
+                    f"Ids of the records to fetch (`{id_param}` of {operation_id}), "
+                    f"at most {MAX_BATCH_IDS}."
+                ),
+                "schema": {"type": "array", "items": {"type": "string"}},
+            }
+        ]
+        params += [
+            copy.deepcopy(param)
+            for param in operation.get("parameters", [])
+            if param.get("in") == "query" and param.get("name") not in SKIPPED_PARAMS
+        ]
+        params.append(output_format_param())
+
+        paths[batch_path] = {
+            # Parámetros compartidos del path original, salvo el id
+            "parameters": [
+                copy.deepcopy(param)
+                for param in path_item.get("parameters", [])
+                if param.get("name") != id_param
+                and not param.get("$ref", "").endswith(f"/{id_param}")
+            ],
+            "get": {
+                "tags": operation.get("tags", []),
+                "operationId": f"get_{key}_batch",
+                "summary": f"{operation.get('summary', operation_id)} (batch)",
+                "description": (
+                    f"Fetch several records of {operation_id} in one call: the "
+                    f"requests run in parallel and the result lists the `{key}` "
+                    "found (in the order of `ids`) plus an `errors` entry for "
+                    "each id that failed."
+                ),
+                "parameters": params,
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {
+                            "application/json": {
+                                "schema": _result_schema(operation, key)
+                            }
+                        },
+                    }
+                },
+                **(
+                    {"security": operation["security"]}
+                    if "security" in operation
+                    else {}
+                ),
+                BATCH_EXTENSION: {"path": path, "id_param": id_param, "key": key},
+            },
+        }
+        added += 1
+
+    logger.info(f"✅ {added} batch get operations added")
+    return spec
+
+
+def batch_operations(spec: dict) -> Dict[str, BatchOperation]:
+    """path batch -> BatchOperation (desde x-batch-get)"""
+    return {
+        path: BatchOperation(**path_item["get"][BATCH_EXTENSION])
+        for path, path_item in spec.get("paths", {}).items()
+        if isinstance(path_item.get("get"), dict)
+        and BATCH_EXTENSION in path_item["get"]
+    }
+
+
+def parse_ids(value: Any) -> List[str]:
+    """Lista (o texto separado por comas) de ids, sin vacíos ni repetidos"""
+    if value in (None, ""):
+        value = []
+    elif isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"{IDS_PARAM} must be a list of ids")
+    ids = list(dict.fromkeys(str(item).strip() for item in value))
+    ids = [item for item in ids if item]
+    if not ids:
+        raise ValueError(f"{IDS_PARAM} must list at least one id")
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"{IDS_PARAM} accepts at most {MAX_BATCH_IDS} ids")
+    return ids
+
+
+def _record(response: httpx.Response) -> Tuple[Optional[Any], Optional[Dict]]:
+    """(objeto principal, error) de la respuesta de un get_*"""
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = None
+    if response.is_success and isinstance(payload, dict):
+        records = [v for k, v in payload.items() if k not in META_KEYS]
+        if len(records) == 1:
+            return records[0], None
+        return {k: v for k, v in payload.items() if k not in META_KEYS}, None
+
+    error = {"status": response.status_code}
+    if isinstance(payload, dict):
+        error["code"] = str(payload.get("code", ""))
+        error["message"] = payload.get("message", "")
+    else:
+        error["message"] = response.reason_phrase
+    return None, error
+
+
+async def fetch_batch(
+    fetch_one: FetchOne,
+    ids: List[str],
+    key: str,
+    request: httpx.Request,
+    concurrency: int = 5,
+    progress: Optional[Progress] = report_progress,
+) -> httpx.Response:
+    """
+    Hace los GET de `ids` en paralelo (como mucho `concurrency` a la vez) y
+    devuelve una respuesta (para `request`, la llamada batch) con los
+    registros y los errores por id. Un id que falla no cancela los demás.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    done = 0
+
+    async def fetch(record_id: str) -> Tuple[Optional[Any], Optional[Dict]]:
+        nonlocal done
+        async with semaphore:
+            try:
+                record, error = _record(await fetch_one(record_id))
+            except httpx.HTTPError as e:
+                record, error = None, {"message": f"{type(e).__name__}: {e}"}
+        done += 1
+        if progress is not None:
+            await progress(done, len(ids), f"{done}/{len(ids)} {key}")
+        return record, error
+
+    results = await asyncio.gather(*(fetch(record_id) for record_id in ids))
+
+    records = [record for record, error in results if error is None]
+    errors = [
+        {"id": record_id, **error}
+        for record_id, (record, error) in zip(ids, results)
+        if error is not None
+    ]
+    logger.info(f"📦 Batch {key}: {len(records)} fetched, {len(errors)} failed")
+    return httpx.Response(
+        200,
+        json={
+            "code": 0,
+            "message": f"{len(records)} of {len(ids)} {key} fetched",
+            key: records,
+            "errors": errors,
+        },
+        headers={"content-type": "application/json"},
+        request=request,
+    )
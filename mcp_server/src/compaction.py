@@ -0,0 +1,149 @@
+"""
+Compactación de respuestas de Zoho antes de enviarlas al modelo.
+
+Una sola pasada recursiva que:
+  - quita los valores vacíos ("", null, [], {}) y, en modo "defaults",
+    también los valores por defecto (false, 0, "0.00")
+  - colapsa estructuras anidadas repetidas dentro del mismo objeto (p. ej.
+    shipping_address idéntica a billing_address) en {"same_as": "<clave>"}
+
+Las claves de control (code, message, page_context) no se tocan. Con la
+compactación activa, add_compaction_note explica en cada tool cómo leer
+el resultado (en especial cómo expandir `same_as`).
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from src.operations import HTTP_METHODS
+
+logger = logging.getLogger(__name__)
+
+# off: sin cambios · empty: vacíos · defaults: vacíos + valores por defecto
+MODES = ("off", "empty", "defaults")
+META_KEYS = {"code", "message", "page_context"}
+DEFAULT_STRINGS = {"0", "0.0", "0.00", "0.000"}
+
+COMPACTION_NOTES = {
+    "empty": 'Empty values ("", null, [], {}) are omitted.',
+    "defaults": (
+        'Empty values ("", null, [], {}) and defaults (false, 0, "0.00") '
+        "are omitted."
+    ),
+}
+SAME_AS_NOTE = (
+    "A nested object or list equal to another field of the same record is "
+    'returned as {"same_as": "<field>"}: use the value of <field> instead.'
+)
+
+
+def add_compaction_note(spec: dict, mode: str) -> dict:
+    """
+    Agrega a la descripción de cada operación cómo viene compactado el
+    resultado JSON (campos omitidos y marcadores same_as), para que el
+    cliente sepa expandirlo. Sin cambios con mode=off.
+    """
+    if mode not in COMPACTION_NOTES:
+        return spec
+    note = f"{COMPACTION_NOTES[mode]} {SAME_AS_NOTE}"
+    for path_item in spec.get("paths", {}).values():
+        for method, operation in path_item.items():
+            if method.lower() not in HTTP_METHODS or not isinstance(operation, dict):
+                continue
+            description = (
+                operation.get("description") or operation.get("summary", "")
+            ).rstrip()
+            operation["description"] = (
+                f"{description}\n\nResult (JSON): {note}" if description else note
+            )
+    logger.info(f"🗜️ Compaction ({mode}) documented in every tool description")
+    return spec
+
+
+class Compactor:
+    def __init__(self, mode: str = "off"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown compaction mode {mode!r}, use one of {MODES}")
+        self.mode = mode
+        # tool -> {"calls", "bytes_in", "bytes_out"}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _drop(self, value: Any) -> bool:
+        if value is None or value == "":
+            return True
+        if isinstance(value, (dict, list)):
+            return not value
+        if self.mode == "defaults":
+            if value is False:
+                return True
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value == 0
+            return isinstance(value, str) and value in DEFAULT_STRINGS
+        return False
+
+    def _walk(self, value: Any) -> Tuple[Any, Hashable]:
+        """Devuelve (valor compactado, huella hashable para detectar repetidos)"""
+        if isinstance(value, dict):
+            compacted = {}
+            fingerprint = []
+            seen: Dict[Hashable, str] = {}
+            for key, item in value.items():
+                item, item_print = self._walk(item)
+                if self._drop(item):
+                    continue
+                if isinstance(item, (dict, list)) and len(item) > 1:
+                    first = seen.get(item_print)
+                    if first is not None:
+                        item = {"same_as": first}
+                        item_print = ("same_as", first)
+                    else:
+                        seen[item_print] = key
+                compacted[key] = item
+                fingerprint.append((key, item_print))
+            return compacted, ("d", tuple(fingerprint))
+
+        if isinstance(value, list):
+            items = [self._walk(item) for item in value]
+            return [item for item, _ in items], ("l", tuple(p for _, p in items))
+
+        return value, (type(value).__name__, value)
+
+    def compact(self, payload: Any) -> Any:
+        if not self.enabled or not isinstance(payload, dict):
+            return payload
+        return {
+            key: value if key in META_KEYS else self._walk(value)[0]
+            for key, value in payload.items()
+        }
+
+    def record(self, tool: Optional[str], bytes_in: int, bytes_out: int) -> None:
+        """Acumula y registra los bytes ahorrados por tool"""
+        tool = tool or "unknown"
+        with self._lock:
+            stats = self._stats.setdefault(
+                tool, {"calls": 0, "bytes_in": 0, "bytes_out": 0}
+            )
+            stats["calls"] += 1
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+            saved_total = stats["bytes_in"] - stats["bytes_out"]
+
+        saved = bytes_in - bytes_out
+        percent = 100 * saved / bytes_in if bytes_in else 0
+        logger.info(
+            f"🗜️ {tool}: {bytes_in} → {bytes_out} bytes (-{percent:.0f}%), "
+            f"{saved_total} saved in {stats['calls']} call(s)"
+        )
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                tool: {**stats, "bytes_saved": stats["bytes_in"] - stats["bytes_out"]}
+                for tool, stats in self._stats.items()
+            }
@@ -0,0 +1,255 @@
+"""
+Modo de exposición "discovery" (TOOL_EXPOSURE=discovery).
+
+En vez de anunciar las ~110 tools con sus schemas completos en tools/list,
+el servidor anuncia solo tres meta-tools:
+
+    search_tools   búsqueda BM25 sobre nombre, tag, descripción y parámetros
+    describe_tool  schema de entrada de las tools elegidas
+    call_tool      ejecuta cualquier tool del catálogo
+
+Las tools reales siguen en el servidor interno (el de from_openapi) y se
+llaman directamente; el coste de arrancar una sesión ya no depende del
+tamaño del catálogo.
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from fastmcp import FastMCP
+from src.pipeline import structured_result
+
+logger = logging.getLogger(__name__)
+
+EXPOSURE_MODES = ("all", "discovery")
+META_TOOLS = ("search_tools", "describe_tool", "call_tool")
+MAX_RESULTS = 25
+MAX_DESCRIBE = 10
+# BM25F: cada campo se normaliza por su longitud media y pesa distinto
+K1 = 1.2
+FIELDS = {  # campo -> (peso, b)
+    "name": (3.0, 0.5),
+    "tag": (2.0, 0.0),
+    "description": (1.0, 0.75),
+    "params": (0.5, 0.75),
+}
+# Parámetros presentes en más de esta fracción de tools (fields,
+# max_result_tokens...): solo se indexa el nombre, no su descripción
+COMMON_PARAM_SHARE = 0.25
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "the", "this", "to", "with",
+}  # fmt: skip
+
+
+def tokenize(text: str) -> List[str]:
+    """Minúsculas, separa por no alfanuméricos y `_`, singular ingenuo"""
+    tokens = []
+    for token in re.split(r"[^a-z0-9]+", text.lower()):
+        if not token or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _own_description(description: Optional[str]) -> str:
+    """
+    Descripción sin las secciones que FastMCP agrega a las tools OpenAPI
+    (**Query Parameters:**, **Responses:**...): los parámetros se indexan
+    aparte y los compartidos repetirían el mismo texto en todas las tools.
+    """
+    return re.split(r"\n\s*\n\*\*", description or "", maxsplit=1)[0]
+
+
+def _summary(description: str) -> str:
+    text = " ".join(description.split())
+    return text.split(". ")[0].rstrip(".")
+
+
+@dataclass
+class _Document:
+    name: str
+    tag: str
+    summary: str
+    fields: Dict[str, Counter]
+
+
+class ToolSearchIndex:
+    """Índice BM25F en memoria de las tools de un servidor FastMCP"""
+
+    def __init__(self, tools: Dict[str, Any]):
+        properties = {
+            name: (tool.parameters or {}).get("properties", {})
+            for name, tool in tools.items()
+        }
+        usage = Counter(param for props in properties.values() for param in props)
+        common = {
+            param
+            for param, count in usage.items()
+            if count > COMMON_PARAM_SHARE * len(tools)
+        }
+
+        self._documents: List[_Document] = []
+        for name, tool in sorted(tools.items()):
+            tag = sorted(tool.tags)[0] if tool.tags else "other"
+            params = " ".join(
+                param if param in common else f"{param} {schema.get('description', '')}"
+                for param, schema in properties[name].items()
+            )
+            description = _own_description(tool.description)
+            texts = {
+                "name": name,
+                "tag": tag,
+                "description": description,
+                "params": params,
+            }
+            self._documents.append(
+                _Document(
+                    name,
+                    tag,
+                    _summary(description),
+                    {field: Counter(tokenize(text)) for field, text in texts.items()},
+                )
+            )
+
+        total = len(self._documents) or 1
+        self._average = {
+            field: max(
+                1.0,
+                sum(sum(doc.fields[field].values()) for doc in self._documents) / total,
+            )
+            for field in FIELDS
+        }
+        frequency: Counter = Counter()
+        for doc in self._documents:
+            frequency.update(set().union(*doc.fields.values()))
+        self._idf = {
+            term: math.log(1 + (total - count + 0.5) / (count + 0.5))
+            for term, count in frequency.items()
+        }
+        logger.info(
+            f"🔎 Tool search index: {len(self._documents)} tools, "
+            f"{len(self._idf)} terms"
+        )
+
+    @property
+    def tags(self) -> List[str]:
+        return sorted({doc.tag for doc in self._documents})
+
+    def _score(self, doc: _Document, query: List[str]) -> float:
+        lengths = {field: sum(terms.values()) for field, terms in doc.fields.items()}
+        score = 0.0
+        for term in query:
+            weighted = 0.0
+            for field, (weight, b) in FIELDS.items():
+                frequency = doc.fields[field].get(term)
+                if frequency:
+                    norm = 1 - b + b * lengths[field] / self._average[field]
+                    weighted += weight * frequency / norm
+            if weighted:
+                score += self._idf[term] * weighted / (K1 + weighted)
+        return score
+
+    def search(
+        self, query: str, limit: int = 10, tag: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        terms = tokenize(query)
+        if not terms and not tag:
+            raise ValueError("query must contain at least one word")
+        results = []
+        for doc in self._documents:
+            if tag and doc.tag != tag:
+                continue
+            score = self._score(doc, terms) if terms else 1.0
+            if score > 0:
+                results.append((score, doc))
+        results.sort(key=lambda item: (-item[0], item[1].name))
+        return [
+            {
+                "name": doc.name,
+                "tag": doc.tag,
+                "summary": doc.summary,
+                "score": round(score, 2),
+            }
+            for score, doc in results[: max(1, min(limit, MAX_RESULTS))]
+        ]
+
+
+def discovery_server(inner: FastMCP) -> FastMCP:
+    """
+    Servidor que anuncia solo search_tools / describe_tool / call_tool y
+    delega en las tools de `inner`.
+    """
+    mcp = FastMCP(name=inner.name)
+    index: List[ToolSearchIndex] = []  # se construye en la primera búsqueda
+
+    async def get_index() -> ToolSearchIndex:
+        if not index:
+            index.append(ToolSearchIndex(await inner.get_tools()))
+        return index[0]
+
+    @mcp.tool(
+        name="search_tools",
+        description=(
+            "Search the Zoho Books tool catalog by keywords (e.g. `overdue "
+            "invoices`, `create contact`). Returns the best matching tool names "
+            "with a one-line summary; use describe_tool for their parameters "
+            "and call_tool to run them. `tag` restricts the search to one area "
+            "(invoices, contacts, bills...)."
+        ),
+    )
+    async def search_tools(
+        query: str, limit: int = 10, tag: Optional[str] = None
+    ) -> Dict:
+        search_index = await get_index()
+        results = search_index.search(query, limit, tag)
+        return {"tools": results, "tags": search_index.tags}
+
+    @mcp.tool(
+        name="describe_tool",
+        description=(
+            "Full description and input schema of one or more tools found with "
+            "search_tools."
+        ),
+    )
+    async def describe_tool(names: List[str]) -> Dict:
+        if not names or len(names) > MAX_DESCRIBE:
+            raise ValueError(f"names must list between 1 and {MAX_DESCRIBE} tools")
+        tools = await inner.get_tools()
+        unknown = [name for name in names if name not in tools]
+        if unknown:
+            raise ValueError(f"Unknown tools: {unknown}. Use search_tools first")
+        return {
+            "tools": [
+                {
+                    "name": name,
+                    "tags": sorted(tools[name].tags),
+                    "description": tools[name].description,
+                    "input_schema": tools[name].parameters,
+                }
+                for name in dict.fromkeys(names)
+            ]
+        }
+
+    @mcp.tool(
+        name="call_tool",
+        description=(
+            "Run a tool of the catalog with its arguments (as described by "
+            "describe_tool) and return its result."
+        ),
+    )
+    async def call_tool(name: str, arguments: Optional[Dict[str, Any]] = None) -> Dict:
+        tools = await inner.get_tools()
+        if name not in tools:
+            raise ValueError(f"Unknown tool {name!r}. Use search_tools first")
+        logger.info(f"🔧 call_tool → {name}")
+        result = structured_result(await tools[name].run(arguments or {}))
+        return result if isinstance(result, dict) else {"result": result}
+
+    return mcp
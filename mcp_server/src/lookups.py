@@ -0,0 +1,318 @@
+"""
+Agrupación de lecturas puntuales (estilo DataLoader).
+
+Los GET de un registro por id (get_item...) que llegan casi a la vez para la
+misma organización se juntan durante una ventana de pocos milisegundos y,
+si el spec tiene un endpoint de lectura masiva para esa entidad
+(/itemdetails?item_ids=1,2,3), se resuelven con una sola petición y se
+reparten a cada llamada como si fuera su propio get_*. Los ids que no
+vuelven en la respuesta masiva, o las entidades sin endpoint masivo, siguen
+con el GET individual de siempre.
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Pattern, Set, Tuple
+from urllib.parse import unquote
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_EXTENSION = "x-bulk-lookup"
+META_KEYS = {"code", "message", "page_context"}
+# Ids por petición masiva (van en la query string)
+MAX_LOOKUP_IDS = 50
+
+# ids -> respuesta masiva de Zoho · el GET individual de una llamada
+FetchMany = Callable[[List[str]], Awaitable[httpx.Response]]
+FetchOne = Callable[[], Awaitable[httpx.Response]]
+# Llamada en espera: su future y su propio GET individual (con sus kwargs)
+Waiter = Tuple[asyncio.Future, FetchOne]
+
+
+@dataclass(frozen=True)
+class BulkLookup:
+    path: str  # path del get_* (/items/{item_id})
+    id_param: str  # item_id
+    list_path: str  # endpoint masivo (/itemdetails)
+    ids_param: str  # item_ids
+    object_key: str  # clave del registro en la respuesta del get_* (item)
+
+
+def _query_params(path_item: Dict, operation: Dict) -> Dict[str, Dict]:
+    params = path_item.get("parameters", []) + operation.get("parameters", [])
+    return {
+        param["name"]: param
+        for param in params
+        if param.get("in") == "query" and "name" in param
+    }
+
+
+def _object_key(operation: Dict, id_param: str) -> str:
+    """Clave del objeto en la respuesta 200 del get_* (o el id sin `_id`)"""
+    content = operation.get("responses", {}).get("200", {}).get("content", {})
+    schema = content.get("application/json", {}).get("schema", {})
+    keys = [
+        name
+        for name, prop in schema.get("properties", {}).items()
+        if name not in META_KEYS and prop.get("type") == "object"
+    ]
+    if len(keys) == 1:
+        return keys[0]
+    return id_param[: -len("_id")] if id_param.endswith("_id") else id_param
+
+
+def add_bulk_lookups(spec: dict) -> dict:
+    """
+    Marca con x-bulk-lookup los get_* que tienen endpoint de lectura masiva:
+    un GET sin parámetros de path con un parámetro OBLIGATORIO `<id>s`
+    (item_ids para item_id). Si es opcional es solo un filtro de un listado
+    (p. ej. salesorder_ids), cuyos registros son resúmenes, y no se usa.
+    Llamar después de filtrar con ALLOWED_TOOLS y antes de quitar los
+    schemas de respuesta.
+    """
+    logger.info("🧺 Looking for bulk lookup endpoints...")
+    paths = spec.get("paths", {})
+
+    bulk: Dict[str, str] = {}  # ids_param -> list_path
+    for path, path_item in paths.items():
+        operation = path_item.get("get")
+        if not isinstance(operation, dict) or "{" in path:
+            continue
+        for name, param in _query_params(path_item, operation).items():
+            if name.endswith("_ids") and param.get("required"):
+                bulk.setdefault(name, path)
+
+    added = 0
+    for path, path_item in paths.items():
+        operation = path_item.get("get")
+        match = re.fullmatch(r".*/\{([^}/]+)\}", path)
+        if not isinstance(operation, dict) or match is None:
+            continue
+        if not operation.get("operationId", "").startswith("get_"):
+            continue
+        id_param = match.group(1)
+        list_path = bulk.get(f"{id_param}s")
+        if list_path is None:
+            continue
+        operation[LOOKUP_EXTENSION] = {
+            "list_path": list_path,
+            "ids_param": f"{id_param}s",
+            "object_key": _object_key(operation, id_param),
+        }
+        added += 1
+        logger.info(f"   🧺 {operation['operationId']} → {list_path}")
+
+    logger.info(f"✅ {added} get tools can use bulk lookups")
+    return spec
+
+
+def bulk_lookups(spec: dict) -> List[BulkLookup]:
+    """BulkLookup de cada get_* marcado con x-bulk-lookup"""
+    lookups = []
+    for path, path_item in spec.get("paths", {}).items():
+        operation = path_item.get("get")
+        if isinstance(operation, dict) and LOOKUP_EXTENSION in operation:
+            id_param = re.fullmatch(r".*/\{([^}/]+)\}", path).group(1)
+            lookups.append(BulkLookup(path, id_param, **operation[LOOKUP_EXTENSION]))
+    return lookups
+
+
+def _copy(response: httpx.Response) -> httpx.Response:
+    """Cada llamada recibe su propia respuesta (el cliente la modifica)"""
+    return httpx.Response(
+        response.status_code,
+        headers=response.headers,
+        content=response.content,
+        request=response.request,
+    )
+
+
+class LookupBatcher:
+    """
+    Junta los GET por id concurrentes de cada (entidad, organización) durante
+    `window` segundos y los resuelve con una petición masiva. Se usa desde el
+    event loop.
+    """
+
+    def __init__(
+        self,
+        lookups: List[BulkLookup],
+        window: float = 0.005,
+        max_batch: int = MAX_LOOKUP_IDS,
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self._routes: List[Tuple[Pattern, BulkLookup]] = [
+            (self._compile(lookup.path), lookup) for lookup in lookups
+        ]
+        # (list_path, organización) -> id -> llamadas en espera
+        self._pending: Dict[Tuple[str, str], Dict[str, List[Waiter]]] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _compile(path: str) -> Pattern:
+        pattern = re.sub(r"\\\{[^}]+\\\}", "([^/]+)", re.escape(path.rstrip("/")))
+        return re.compile(f"^{pattern}/?$")
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and bool(self._routes)
+
+    def match(self, url: str) -> Optional[Tuple[BulkLookup, str]]:
+        """(lookup, id) si `url` es el GET de un registro con lectura masiva"""
+        for pattern, lookup in self._routes:
+            found = pattern.match(url.split("?", 1)[0])
+            if found:
+                return lookup, unquote(found.group(1))
+        return None
+
+    async def load(
+        self,
+        lookup: BulkLookup,
+        organization_id: str,
+        record_id: str,
+        request: httpx.Request,
+        fetch_many: FetchMany,
+        fetch_one: FetchOne,
+    ) -> httpx.Response:
+        """
+        Respuesta del GET de `record_id` (`request`), resuelta junto con las
+        demás lecturas de la misma entidad y organización de la ventana.
+        `fetch_one` es el GET individual de esta llamada, por si el id no
+        vuelve en la lectura masiva.
+        """
+        group = (lookup.list_path, organization_id)
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.get(group)
+        if pending is None:
+            pending = self._pending[group] = {}
+            self._timers[group] = asyncio.get_running_loop().call_later(
+                self.window, self._dispatch, group, lookup, fetch_many
+            )
+        pending.setdefault(record_id, []).append((future, fetch_one))
+        if len(pending) >= self.max_batch:
+            self._dispatch(group, lookup, fetch_many)
+
+        response = await future
+        if response._request is None:
+            response.request = request
+        return response
+
+    def _dispatch(
+        self, group: Tuple[str, str], lookup: BulkLookup, fetch_many: FetchMany
+    ) -> None:
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(group, None)
+        if pending:
+            task = asyncio.ensure_future(self._resolve(lookup, pending, fetch_many))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(
+        self,
+        lookup: BulkLookup,
+        pending: Dict[str, List[Waiter]],
+        fetch_many: FetchMany,
+    ) -> None:
+        """
+        Resuelve todas las llamadas del grupo. Corre en una tarea aparte: pase
+        lo que pase (error inesperado, cancelación) ningún future queda sin
+        resolver, si no la llamada esperaría para siempre.
+        """
+        error: Optional[BaseException] = None
+        try:
+            found: Dict[str, Any] = {}
+            if len(pending) > 1:
+                found = await self._fetch_many(lookup, list(pending), fetch_many)
+
+            missing = [record_id for record_id in pending if record_id not in found]
+            for record_id, record in found.items():
+                for future, _ in pending[record_id]:
+                    if not future.done():
+                        future.set_result(
+                            httpx.Response(
+                                200,
+                                json={
+                                    "code": 0,
+                                    "message": "success",
+                                    lookup.object_key: record,
+                                },
+                                headers={"content-type": "application/json"},
+                            )
+                        )
+            await asyncio.gather(
+                *(self._fetch_one(pending[record_id]) for record_id in missing)
+            )
+        except BaseException as e:
+            error = e
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"❌ Lookup of {lookup.path} failed: {e}")
+        finally:
+            for future, _ in (w for waiters in pending.values() for w in waiters):
+                if future.done():
+                    continue
+                if error is None or isinstance(error, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+
+    async def _fetch_many(
+        self, lookup: BulkLookup, ids: List[str], fetch_many: FetchMany
+    ) -> Dict[str, Any]:
+        """id -> registro de la respuesta masiva ({} si falla)"""
+        try:
+            response = await fetch_many(ids)
+            payload = response.json() if response.is_success else None
+        except Exception as e:
+            logger.warning(f"⚠️ Bulk lookup {lookup.list_path} failed: {e}")
+            return {}
+        if not isinstance(payload, dict):
+            logger.warning(
+                f"⚠️ Bulk lookup {lookup.list_path} returned {response.status_code}, "
+                "falling back to single GETs"
+            )
+            return {}
+
+        wanted = set(ids)
+        found = {}
+        for key, records in payload.items():
+            if key in META_KEYS or not isinstance(records, list):
+                continue
+            for record in records:
+                if isinstance(record, dict):
+                    record_id = str(record.get(lookup.id_param, ""))
+                    if record_id in wanted:
+                        found[record_id] = record
+        logger.info(
+            f"🧺 {len(ids)} lookups of {lookup.path} served by 1 request to "
+            f"{lookup.list_path} ({len(ids) - len(found)} not found, fetched one by one)"
+        )
+        return found
+
+    @staticmethod
+    async def _fetch_one(waiters: List[Waiter]) -> None:
+        """
+        GET individual de un id con la petición de la primera llamada que lo
+        pidió (la misma URL); la respuesta se comparte con las demás.
+        """
+        futures = [future for future, _ in waiters]
+        try:
+            response = await waiters[0][1]()
+        except BaseException as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for future in futures:
+            if not future.done():
+                future.set_result(_copy(response))
@@ -1,9 +1,12 @@
 import glob
 import logging
 import os
+from typing import Optional
 
 import yaml
+from src.batch import add_batch_operations
 from src.constants import ALLOWED_TOOLS
+from src.lookups import add_bulk_lookups
 from src.openapi_utils import (
     add_missing_request_schemas,
     filter_openapi_paths,
@@ -11,6 +14,12 @@ from src.openapi_utils import (
     fix_parameter_schemas,
     remove_all_refs_from_schemas,
 )
+from src.pagination import add_auto_pagination_params
+from src.projection import add_fields_param
+from src.result_budget import add_result_budget_param
+from src.scan import add_date_range_params
+from src.tabular import add_table_output_params
+from src.tool_index import ToolIndex
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +39,11 @@ def remove_response_schemas(spec):
     return spec
 
 
-def load_and_process_openapi():
-    """Carga todos los YAML de OpenAPI, los mergea y aplica la pipeline de procesamiento"""
+def load_and_process_openapi(tool_index: Optional[ToolIndex] = None):
+    """
+    Carga todos los YAML de OpenAPI, los mergea y aplica la pipeline de procesamiento.
+    Con tool_index también agrega al índice de tools (docs) las tools del spec.
+    """
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     OPENAPI_DIR = os.path.join(BASE_DIR, "../openapi-all")
 
@@ -102,8 +114,20 @@ def load_and_process_openapi():
     combined_spec = fix_missing_parameters(combined_spec)
     combined_spec = add_missing_request_schemas(combined_spec)
     combined_spec = remove_all_refs_from_schemas(combined_spec)
+    combined_spec = add_auto_pagination_params(combined_spec)
+    combined_spec = add_date_range_params(combined_spec)
+    combined_spec = add_fields_param(combined_spec)
+    combined_spec = add_table_output_params(combined_spec)
+    combined_spec = add_result_budget_param(combined_spec)
     combined_spec = fix_parameter_schemas(combined_spec)
     combined_spec = filter_openapi_paths(combined_spec, ALLOWED_TOOLS)
+    combined_spec = add_batch_operations(combined_spec)
+    combined_spec = add_bulk_lookups(combined_spec)
+
+    # El índice de tools necesita los schemas de respuesta: antes de quitarlos
+    if tool_index is not None:
+        tool_index.add_spec(combined_spec)
+
     combined_spec = remove_response_schemas(combined_spec)
 
     logger.info(f"Filtered paths: {len(combined_spec['paths'])}")
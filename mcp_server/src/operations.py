@@ -0,0 +1,58 @@
+"""
+Índice (método, path) -> operationId del spec procesado.
+
+ZohoAsyncClient solo recibe la URL de cada petición: con este índice sabe
+qué tool la hizo (métricas de compactación por tool). HTTP_METHODS es la
+lista de métodos de operación que usan los módulos que recorren el spec.
+"""
+
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+
+class OperationIndex:
+    """
+    Resuelve (método, path ya sustituido) -> operationId, es decir, el nombre
+    de la tool que hizo la petición. FastMCP solo le pasa al cliente la URL.
+    """
+
+    def __init__(self, routes: List[Tuple[str, str, str]]):
+        # Paths literales primero: /invoices/templates antes que /invoices/{id}
+        routes = sorted(routes, key=lambda route: route[1].count("{"))
+        self._routes: List[Tuple[str, Pattern, str]] = [
+            (method.upper(), self._compile(path), operation_id)
+            for method, path, operation_id in routes
+        ]
+        self._cache: Dict[Tuple[str, str], Optional[str]] = {}
+
+    @staticmethod
+    def _compile(path: str) -> Pattern:
+        pattern = re.sub(r"\\\{[^}]+\\\}", "[^/]+", re.escape(path.rstrip("/")))
+        return re.compile(f"^{pattern}/?$")
+
+    @classmethod
+    def from_spec(cls, spec: dict) -> "OperationIndex":
+        routes = []
+        for path, path_item in spec.get("paths", {}).items():
+            for method, operation in path_item.items():
+                if method.lower() in HTTP_METHODS and isinstance(operation, dict):
+                    if operation.get("operationId"):
+                        routes.append((method, path, operation["operationId"]))
+        return cls(routes)
+
+    def resolve(self, method: str, path: str) -> Optional[str]:
+        key = (method.upper(), path.split("?", 1)[0])
+        if key not in self._cache:
+            self._cache[key] = next(
+                (
+                    operation_id
+                    for route_method, pattern, operation_id in self._routes
+                    if route_method == key[0] and pattern.match(key[1])
+                ),
+                None,
+            )
+            if len(self._cache) > 4096:
+                self._cache.clear()
+        return self._cache[key]
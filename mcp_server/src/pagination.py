@@ -0,0 +1,479 @@
+"""
+Auto-paginación de las tools list_* (opt-in).
+
+Con `auto_paginate=true` el servidor recorre las páginas de Zoho en una sola
+llamada a la tool, hasta `max_records` registros o `max_bytes` de JSON, y
+devuelve un resultado combinado con un cursor para continuar. El progreso se
+informa con notificaciones MCP de progreso.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field, replace
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Parámetros que se agregan al spec y que nunca llegan a Zoho
+PAGINATION_PARAMS = ("auto_paginate", "max_records", "max_bytes", "cursor")
+
+# Zoho no acepta más de 200 registros por página
+MAX_PER_PAGE = 200
+DEFAULT_MAX_RECORDS = 1000
+MAX_RECORDS_LIMIT = 5000
+DEFAULT_MAX_BYTES = 512 * 1024
+MAX_BYTES_LIMIT = 4 * 1024 * 1024
+
+# Filtros que un cursor de scan por fechas guarda y valida él mismo (src/scan.py)
+SCAN_PARAMS = ("date_start", "date_end", "sort_column", "sort_order")
+
+# Claves de la respuesta que no son la lista de registros
+META_KEYS = {"code", "message", "page_context"}
+
+FetchPage = Callable[[int, int], Awaitable[httpx.Response]]
+Progress = Callable[[int, int, str], Awaitable[None]]
+
+
+# -------------------------
+#   SPEC
+# -------------------------
+
+
+def add_auto_pagination_params(spec: dict) -> dict:
+    """
+    Agrega auto_paginate / max_records / max_bytes / cursor a las operaciones
+    GET list_* que aceptan `page`. Llamar antes de fix_parameter_schemas.
+    """
+    logger.info("📑 Adding auto-pagination params to list tools...")
+    shared = spec.get("components", {}).get("parameters", {})
+    added = 0
+
+    for path, path_item in spec.get("paths", {}).items():
+        operation = path_item.get("get")
+        if not isinstance(operation, dict):
+            continue
+        if not operation.get("operationId", "").startswith("list_"):
+            continue
+
+        names = set()
+        for param in path_item.get("parameters", []) + operation.get("parameters", []):
+            if "$ref" in param:
+                param = shared.get(param["$ref"].rsplit("/", 1)[-1], {})
+            names.add(param.get("name"))
+        if "page" not in names or names & set(PAGINATION_PARAMS):
+            continue
+
+        operation.setdefault("parameters", []).extend(
+            [
+                {
+                    "name": "auto_paginate",
+                    "in": "query",
+                    "required": False,
+                    "description": (
+                        "Fetch following pages server-side and return them merged. "
+                        "Stops at max_records or max_bytes; page_context.next_cursor "
+                        "continues from there."
+                    ),
+                    "schema": {"type": "boolean"},
+                },
+                {
+                    "name": "max_records",
+                    "in": "query",
+                    "required": False,
+                    "description": (
+                        f"Record limit for auto_paginate "
+                        f"(default {DEFAULT_MAX_RECORDS}, max {MAX_RECORDS_LIMIT})."
+                    ),
+                    "schema": {"type": "integer"},
+                },
+                {
+                    "name": "max_bytes",
+                    "in": "query",
+                    "required": False,
+                    "description": (
+                        f"JSON size limit in bytes for auto_paginate "
+                        f"(default {DEFAULT_MAX_BYTES}, max {MAX_BYTES_LIMIT})."
+                    ),
+                    "schema": {"type": "integer"},
+                },
+                {
+                    "name": "cursor",
+                    "in": "query",
+                    "required": False,
+                    "description": (
+                        "page_context.next_cursor of a previous auto_paginate call. "
+                        "Implies auto_paginate. Send the same filters as the call "
+                        "that returned it (status, search_text...): a cursor used "
+                        "with different filters is rejected."
+                    ),
+                    "schema": {"type": "string"},
+                },
+            ]
+        )
+        added += 1
+
+    logger.info(f"✅ Auto-pagination enabled for {added} list tools")
+    return spec
+
+
+# -------------------------
+#   OPCIONES Y CURSOR
+# -------------------------
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def _to_limit(value: Any, default: int, limit: int, name: str) -> int:
+    if value is None or value == "":
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from e
+    if number < 1:
+        raise ValueError(f"{name} must be >= 1")
+    return min(number, limit)
+
+
+def filters_digest(params: Dict[str, Any], exclude: Tuple[str, ...] = ()) -> str:
+    """Huella corta de los filtros de la llamada (todo lo que no es paginación)"""
+    filters = {
+        name: value
+        for name, value in params.items()
+        if name not in exclude and value not in (None, "")
+    }
+    raw = json.dumps(filters, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """
+    Posición en el listado: página, tamaño de página y registros ya leídos,
+    más la huella de los filtros con que se creó. En un scan por fechas
+    (src/scan.py) también el tramo [desde, hasta] y el scan completo
+    [desde, hasta, orden A/D], para continuar solo con el cursor.
+    """
+
+    page: int
+    per_page: int
+    skip: int = 0
+    shard: Optional[Tuple[str, str]] = None
+    scan: Optional[Tuple[str, str, str]] = None
+    filters: Optional[str] = None
+
+    def encode(self) -> str:
+        values = [self.page, self.per_page, self.skip, self.filters or ""]
+        if self.shard:
+            values.extend(self.shard)
+            if self.scan:
+                values.extend(self.scan)
+        raw = json.dumps(values, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "PageCursor":
+        """Lanza ValueError si el cursor no es válido"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list):
+                raise ValueError("not a list")
+            page, per_page, skip = (int(v) for v in values[:3])
+            filters = str(values[3]) if len(values) > 3 and values[3] else None
+            shard = tuple(str(v) for v in values[4:6]) or None
+            scan = tuple(str(v) for v in values[6:]) or None
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from e
+        if page < 1 or not 1 <= per_page <= MAX_PER_PAGE or not 0 <= skip < per_page:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        if shard is not None and len(shard) != 2:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        if scan is not None and (len(scan) != 3 or scan[2] not in ("A", "D")):
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        return cls(page, per_page, skip, shard, scan, filters)
+
+    def advance(self, records: int) -> "PageCursor":
+        """Cursor `records` registros más adelante (las páginas son contiguas)"""
+        offset = self.skip + records
+        return PageCursor(
+            self.page + offset // self.per_page,
+            self.per_page,
+            offset % self.per_page,
+            self.shard,
+            self.scan,
+            self.filters,
+        )
+
+
+@dataclass(frozen=True)
+class PaginationOptions:
+    start: PageCursor
+    max_records: int
+    max_bytes: int
+
+    @classmethod
+    def pop_from(cls, params: Dict[str, Any]) -> Optional["PaginationOptions"]:
+        """
+        Quita los parámetros de paginación de `params` (Zoho no los conoce).
+        Devuelve None si la llamada no pidió auto-paginación. Lanza ValueError
+        si el cursor se creó con otros filtros que los de `params`.
+        """
+        values = {name: params.pop(name, None) for name in PAGINATION_PARAMS}
+        if not _to_bool(values["auto_paginate"]) and not values["cursor"]:
+            return None
+
+        if values["cursor"]:
+            start = PageCursor.decode(values["cursor"])
+        else:
+            start = PageCursor(
+                page=_to_limit(params.get("page"), 1, 10**6, "page"),
+                per_page=_to_limit(
+                    params.get("per_page"), MAX_PER_PAGE, MAX_PER_PAGE, "per_page"
+                ),
+            )
+        params.pop("page", None)
+        params.pop("per_page", None)
+
+        # Sin los filtros originales el cursor seguiría otro listado
+        exclude = SCAN_PARAMS if start.shard else ()
+        if start.filters is None:
+            start = replace(start, filters=filters_digest(params, exclude))
+        elif start.filters != filters_digest(params, exclude):
+            raise ValueError(
+                "cursor was created with different filters: repeat the same "
+                "filters (status, search_text...) as the call that returned it"
+            )
+
+        return cls(
+            start=start,
+            max_records=_to_limit(
+                values["max_records"],
+                DEFAULT_MAX_RECORDS,
+                MAX_RECORDS_LIMIT,
+                "max_records",
+            ),
+            max_bytes=_to_limit(
+                values["max_bytes"], DEFAULT_MAX_BYTES, MAX_BYTES_LIMIT, "max_bytes"
+            ),
+        )
+
+
+# -------------------------
+#   RECORRIDO
+# -------------------------
+
+
+def records_key(payload: Dict) -> Optional[str]:
+    """Clave de la lista de registros (invoices, contacts, purchaseorders...)"""
+    for key, value in payload.items():
+        if key not in META_KEYS and isinstance(value, list):
+            return key
+    return None
+
+
+def has_more_page(payload: Dict) -> bool:
+    return bool((payload.get("page_context") or {}).get("has_more_page"))
+
+
+async def iter_pages(
+    fetch_page: FetchPage, start: PageCursor
+) -> AsyncIterator[Tuple[int, httpx.Response]]:
+    """
+    Páginas desde `start` hasta que Zoho diga has_more_page=false o falle una
+    petición (la respuesta con error se entrega y se termina). El consumidor
+    corta antes simplemente dejando de iterar.
+    """
+    page = start.page
+    while True:
+        response = await fetch_page(page, start.per_page)
+        yield page, response
+        if not response.is_success:
+            return
+        try:
+            more = has_more_page(response.json())
+        except ValueError:
+            return
+        if not more:
+            return
+        page += 1
+
+
+async def report_progress(progress: int, total: int, message: str) -> None:
+    """Notificación MCP de progreso; no hace nada fuera de una llamada a tool"""
+    try:
+        from fastmcp.server.dependencies import get_context
+
+        await get_context().report_progress(progress, total, message)
+    except Exception as e:
+        logger.debug(f"Progress not reported: {e}")
+
+
+@dataclass
+class PageRun:
+    """Resultado de recorrer las páginas de un listado desde un cursor"""
+
+    start: PageCursor
+    key: Optional[str] = None
+    meta: Dict = field(default_factory=dict)
+    records: List[Dict] = field(default_factory=list)
+    sizes: List[int] = field(default_factory=list)
+    pages: int = 0
+    next_cursor: Optional[PageCursor] = None
+    stopped_by: str = "end"
+    request: Optional[httpx.Request] = None
+    # Respuesta que se devuelve tal cual: error en la primera página o no es un listado
+    passthrough: Optional[httpx.Response] = None
+
+    @property
+    def size(self) -> int:
+        return sum(self.sizes)
+
+
+async def run_pages(
+    fetch_page: FetchPage,
+    start: PageCursor,
+    max_records: Union[int, Callable[[], int]],
+    max_bytes: int,
+    on_page: Optional[Callable[[PageRun], Awaitable[None]]] = None,
+) -> PageRun:
+    """
+    Lee páginas desde `start` hasta el final del listado o hasta llegar a
+    max_records / max_bytes. Si corta a mitad de página, next_cursor apunta
+    al primer registro no leído. max_records puede ser una función que se
+    consulta en cada registro (límite que baja mientras se lee, ver scan).
+    """
+    limit = max_records if callable(max_records) else lambda: max_records
+    run = PageRun(start=start)
+    size = 0
+
+    async for page, response in iter_pages(fetch_page, start):
+        if not response.is_success:
+            if run.request is None:
+                run.passthrough = response  # Nada leído: el error va tal cual
+                return run
+            run.next_cursor = replace(start, page=page, skip=0)
+            run.stopped_by = f"error {response.status_code}"
+            logger.warning(f"⚠️ Pagination stopped at page {page}: {run.stopped_by}")
+            return run
+
+        payload = response.json()
+        if run.request is None:
+            run.request = response.request
+            run.key = records_key(payload)
+            if run.key is None:
+                run.passthrough = response  # No es un listado: nada que combinar
+                return run
+            run.meta = {k: v for k, v in payload.items() if k != run.key}
+        run.pages += 1
+
+        skip = start.skip if page == start.page else 0
+        page_records = payload.get(run.key) or []
+        for index in range(skip, len(page_records)):
+            record = page_records[index]
+            record_size = len(
+                json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+            )
+            if len(run.records) >= limit():
+                run.stopped_by = "max_records"
+            elif run.records and size + record_size > max_bytes:
+                run.stopped_by = "max_bytes"
+            else:
+                run.records.append(record)
+                run.sizes.append(record_size)
+                size += record_size
+                continue
+            run.next_cursor = replace(start, page=page, skip=index)
+            break
+
+        if on_page is not None:
+            await on_page(run)
+
+        if run.next_cursor is not None:
+            return run
+        if has_more_page(payload) and (
+            len(run.records) >= limit() or size >= max_bytes
+        ):
+            # Límite justo al final de la página: se sigue en la siguiente
+            run.stopped_by = (
+                "max_records" if len(run.records) >= limit() else "max_bytes"
+            )
+            run.next_cursor = replace(start, page=page + 1, skip=0)
+            return run
+
+    return run
+
+
+def merged_response(
+    run: PageRun, next_cursor: Optional[PageCursor], **page_context: Any
+) -> httpx.Response:
+    """Respuesta única con los registros de `run` y el page_context combinado"""
+    merged = dict(run.meta)
+    merged[run.key] = run.records
+    merged["page_context"] = {
+        **(merged.get("page_context") or {}),
+        "page": run.start.page,
+        "per_page": run.start.per_page,
+        "pages_fetched": run.pages,
+        "records": len(run.records),
+        "bytes": run.size,
+        "stopped_by": run.stopped_by,
+        **page_context,
+        "has_more_page": next_cursor is not None,
+        "next_cursor": next_cursor.encode() if next_cursor else None,
+    }
+    logger.info(
+        f"📑 Auto-paginated {len(run.records)} {run.key} from {run.pages} page(s) "
+        f"({run.size} bytes, stopped by {run.stopped_by})"
+    )
+    return httpx.Response(
+        200,
+        json=merged,
+        headers={"content-type": "application/json"},
+        request=run.request,
+    )
+
+
+async def collect_pages(
+    fetch_page: FetchPage,
+    options: PaginationOptions,
+    progress: Optional[Progress] = report_progress,
+) -> httpx.Response:
+    """
+    Recorre las páginas y devuelve una única respuesta con los registros
+    combinados. page_context indica cuántas páginas se leyeron, por qué se
+    paró y el cursor para continuar (None si no quedan registros).
+    """
+
+    async def on_page(run: PageRun) -> None:
+        if progress is not None:
+            await progress(
+                len(run.records),
+                options.max_records,
+                f"{len(run.records)} records from {run.pages} page(s)",
+            )
+
+    run = await run_pages(
+        fetch_page, options.start, options.max_records, options.max_bytes, on_page
+    )
+    if run.passthrough is not None:
+        return run.passthrough
+    return merged_response(run, run.next_cursor)
@@ -0,0 +1,267 @@
+"""
+Tool run_pipeline: varias llamadas a tools en una sola petición MCP.
+
+Los pasos forman un DAG pequeño. Un argumento puede referirse al resultado
+de otro paso con `$steps.<id>.<campo>...`, p. ej.:
+
+    [{"id": "contact", "tool": "create_contact", "arguments": {...}},
+     {"id": "invoice", "tool": "create_invoice",
+      "arguments": {"customer_id": "$steps.contact.contact_id", ...}},
+     {"id": "sent", "tool": "mark_invoice_sent",
+      "arguments": {"invoice_id": "$steps.invoice.invoice_id"}}]
+
+Las referencias (y `depends_on`) definen el orden: los pasos independientes
+se ejecutan en paralelo y cada paso empieza en cuanto terminan los suyos.
+Si un paso falla, los que dependen de él no se ejecutan (`skipped`); con
+on_error=stop (por defecto) tampoco empieza ningún otro paso (`not_run`),
+aunque los que ya estaban en curso terminan.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Set
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_TOOL = "run_pipeline"
+MAX_STEPS = 25
+META_KEYS = {"code", "message", "page_context"}
+REFERENCE = re.compile(r"^\$steps\.([A-Za-z0-9_-]+)((?:\.[^.]+)*)$")
+
+# (tool, argumentos) -> resultado estructurado de la tool
+CallTool = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+class PipelineStep(BaseModel):
+    id: str = Field(description="Unique step name, used in `$steps.<id>` references")
+    tool: str = Field(description="Name of the tool to call")
+    arguments: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Tool arguments; any value may be a `$steps.<id>.<field>` reference",
+    )
+    depends_on: List[str] = Field(
+        default_factory=list,
+        description="Steps that must succeed first (references add them implicitly)",
+    )
+
+
+def _references(value: Any) -> Set[str]:
+    """Ids de los pasos referenciados en los argumentos"""
+    if isinstance(value, str):
+        match = REFERENCE.match(value)
+        return {match.group(1)} if match else set()
+    if isinstance(value, dict):
+        return set().union(*(_references(item) for item in value.values()))
+    if isinstance(value, list):
+        return set().union(*(_references(item) for item in value))
+    return set()
+
+
+def plan_pipeline(steps: List[PipelineStep], tools: Set[str]) -> Dict[str, Set[str]]:
+    """
+    Valida los pasos y devuelve id -> dependencias. Lanza ValueError (antes
+    de ejecutar nada) si hay ids repetidos, tools desconocidas, referencias
+    a pasos que no existen o ciclos.
+    """
+    if not steps:
+        raise ValueError("The pipeline needs at least one step")
+    if len(steps) > MAX_STEPS:
+        raise ValueError(f"A pipeline accepts at most {MAX_STEPS} steps")
+
+    ids = [step.id for step in steps]
+    duplicated = sorted({step_id for step_id in ids if ids.count(step_id) > 1})
+    if duplicated:
+        raise ValueError(f"Duplicated step ids: {', '.join(duplicated)}")
+
+    dependencies: Dict[str, Set[str]] = {}
+    for step in steps:
+        if step.tool == PIPELINE_TOOL or step.tool not in tools:
+            raise ValueError(f"Step {step.id!r}: unknown tool {step.tool!r}")
+        deps = set(step.depends_on) | _references(step.arguments)
+        unknown = sorted(deps - set(ids))
+        if unknown:
+            raise ValueError(f"Step {step.id!r} depends on unknown steps: {unknown}")
+        if step.id in deps:
+            raise ValueError(f"Step {step.id!r} depends on itself")
+        dependencies[step.id] = deps
+
+    # Kahn: si quedan pasos sin ordenar, hay un ciclo
+    remaining = {step_id: set(deps) for step_id, deps in dependencies.items()}
+    while remaining:
+        ready = [step_id for step_id, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Steps form a cycle: {sorted(remaining)}")
+        for step_id in ready:
+            del remaining[step_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return dependencies
+
+
+def _lookup(result: Any, path: List[str], reference: str) -> Any:
+    """
+    Valor de `path` dentro de un resultado. Si el primer campo no está en el
+    nivel superior se busca dentro del objeto principal, así
+    `$steps.contact.contact_id` equivale a `$steps.contact.contact.contact_id`.
+    """
+    if path and isinstance(result, dict) and path[0] not in result:
+        main = [v for k, v in result.items() if k not in META_KEYS]
+        if len(main) == 1 and isinstance(main[0], dict):
+            result = main[0]
+
+    value = result
+    for part in path:
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            raise ValueError(f"Reference {reference} not found in the step result")
+    return value
+
+
+def _substitute(value: Any, results: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        match = REFERENCE.match(value)
+        if not match:
+            return value
+        path = [part for part in match.group(2).split(".") if part]
+        return _lookup(results[match.group(1)], path, value)
+    if isinstance(value, dict):
+        return {key: _substitute(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_substitute(item, results) for item in value]
+    return value
+
+
+def _zoho_error(result: Any) -> Optional[str]:
+    """Mensaje si el resultado es un error de Zoho con HTTP 200 (code != 0)"""
+    if isinstance(result, dict) and str(result.get("code", "0")) != "0":
+        return f"Zoho error {result['code']}: {result.get('message', '')}"
+    return None
+
+
+async def run_pipeline(
+    steps: List[PipelineStep],
+    call_tool: CallTool,
+    tools: Set[str],
+    on_error: str = "stop",
+) -> Dict[str, Any]:
+    """
+    Ejecuta los pasos respetando sus dependencias y devuelve todos los
+    resultados: status `ok`, `failed`, `skipped` (falló una dependencia) o
+    `not_run` (pipeline detenido por un fallo con on_error=stop).
+    """
+    dependencies = plan_pipeline(steps, tools)
+    by_id = {step.id: step for step in steps}
+    results: Dict[str, Any] = {}
+    outcome: Dict[str, Dict[str, Any]] = {}
+    stopped: List[str] = []  # paso que detuvo el pipeline
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(step: PipelineStep) -> bool:
+        """True si el paso terminó bien"""
+        deps_ok = await asyncio.gather(
+            *(tasks[dep] for dep in sorted(dependencies[step.id]))
+        )
+        failed = [
+            dep for dep, ok in zip(sorted(dependencies[step.id]), deps_ok) if not ok
+        ]
+        if failed:
+            outcome[step.id] = {
+                "status": "skipped",
+                "error": f"Dependency failed: {', '.join(failed)}",
+            }
+            return False
+        if stopped:
+            outcome[step.id] = {
+                "status": "not_run",
+                "error": f"Pipeline stopped after {stopped[0]!r} failed",
+            }
+            return False
+
+        started = time.monotonic()
+        try:
+            arguments = _substitute(step.arguments, results)
+            logger.info(f"🧩 Step {step.id}: {step.tool}")
+            result = await call_tool(step.tool, arguments)
+            error = _zoho_error(result)
+        except Exception as e:
+            result, error = None, str(e) or type(e).__name__
+        elapsed_ms = int((time.monotonic() - started) * 1000)
+
+        if error is not None:
+            logger.warning(f"⚠️ Step {step.id} ({step.tool}) failed: {error}")
+            outcome[step.id] = {
+                "status": "failed",
+                "error": error,
+                "elapsed_ms": elapsed_ms,
+            }
+            if on_error == "stop" and not stopped:
+                stopped.append(step.id)
+            return False
+
+        results[step.id] = result
+        outcome[step.id] = {"status": "ok", "result": result, "elapsed_ms": elapsed_ms}
+        return True
+
+    for step in steps:
+        tasks[step.id] = asyncio.ensure_future(run(step))
+    await asyncio.gather(*tasks.values())
+
+    counts: Dict[str, int] = {}
+    for step_outcome in outcome.values():
+        counts[step_outcome["status"]] = counts.get(step_outcome["status"], 0) + 1
+    logger.info(f"🧩 Pipeline of {len(steps)} steps: {counts}")
+
+    return {
+        "ok": counts.get("ok", 0) == len(steps),
+        "stopped_by": stopped[0] if stopped else None,
+        "steps": [
+            {"id": step.id, "tool": by_id[step.id].tool, **outcome[step.id]}
+            for step in steps
+        ],
+    }
+
+
+def structured_result(result: Any) -> Any:
+    """Resultado de una tool FastMCP como JSON (structured_content o texto)"""
+    if result.structured_content is not None:
+        return result.structured_content
+    text = "".join(getattr(block, "text", "") for block in result.content)
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def register_run_pipeline(mcp: Any) -> None:
+    """Registra la tool run_pipeline en el servidor FastMCP"""
+
+    async def call_tool(name: str, arguments: Dict[str, Any]) -> Any:
+        tool = await mcp.get_tool(name)
+        return structured_result(await tool.run(arguments))
+
+    @mcp.tool(
+        name=PIPELINE_TOOL,
+        description=(
+            "Run several tool calls in one request, or chain multiple calls where "
+            "later steps use earlier results. Each step has an `id`, a `tool` "
+            "and its `arguments`; an argument value `$steps.<id>.<field>` "
+            "(e.g. `$steps.contact.contact_id`) is replaced by that field of an "
+            "earlier step's result. Independent steps run in parallel, dependent "
+            "ones in order. If a step fails, steps depending on it are skipped; "
+            "with on_error=stop (default) no further steps start. Returns every "
+            "step's status and result."
+        ),
+    )
+    async def run_pipeline_tool(
+        steps: List[PipelineStep], on_error: Literal["stop", "continue"] = "stop"
+    ) -> Dict:
+        tools = set(await mcp.get_tools()) - {PIPELINE_TOOL}
+        return await run_pipeline(steps, call_tool, tools, on_error)
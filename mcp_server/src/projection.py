@@ -0,0 +1,128 @@
+"""
+Proyección de respuestas con el parámetro `fields`.
+
+`fields` es una lista de selectores separados por comas, relativos al objeto
+principal de la respuesta (el `invoice` de get_invoice, cada registro de
+`invoices` en list_invoices...):
+
+    invoice_id,total,customer_name
+    line_items.name,line_items.quantity
+    custom_fields.*.value
+
+Las listas se recorren implícitamente y `*` vale por cualquier clave. Las
+claves de control (code, message, page_context) se devuelven siempre.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from src.operations import HTTP_METHODS
+
+logger = logging.getLogger(__name__)
+
+FIELDS_PARAM = "fields"
+# Claves de la respuesta de Zoho que nunca se proyectan
+META_KEYS = {"code", "message", "page_context"}
+MAX_SELECTORS = 100
+
+Projector = Callable[[Any], Any]
+
+
+def add_fields_param(spec: dict) -> dict:
+    """Agrega el parámetro `fields` a todas las operaciones del spec"""
+    logger.info("🎯 Adding fields projection param...")
+    added = 0
+
+    for path, path_item in spec.get("paths", {}).items():
+        for method, operation in path_item.items():
+            if method.lower() not in HTTP_METHODS:
+                continue
+            params = operation.setdefault("parameters", [])
+            if any(param.get("name") == FIELDS_PARAM for param in params):
+                continue
+            params.append(
+                {
+                    "name": FIELDS_PARAM,
+                    "in": "query",
+                    "required": False,
+                    "description": (
+                        "Comma-separated fields to return, relative to each "
+                        "record (e.g. `invoice_id,total,line_items.name`). "
+                        "Lists are traversed and `*` matches any key. "
+                        "Omit to return everything."
+                    ),
+                    "schema": {"type": "string"},
+                }
+            )
+            added += 1
+
+    logger.info(f"✅ fields param added to {added} operations")
+    return spec
+
+
+def _parse(fields: str) -> Dict:
+    """Selectores -> árbol de claves (None = conservar el valor completo)"""
+    selectors = [selector.strip() for selector in fields.split(",")]
+    selectors = [selector for selector in selectors if selector]
+    if not selectors:
+        raise ValueError("fields must list at least one field")
+    if len(selectors) > MAX_SELECTORS:
+        raise ValueError(f"fields accepts at most {MAX_SELECTORS} selectors")
+
+    tree: Dict = {}
+    for selector in selectors:
+        parts = [part.strip() for part in selector.split(".")]
+        if not all(parts):
+            raise ValueError(f"Invalid field selector: {selector!r}")
+        node = tree
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                break  # Un selector más corto ya conserva todo el valor
+            node = node.setdefault(part, child)
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _compile(tree: Optional[Dict]) -> Projector:
+    if tree is None:
+        return lambda value: value
+
+    wildcard = _compile(tree["*"]) if "*" in tree else None
+    named = {key: _compile(sub) for key, sub in tree.items() if key != "*"}
+
+    def project(value: Any) -> Any:
+        if isinstance(value, list):
+            return [project(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if wildcard is None:
+            return {key: sub(value[key]) for key, sub in named.items() if key in value}
+        return {key: named.get(key, wildcard)(item) for key, item in value.items()}
+
+    return project
+
+
+@lru_cache(maxsize=256)
+def compile_projector(fields: str) -> Projector:
+    """
+    Compila los selectores una sola vez; las llamadas repetidas con el mismo
+    `fields` reutilizan el proyector. Lanza ValueError si no son válidos.
+    """
+    project = _compile(_parse(fields))
+
+    def project_response(payload: Any) -> Any:
+        if not isinstance(payload, dict):
+            return payload
+        return {
+            key: (
+                value
+                if key in META_KEYS or not isinstance(value, (dict, list))
+                else project(value)
+            )
+            for key, value in payload.items()
+        }
+
+    return project_response
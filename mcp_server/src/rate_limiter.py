@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class _Bucket:
+    """Token bucket + semáforo de una organización"""
+
+    def __init__(self, per_minute: int, concurrency: int):
+        self.rate = per_minute / 60.0
+        # Ráfaga pequeña: Zoho cuenta por ventana de un minuto
+        self.capacity = float(max(1, concurrency))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def take(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Límites de la API de Zoho por organización: peticiones por minuto y
+    peticiones simultáneas. Todas las llamadas de ZohoAsyncClient (páginas,
+    shards de un scan...) comparten el mismo presupuesto.
+    """
+
+    def __init__(self, per_minute: int = 100, concurrency: int = 5):
+        self.per_minute = per_minute
+        self.concurrency = concurrency
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def _bucket(self, key: str) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.per_minute, self.concurrency)
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, key: str) -> AsyncIterator[None]:
+        """Esperar turno (concurrencia y ritmo) para una petición de `key`"""
+        bucket = self._bucket(key)
+        async with bucket.semaphore:
+            started = time.monotonic()
+            await bucket.take()
+            waited = time.monotonic() - started
+            if waited > 1:
+                logger.info(f"⏳ Rate limited org {key}: waited {waited:.1f}s")
+            yield
@@ -0,0 +1,284 @@
+"""
+Presupuesto de tamaño para los resultados de las tools.
+
+Si una respuesta supera el presupuesto (en tokens, estimados por bytes), se
+recorta de forma determinista la lista más grande del resultado (los
+registros de un list_*, los line_items de un get_*...). El resto se guarda
+en un almacén en memoria con TTL y la respuesta incluye un `truncated.handle`
+que la tool `fetch_more` lee sin volver a consultar Zoho.
+"""
+
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.operations import HTTP_METHODS
+
+logger = logging.getLogger(__name__)
+
+BUDGET_PARAM = "max_result_tokens"
+# Estimación habitual para JSON: ~4 bytes por token
+BYTES_PER_TOKEN = 4
+MIN_TOKENS = 500
+META_KEYS = {"code", "message", "page_context"}
+
+Path = Tuple[str, ...]
+# (path, registros) -> los registros en el formato del resultado original
+EncodeItems = Callable[[Path, List[Any]], Any]
+
+
+def add_result_budget_param(spec: dict) -> dict:
+    """Agrega max_result_tokens a todas las operaciones del spec"""
+    logger.info("📏 Adding result budget param...")
+    added = 0
+
+    for path, path_item in spec.get("paths", {}).items():
+        for method, operation in path_item.items():
+            if method.lower() not in HTTP_METHODS:
+                continue
+            params = operation.setdefault("parameters", [])
+            if any(param.get("name") == BUDGET_PARAM for param in params):
+                continue
+            params.append(
+                {
+                    "name": BUDGET_PARAM,
+                    "in": "query",
+                    "required": False,
+                    "description": (
+                        "Approximate size limit of the result in tokens. Larger "
+                        "results are truncated and return a `truncated.handle` "
+                        "for the fetch_more tool."
+                    ),
+                    "schema": {"type": "integer"},
+                }
+            )
+            added += 1
+
+    logger.info(f"✅ Result budget param added to {added} operations")
+    return spec
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+
+@dataclass
+class _Entry:
+    path: Path
+    items: List[Any]
+    sizes: List[int]
+    expires_at: float
+    encode_items: Optional[EncodeItems] = None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self.sizes)
+
+
+class ResultStore:
+    """
+    Restos de resultados recortados: TTL y límites de entradas y bytes
+    (se descartan primero los más antiguos). Se usa desde el event loop.
+    """
+
+    def __init__(
+        self, ttl: int = 600, max_entries: int = 200, max_bytes: int = 50 * 2**20
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            self._bytes -= self._entries.pop(key).nbytes
+
+    def put(
+        self,
+        path: Path,
+        items: List[Any],
+        sizes: List[int],
+        encode_items: Optional[EncodeItems] = None,
+    ) -> str:
+        self._expire()
+        entry = _Entry(path, items, sizes, time.monotonic() + self.ttl, encode_items)
+        while self._entries and (
+            len(self._entries) >= self.max_entries
+            or self._bytes + entry.nbytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+        key = secrets.token_urlsafe(9)
+        self._entries[key] = entry
+        self._bytes += entry.nbytes
+        return key
+
+    def get(self, key: str) -> Optional[_Entry]:
+        self._expire()
+        return self._entries.get(key)
+
+
+class ResultBudget:
+    def __init__(self, store: ResultStore, default_tokens: int = 25000):
+        self.store = store
+        self.default_tokens = default_tokens
+
+    def limit_bytes(self, max_tokens: Any = None) -> int:
+        """Bytes permitidos para `max_tokens` (o el presupuesto por defecto)"""
+        if max_tokens in (None, ""):
+            tokens = self.default_tokens
+        else:
+            try:
+                tokens = int(max_tokens)
+            except (TypeError, ValueError) as e:
+                raise ValueError(
+                    f"{BUDGET_PARAM} must be an integer, got {max_tokens!r}"
+                ) from e
+        return max(tokens, MIN_TOKENS) * BYTES_PER_TOKEN
+
+    @staticmethod
+    def _largest_list(payload: Dict) -> Optional[Path]:
+        """La lista más grande en el primer o segundo nivel del resultado"""
+        best: Optional[Path] = None
+        best_size = 0
+        candidates = []
+        for key, value in payload.items():
+            if key in META_KEYS:
+                continue
+            candidates.append(((key,), value))
+            if isinstance(value, dict):
+                candidates.extend(((key, sub), item) for sub, item in value.items())
+        for path, value in candidates:
+            if isinstance(value, list) and len(value) > 1:
+                size = _size(value)
+                if size > best_size:
+                    best, best_size = path, size
+        return best
+
+    def fit(
+        self,
+        payload: Any,
+        content: bytes,
+        max_tokens: Any,
+        encode: Callable[[Any], bytes],
+        encode_items: Optional[EncodeItems] = None,
+    ) -> bytes:
+        """
+        Devuelve `content` si cabe en el presupuesto; si no, recorta la lista
+        más grande de `payload`, guarda el resto y devuelve el resultado
+        recodificado con la clave `truncated`. `encode_items` da a fetch_more
+        el mismo formato que el resultado (filas de tabla, CSV).
+        """
+        limit = self.limit_bytes(max_tokens)
+        if len(content) <= limit or not isinstance(payload, dict):
+            return content
+
+        path = self._largest_list(payload)
+        if path is None:
+            logger.warning(f"⚠️ Result of {len(content)} bytes cannot be truncated")
+            return content
+
+        parent = payload
+        for key in path[:-1]:
+            parent = parent[key]
+        items = parent[path[-1]]
+        sizes = [_size(item) for item in items]
+
+        # Bytes disponibles para la lista: el resto del resultado se mantiene
+        available = limit - max(0, len(content) - sum(sizes) - len(items))
+        keep = 0
+        used = 0
+        while keep < len(items) and used + sizes[keep] + 1 <= available:
+            used += sizes[keep] + 1
+            keep += 1
+        keep = max(keep, 1)
+
+        def truncate(keep: int) -> Dict:
+            truncated = dict(payload)
+            target = truncated
+            for key in path[:-1]:
+                target[key] = dict(target[key])
+                target = target[key]
+            target[path[-1]] = items[:keep]
+            truncated["truncated"] = {
+                "path": ".".join(path),
+                "returned": keep,
+                "remaining": len(items) - keep,
+                "handle": None,
+                "expires_in": self.store.ttl,
+            }
+            return truncated
+
+        # La estimación usa tamaños JSON; con otro encoder (tabla) se ajusta
+        encoded = encode(truncate(keep))
+        while len(encoded) > limit and keep > 1:
+            keep = max(1, min(keep - 1, int(keep * limit / len(encoded))))
+            encoded = encode(truncate(keep))
+
+        handle = self.store.put(path, items[keep:], sizes[keep:], encode_items)
+        truncated = truncate(keep)
+        truncated["truncated"]["handle"] = f"{handle}:0"
+        logger.info(
+            f"✂️ Result over budget ({len(content)} > {limit} bytes): "
+            f"kept {keep}/{len(items)} of {'.'.join(path)}"
+        )
+        return encode(truncated)
+
+    def fetch_more(self, handle: str, max_tokens: Any = None) -> Dict:
+        """Siguiente tramo de un resultado recortado (no consulta Zoho)"""
+        key, _, offset = handle.partition(":")
+        entry = self.store.get(key)
+        if entry is None:
+            raise ValueError(
+                "Unknown or expired handle: repeat the original call to fetch it again"
+            )
+        try:
+            start = int(offset or 0)
+        except ValueError as e:
+            raise ValueError(f"Invalid handle: {handle!r}") from e
+        if not 0 <= start <= len(entry.items):
+            raise ValueError(f"Invalid handle: {handle!r}")
+
+        limit = self.limit_bytes(max_tokens)
+        end = start
+        used = 0
+        while end < len(entry.items) and (
+            end == start or used + entry.sizes[end] + 1 <= limit
+        ):
+            used += entry.sizes[end] + 1
+            end += 1
+
+        remaining = len(entry.items) - end
+        items = entry.items[start:end]
+        if entry.encode_items is not None:
+            items = entry.encode_items(entry.path, items)
+        return {
+            "path": ".".join(entry.path),
+            "items": items,
+            "returned": end - start,
+            "remaining": remaining,
+            "next_handle": f"{key}:{end}" if remaining else None,
+        }
+
+
+def register_fetch_more(mcp: Any, budget: ResultBudget) -> None:
+    """Registra la tool fetch_more en el servidor FastMCP"""
+
+    @mcp.tool(
+        name="fetch_more",
+        description=(
+            "Read the next part of a truncated tool result. Pass the "
+            "`truncated.handle` of the result (or the `next_handle` of a previous "
+            "fetch_more) and optionally max_result_tokens. Items come in the "
+            "format of the original result ({columns, rows} or CSV text for "
+            "output_format=table/csv). Does not query Zoho."
+        ),
+    )
+    def fetch_more(handle: str, max_result_tokens: Optional[int] = None) -> Dict:
+        return budget.fetch_more(handle, max_result_tokens)
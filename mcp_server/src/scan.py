@@ -0,0 +1,309 @@
+"""
+Scan por rangos de fechas para las tools list_* con auto_paginate.
+
+Si la llamada trae date_start y date_end, el rango se parte en tramos de
+días disjuntos que se recorren en paralelo (dentro del presupuesto del
+RateLimiter) y se combinan en orden de fecha. El cursor de continuación
+guarda el tramo en curso, así la siguiente llamada retoma exactamente ahí.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from src.pagination import (
+    SCAN_PARAMS,
+    PageCursor,
+    PageRun,
+    PaginationOptions,
+    Progress,
+    filters_digest,
+    merged_response,
+    report_progress,
+    run_pages,
+)
+
+logger = logging.getLogger(__name__)
+
+# (parámetros del tramo, página, per_page) -> respuesta de Zoho
+FetchShardPage = Callable[[Dict[str, Any], int, int], Awaitable[httpx.Response]]
+
+# Tramos de menos días no compensan las peticiones extra
+MIN_SHARD_DAYS = 7
+
+
+def add_date_range_params(spec: dict) -> dict:
+    """
+    Expone date_start / date_end en las operaciones list_* cuyo filtro `date`
+    documenta esas variantes (Zoho las acepta aunque el spec no las declare).
+    """
+    logger.info("📅 Adding date range params to list tools...")
+    added = 0
+
+    for path, path_item in spec.get("paths", {}).items():
+        operation = path_item.get("get")
+        if not isinstance(operation, dict):
+            continue
+        if not operation.get("operationId", "").startswith("list_"):
+            continue
+
+        params = operation.get("parameters", [])
+        names = {param.get("name") for param in params}
+        date_param = next((p for p in params if p.get("name") == "date"), None)
+        if date_param is None or "date_start" not in date_param.get("description", ""):
+            continue
+        if names & {"date_start", "date_end"}:
+            continue
+
+        for name, bound in (("date_start", "From"), ("date_end", "Until")):
+            params.append(
+                {
+                    "name": name,
+                    "in": "query",
+                    "required": False,
+                    "description": (
+                        f"{bound} this date, inclusive (yyyy-mm-dd). With "
+                        "auto_paginate, a date_start/date_end range is fetched "
+                        "in parallel date shards."
+                    ),
+                    "schema": {"type": "string"},
+                }
+            )
+        added += 1
+
+    logger.info(f"✅ Date range params added to {added} list tools")
+    return spec
+
+
+def split_date_range(start: date, end: date, shards: int) -> List[Tuple[date, date]]:
+    """Tramos disjuntos y contiguos [desde, hasta] que cubren start..end"""
+    days = (end - start).days + 1
+    shards = max(1, min(shards, days // MIN_SHARD_DAYS))
+    size, extra = divmod(days, shards)
+    ranges = []
+    current = start
+    for i in range(shards):
+        length = size + (1 if i < extra else 0)
+        ranges.append((current, current + timedelta(days=length - 1)))
+        current += timedelta(days=length)
+    return ranges
+
+
+@dataclass(frozen=True)
+class ScanPlan:
+    """Tramos a recorrer, en el orden en que se devuelven"""
+
+    starts: List[PageCursor]
+    descending: bool
+
+    def shard_params(self, cursor: PageCursor) -> Dict[str, Any]:
+        date_start, date_end = cursor.shard
+        return {
+            "date_start": date_start,
+            "date_end": date_end,
+            "sort_column": "date",
+            "sort_order": "D" if self.descending else "A",
+        }
+
+
+def _scan_range(params: Dict[str, Any], cursor: PageCursor) -> Tuple[date, date, bool]:
+    """
+    Rango y orden de un scan que continúa desde `cursor`. El cursor guarda el
+    scan original, así basta con enviar solo el cursor; si además vienen
+    date_start / date_end / sort_order tienen que coincidir.
+    """
+    if cursor.scan is None:
+        # Cursor sin el scan completo: solo sirve repitiendo el rango
+        if not (params.get("date_start") and params.get("date_end")):
+            raise ValueError(
+                "This cursor belongs to a date range scan: repeat the original "
+                "date_start and date_end"
+            )
+        scan = (
+            str(params["date_start"]),
+            str(params["date_end"]),
+            "D" if str(params.get("sort_order", "")).upper() == "D" else "A",
+        )
+    else:
+        scan = cursor.scan
+        sent = (
+            params.get("date_start"),
+            params.get("date_end"),
+            str(params["sort_order"]).upper() if params.get("sort_order") else None,
+        )
+        for value, expected, name in zip(
+            sent, scan, ("date_start", "date_end", "sort_order")
+        ):
+            if value not in (None, "") and str(value) != expected:
+                raise ValueError(
+                    f"cursor was created with {name}={expected}, got {value!r}"
+                )
+    if params.get("sort_column") not in (None, "", "date"):
+        raise ValueError("A date range cursor requires sort_column=date")
+    try:
+        return date.fromisoformat(scan[0]), date.fromisoformat(scan[1]), scan[2] == "D"
+    except ValueError as e:
+        raise ValueError(f"Invalid date range in cursor: {scan!r}") from e
+
+
+def plan_scan(
+    params: Dict[str, Any], options: PaginationOptions, shards: int
+) -> Optional[ScanPlan]:
+    """
+    None si la llamada no se puede partir: falta el rango, se ordena por otra
+    columna o el cursor viene de una paginación normal. Un cursor de scan
+    siempre continúa el scan (con su propio rango si la llamada no lo repite)
+    y lanza ValueError si no puede, en vez de leer el listado sin filtrar.
+    """
+    per_page = options.start.per_page
+    first: Optional[PageCursor] = None
+
+    if options.start.shard is not None:
+        # Continuación: primero el tramo del cursor, después lo que queda
+        start, end, descending = _scan_range(params, options.start)
+        scan = (start.isoformat(), end.isoformat(), "D" if descending else "A")
+        first = options.start
+        try:
+            shard_start, shard_end = (date.fromisoformat(d) for d in first.shard)
+        except ValueError as e:
+            raise ValueError(f"Invalid date range in cursor: {first.shard!r}") from e
+        if descending:
+            end = shard_start - timedelta(days=1)
+        else:
+            start = shard_end + timedelta(days=1)
+    else:
+        if shards < 2 or params.get("sort_column") not in (None, "", "date"):
+            return None
+        if options.start.page != 1 or options.start.skip:
+            return None
+        try:
+            start = date.fromisoformat(str(params.get("date_start")))
+            end = date.fromisoformat(str(params.get("date_end")))
+        except ValueError:
+            return None
+        if start > end:
+            return None
+        descending = str(params.get("sort_order", "")).upper() == "D"
+        scan = (start.isoformat(), end.isoformat(), "D" if descending else "A")
+
+    ranges = split_date_range(start, end, shards) if start <= end else []
+    if first is None and len(ranges) < 2:
+        return None
+    if descending:
+        ranges.reverse()
+
+    starts = [replace(first, scan=scan)] if first else []
+    starts += [
+        PageCursor(
+            1,
+            per_page,
+            shard=(a.isoformat(), b.isoformat()),
+            scan=scan,
+            filters=filters_digest(params, SCAN_PARAMS),
+        )
+        for a, b in ranges
+    ]
+    return ScanPlan(starts=starts, descending=descending)
+
+
+async def scan_pages(
+    fetch_page: FetchShardPage,
+    options: PaginationOptions,
+    plan: ScanPlan,
+    progress: Optional[Progress] = report_progress,
+) -> httpx.Response:
+    """
+    Recorre todos los tramos a la vez y combina los registros en orden.
+    Cada tramo lee solo los registros que aún faltan: max_records menos lo
+    ya leído por los tramos anteriores (que van primero en el resultado),
+    así N tramos no piden N veces max_records. En cuanto los primeros tramos
+    completan el resultado, los siguientes se cancelan.
+    """
+    fetched: Dict[int, int] = {}
+    pages = 0
+
+    async def run_shard(i: int, start: PageCursor) -> PageRun:
+        shard_params = plan.shard_params(start)
+
+        async def fetch(page: int, per_page: int) -> httpx.Response:
+            return await fetch_page(shard_params, page, per_page)
+
+        async def on_page(run: PageRun) -> None:
+            nonlocal pages
+            pages += 1
+            fetched[i] = len(run.records)
+            if progress is not None:
+                total = sum(fetched.values())
+                await progress(
+                    min(total, options.max_records),
+                    options.max_records,
+                    f"{total} records from {pages} page(s) in {len(plan.starts)} shards",
+                )
+
+        def needed() -> int:
+            return options.max_records - sum(
+                count for j, count in fetched.items() if j < i
+            )
+
+        return await run_pages(fetch, start, needed, options.max_bytes, on_page)
+
+    shards = sorted(d for start in plan.starts for d in start.shard)
+    logger.info(f"🧩 Scanning {len(plan.starts)} date shards {shards[0]}…{shards[-1]}")
+    tasks = [
+        asyncio.create_task(run_shard(i, start)) for i, start in enumerate(plan.starts)
+    ]
+    merged: Optional[PageRun] = None
+    next_cursor: Optional[PageCursor] = None
+
+    try:
+        for task, start in zip(tasks, plan.starts):
+            run = await task
+            if run.passthrough is not None:
+                if merged is None:
+                    return run.passthrough
+                # Falló la primera página del tramo: se retoma desde ahí
+                merged.stopped_by = f"error {run.passthrough.status_code}"
+                next_cursor = start
+                break
+            if merged is None:
+                merged = PageRun(start=plan.starts[0], key=run.key, meta=run.meta)
+                merged.request = run.request
+            merged.pages += run.pages
+
+            # Registros del tramo que caben en lo que queda de los límites
+            size = merged.size
+            taken = 0
+            for record, record_size in zip(run.records, run.sizes):
+                if len(merged.records) >= options.max_records:
+                    merged.stopped_by = "max_records"
+                elif merged.records and size + record_size > options.max_bytes:
+                    merged.stopped_by = "max_bytes"
+                else:
+                    merged.records.append(record)
+                    merged.sizes.append(record_size)
+                    size += record_size
+                    taken += 1
+                    continue
+                break
+
+            if taken < len(run.records):
+                next_cursor = start.advance(taken)
+                break
+            if run.next_cursor is not None:
+                merged.stopped_by = run.stopped_by
+                next_cursor = run.next_cursor
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return merged_response(
+        merged,
+        next_cursor,
+        shards=len(plan.starts),
+        date_range=[shards[0], shards[-1]],
+    )
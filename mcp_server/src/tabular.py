@@ -0,0 +1,206 @@
+"""
+Salida tabular de las tools list_* (`output_format=table` o `csv`).
+
+En lugar de N objetos JSON que repiten cada clave, la lista de registros se
+devuelve como una fila de columnas + filas de valores:
+
+    table: {"invoices": {"columns": [...], "rows": [[...], ...]}}
+    csv:   {"invoices": "invoice_id,total\\r\\n123,10.5\\r\\n..."}
+
+Las columnas salen de `fields` si se indicó o, si no, de la vista por
+defecto de la entidad (las columnas simples del schema del listado en el
+spec). El encoder genera la salida fila a fila, sin copias intermedias.
+"""
+
+import csv
+import io
+import itertools
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FORMAT_PARAM = "output_format"
+TABLE_FORMATS = ("table", "csv")
+# Extensión del spec con la vista por defecto de cada list_*
+VIEW_EXTENSION = "x-table-columns"
+META_KEYS = {"code", "message", "page_context"}
+MAX_VIEW_COLUMNS = 25
+
+
+def _list_item_columns(operation: Dict, schemas: Dict) -> Optional[List[str]]:
+    """Columnas simples (no objeto ni lista) del schema de la respuesta 200"""
+    content = operation.get("responses", {}).get("200", {}).get("content", {})
+    schema = content.get("application/json", {}).get("schema", {})
+    if "$ref" in schema:
+        schema = schemas.get(schema["$ref"].rsplit("/", 1)[-1], {})
+
+    for key, prop in schema.get("properties", {}).items():
+        if key in META_KEYS or "items" not in prop:
+            continue
+        items = prop["items"]
+        if "$ref" in items:
+            items = schemas.get(items["$ref"].rsplit("/", 1)[-1], {})
+        columns = [
+            name
+            for name, field in items.get("properties", {}).items()
+            if field.get("type") not in ("object", "array")
+            and "items" not in field
+            and "properties" not in field
+        ]
+        return columns[:MAX_VIEW_COLUMNS] or None
+    return None
+
+
+def output_format_param() -> Dict:
+    return {
+        "name": FORMAT_PARAM,
+        "in": "query",
+        "required": False,
+        "description": (
+            "`table` returns the records as {columns, rows}, `csv` as "
+            "CSV text with a header row; both are several times smaller "
+            "than `json` (default). Columns come from `fields` or from "
+            "the entity's default view."
+        ),
+        "schema": {"type": "string", "enum": ["json", *TABLE_FORMATS]},
+    }
+
+
+def add_table_output_params(spec: dict) -> dict:
+    """
+    Agrega `output_format` a las operaciones GET list_* y guarda su vista por
+    defecto en x-table-columns. Llamar ANTES de quitar los schemas de respuesta.
+    """
+    logger.info("📊 Adding tabular output param to list tools...")
+    schemas = spec.get("components", {}).get("schemas", {})
+    added = 0
+    views = 0
+
+    for path, path_item in spec.get("paths", {}).items():
+        operation = path_item.get("get")
+        if not isinstance(operation, dict):
+            continue
+        if not operation.get("operationId", "").startswith("list_"):
+            continue
+        params = operation.setdefault("parameters", [])
+        if any(param.get("name") == FORMAT_PARAM for param in params):
+            continue
+
+        params.append(output_format_param())
+        added += 1
+
+        columns = _list_item_columns(operation, schemas)
+        if columns:
+            operation[VIEW_EXTENSION] = columns
+            views += 1
+
+    logger.info(f"✅ Tabular output added to {added} list tools ({views} views)")
+    return spec
+
+
+def table_views(spec: dict) -> Dict[str, List[str]]:
+    """operationId -> columnas por defecto (desde x-table-columns)"""
+    return {
+        operation["operationId"]: operation[VIEW_EXTENSION]
+        for path_item in spec.get("paths", {}).values()
+        for operation in path_item.values()
+        if isinstance(operation, dict) and VIEW_EXTENSION in operation
+    }
+
+
+def choose_columns(
+    records: List[Any], fields: Optional[str], view: Optional[List[str]]
+) -> List[str]:
+    """
+    Columnas de la tabla: las de `fields` (primer nivel, en orden), si no las
+    de la vista, y si no la unión de claves de los registros. Se omiten las
+    columnas que no aparecen en ningún registro.
+    """
+    present: Dict[str, None] = {}
+    for record in records:
+        if isinstance(record, dict):
+            present.update(dict.fromkeys(record))
+
+    wanted: List[str] = []
+    if fields:
+        wanted = [selector.strip().split(".")[0] for selector in fields.split(",")]
+        if "*" in wanted:
+            wanted = []
+    if not wanted and view:
+        wanted = view
+    if not wanted:
+        return list(present)
+    return [column for column in dict.fromkeys(wanted) if column in present]
+
+
+def _cell(value: Any) -> Any:
+    """Valor para CSV: anidados como JSON compacto, null como vacío"""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _row(record: Any, columns: List[str]) -> List[Any]:
+    if not isinstance(record, dict):
+        return [None] * len(columns)
+    return [record.get(column) for column in columns]
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_table(
+    payload: Dict, key: str, columns: List[str], output_format: str
+) -> Iterator[str]:
+    """
+    Encoder incremental: genera el JSON de la respuesta por fragmentos, una
+    fila de registros por fragmento. Las demás claves se copian tal cual.
+    """
+    yield "{"
+    first = True
+    for name, value in payload.items():
+        if not first:
+            yield ","
+        first = False
+        yield _dumps(name) + ":"
+        if name != key:
+            yield _dumps(value)
+            continue
+
+        records = value
+        if output_format == "table":
+            yield '{"columns":' + _dumps(columns) + ',"rows":['
+            for i, record in enumerate(records):
+                yield ("," if i else "") + _dumps(_row(record, columns))
+            yield "]}"
+        else:
+            # CSV fila a fila dentro de un string JSON (cada trozo ya escapado)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            yield '"'
+            rows = ([_cell(v) for v in _row(record, columns)] for record in records)
+            for row in itertools.chain([columns], rows):
+                writer.writerow(row)
+                yield _dumps(buffer.getvalue())[1:-1]
+                buffer.seek(0)
+                buffer.truncate()
+            yield '"'
+    yield "}"
+
+
+def encode_table(
+    payload: Dict, key: str, columns: List[str], output_format: str
+) -> bytes:
+    if output_format not in TABLE_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}")
+    out = io.BytesIO()
+    for chunk in iter_table(payload, key, columns, output_format):
+        out.write(chunk.encode("utf-8"))
+    return out.getvalue()
@@ -1,9 +1,12 @@
 import logging
 import os
+import sqlite3
+import sys
 import time
+from datetime import datetime
 from pathlib import Path
 from threading import Lock
-from typing import Dict
+from typing import Dict, Optional
 
 import httpx
 from dotenv import load_dotenv
@@ -14,6 +17,10 @@ logger = logging.getLogger(__name__)
 project_root = Path(__file__).parent.parent.parent
 load_dotenv(project_root / ".env")
 
+# Tras un refresh fallido del servidor OAuth no se reintenta durante este
+# tiempo: mientras tanto se usa el token guardado
+FALLBACK_RETRY_SECONDS = 30
+
 
 class OAuthClient:
     """Cliente para obtener tokens desde el servidor OAuth"""
@@ -119,6 +126,171 @@ class OAuthClient:
         return self.get_credentials()["api_domain"]
 
 
+class TokenDBClient:
+    """
+    Lee las credenciales directamente desde la TokenDB compartida (SQLite).
+
+    Abre la base de datos en modo solo lectura y mantiene un snapshot en memoria
+    de la cuenta activa. El snapshot solo se recarga cuando cambia
+    `PRAGMA data_version`, es decir, cuando otro proceso (el servidor OAuth)
+    hace commit. Si el token está por expirar se delega en el servidor OAuth
+    para que lo refresque.
+    """
+
+    def __init__(self, db_path: str = None, fallback: Optional[OAuthClient] = None):
+        if db_path is None:
+            db_path = os.getenv(
+                "TOKEN_DB_PATH", str(project_root / "oauth_page" / "zoho_tokens.db")
+            )
+
+        self.db_path = Path(db_path).resolve()
+        self.fallback = fallback
+        self._fallback_failed_at = 0.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._snapshot: Optional[Dict[str, any]] = None
+        self._lock = Lock()
+        logger.info(f"🗄️ TokenDB Client initialized: {self.db_path}")
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Conexión de solo lectura reutilizada entre llamadas"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                timeout=10.0,
+            )
+            self._conn.row_factory = sqlite3.Row
+        return self._conn
+
+    def _load_snapshot(self) -> Optional[Dict[str, any]]:
+        """Lee la cuenta activa desde SQLite"""
+        row = (
+            self._get_conn()
+            .execute("SELECT * FROM users WHERE is_active = 1")
+            .fetchone()
+        )
+        if not row:
+            return None
+
+        account = dict(row)
+        expires_at = account["expires_at"]
+        if isinstance(expires_at, str):
+            # Base de datos aún sin migrar (esquema v1, timestamps ISO)
+            expires_at = datetime.fromisoformat(expires_at).timestamp()
+        return {
+            "access_token": account["access_token"],
+            "organization_id": account["organization_id"],
+            "api_domain": account["api_domain"],
+            "region": account["region"],
+            "email": account.get("email") or "",
+            "company_name": account.get("company_name") or "",
+            "expires_at": expires_at,
+        }
+
+    def get_credentials(self) -> Dict[str, str]:
+        """
+        Obtiene las credenciales de la cuenta activa desde la TokenDB.
+        Solo consulta la tabla si la base de datos cambió desde la última lectura.
+        """
+        with self._lock:
+            try:
+                data_version = (
+                    self._get_conn().execute("PRAGMA data_version").fetchone()[0]
+                )
+                if self._snapshot is None or data_version != self._data_version:
+                    self._snapshot = self._load_snapshot()
+                    self._data_version = data_version
+                    if self._snapshot:
+                        logger.info(
+                            f"✅ Credentials loaded from TokenDB for: "
+                            f"{self._snapshot['company_name'] or 'Unknown'}"
+                        )
+            except sqlite3.Error as e:
+                logger.error(f"❌ Cannot read TokenDB at {self.db_path}: {e}")
+                self._conn = None
+                if self.fallback is None:
+                    raise
+                return self.fallback.get_credentials()
+
+            snapshot = self._snapshot
+
+        if snapshot is None:
+            error_msg = (
+                "❌ No active Zoho Books account found.\n"
+                "   Please connect an account in the OAuth server"
+            )
+            logger.error(error_msg)
+            raise Exception(error_msg)
+
+        # Token por expirar (5 min de margen): el servidor OAuth lo refresca
+        now = time.time()
+        if (
+            self.fallback is not None
+            and now >= snapshot["expires_at"] - 300
+            and now - self._fallback_failed_at >= FALLBACK_RETRY_SECONDS
+        ):
+            logger.info("⏳ Token about to expire, asking OAuth server to refresh...")
+            try:
+                return self.fallback.get_credentials()
+            except Exception as e:
+                self._fallback_failed_at = time.time()
+                logger.warning(f"⚠️ OAuth refresh failed, using TokenDB token: {e}")
+
+        return snapshot
+
+
+class TokenStoreClient:
+    """
+    Lee las credenciales desde un TokenStore compartido (p. ej. Redis).
+
+    El store mantiene en memoria la cuenta activa y la invalida con sus
+    notificaciones de cambios, así que cada llamada es una lectura local.
+    Si el token está por expirar se delega en el servidor OAuth.
+    """
+
+    def __init__(self, store, fallback: Optional[OAuthClient] = None):
+        self.store = store
+        self.fallback = fallback
+        self._fallback_failed_at = 0.0
+        logger.info(f"🗄️ Token store client initialized: {type(store).__name__}")
+
+    def get_credentials(self) -> Dict[str, str]:
+        account = self.store.get_active_account()
+        if account is None:
+            error_msg = (
+                "❌ No active Zoho Books account found.\n"
+                "   Please connect an account in the OAuth server"
+            )
+            logger.error(error_msg)
+            raise Exception(error_msg)
+
+        # Token por expirar (5 min de margen): el servidor OAuth lo refresca
+        now = time.time()
+        if (
+            self.fallback is not None
+            and now >= account["expires_at"] - 300
+            and now - self._fallback_failed_at >= FALLBACK_RETRY_SECONDS
+        ):
+            logger.info("⏳ Token about to expire, asking OAuth server to refresh...")
+            try:
+                return self.fallback.get_credentials()
+            except Exception as e:
+                self._fallback_failed_at = time.time()
+                logger.warning(f"⚠️ OAuth refresh failed, using stored token: {e}")
+
+        return {
+            "access_token": account["access_token"],
+            "organization_id": account["organization_id"],
+            "api_domain": account["api_domain"],
+            "region": account["region"],
+            "email": account.get("email") or "",
+            "company_name": account.get("company_name") or "",
+            "expires_at": account["expires_at"],
+        }
+
+
 # ============================================
 # FUNCIONES DE COMPATIBILIDAD
 # ============================================
@@ -127,11 +299,29 @@ class OAuthClient:
 _oauth_client = None
 
 
-def _get_oauth_client() -> OAuthClient:
-    """Singleton del cliente OAuth"""
+def _get_oauth_client():
+    """
+    Singleton del proveedor de credenciales.
+
+    CREDENTIALS_SOURCE=oauth (default) → HTTP contra el servidor OAuth
+    CREDENTIALS_SOURCE=sqlite          → lectura directa de la TokenDB compartida
+    CREDENTIALS_SOURCE=redis           → RedisTokenStore compartido (REDIS_URL)
+    """
     global _oauth_client
     if _oauth_client is None:
-        _oauth_client = OAuthClient()
+        source = os.getenv("CREDENTIALS_SOURCE", "oauth").lower()
+        if source == "sqlite":
+            _oauth_client = TokenDBClient(fallback=OAuthClient())
+        elif source == "redis":
+            sys.path.insert(0, str(project_root))
+            from shared.redis_store import RedisTokenStore
+
+            store = RedisTokenStore.from_url(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            )
+            _oauth_client = TokenStoreClient(store, fallback=OAuthClient())
+        else:
+            _oauth_client = OAuthClient()
     return _oauth_client
 
 
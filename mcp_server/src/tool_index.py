@@ -0,0 +1,254 @@
+"""
+Índice de tools a partir del spec procesado (el mismo que usa FastMCP) y de
+las tools que registra el propio servidor (fetch_more, run_pipeline y las
+meta-tools del modo discovery).
+
+Se guarda como artefacto JSON versionado por su contenido: el servidor OAuth
+lo lee para generar /tools/docs, así la documentación siempre coincide con
+las tools desplegadas.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.operations import HTTP_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Subir si cambia el formato del índice o la pipeline del spec (fuerza regenerarlo)
+INDEX_FORMAT = 8
+
+# Parámetros que ZohoAsyncClient agrega a cada request: no se documentan
+INJECTED_PARAMS = {"organization_id"}
+MAX_DESCRIPTION = 160
+
+
+def read_index_version(path: Path) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+def _short(text: Optional[str]) -> str:
+    """Primera frase, sin HTML, acotada"""
+    if not text:
+        return ""
+    text = " ".join(
+        text.replace("<code>", "`").replace("</code>", "`").replace("<br>", " ").split()
+    )
+    sentence = text.split(". ")[0].rstrip(".")
+    if len(sentence) > MAX_DESCRIPTION:
+        sentence = sentence[: MAX_DESCRIPTION - 1].rstrip() + "…"
+    return sentence
+
+
+def _resolve(schema: Optional[Dict], components: Dict, depth: int = 0) -> Dict:
+    if not isinstance(schema, dict):
+        return {}
+    ref = schema.get("$ref")
+    if ref and depth < 5:
+        name = ref.rsplit("/", 1)[-1]
+        return _resolve(components.get(name), components, depth + 1)
+    return schema
+
+
+def _type_name(schema: Optional[Dict], components: Dict) -> str:
+    schema = _resolve(schema, components)
+    if "anyOf" in schema:  # Optional[...] de las tools del servidor
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"]
+        schema = _resolve(options[0], components) if options else {}
+    kind = schema.get("type") or ("object" if "properties" in schema else "any")
+    if kind == "array":
+        return f"array<{_type_name(schema.get('items'), components)}>"
+    return kind
+
+
+def _json_schema(content: Optional[Dict]) -> Optional[Dict]:
+    """Schema application/json de un requestBody o una respuesta"""
+    if not isinstance(content, dict):
+        return None
+    media = content.get("application/json") or next(iter(content.values()), None)
+    return media.get("schema") if isinstance(media, dict) else None
+
+
+def _fields(schema: Optional[Dict], components: Dict) -> List[Dict]:
+    """Propiedades de primer nivel: nombre, tipo, requerido"""
+    schema = _resolve(schema, components)
+    required = set(schema.get("required", []))
+    return [
+        {
+            "name": name,
+            "type": _type_name(prop, components),
+            "required": name in required,
+        }
+        for name, prop in schema.get("properties", {}).items()
+    ]
+
+
+def _result_fields(operation: Dict, components: Dict) -> List[Dict]:
+    responses = operation.get("responses", {})
+    for status in sorted(responses):
+        if status.startswith("2"):
+            schema = _json_schema(responses[status].get("content"))
+            return [
+                field
+                for field in _fields(schema, components)
+                if field["name"] not in ("code", "message")
+            ]
+    return []
+
+
+def spec_tools(spec: Dict) -> List[Dict]:
+    """
+    Una entrada por operación: nombre de la tool (operationId), método, path,
+    parámetros (path/query/body) y campos del resultado.
+    """
+    components = spec.get("components", {}).get("schemas", {})
+    shared_components = spec.get("components", {}).get("parameters", {})
+    tools = []
+
+    for path, path_item in spec.get("paths", {}).items():
+        shared_params = path_item.get("parameters", [])
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS or not isinstance(operation, dict):
+                continue
+            name = operation.get("operationId")
+            if not name:
+                continue
+
+            params = {}
+            for param in shared_params + operation.get("parameters", []):
+                if "$ref" in param:
+                    param = shared_components.get(param["$ref"].rsplit("/", 1)[-1], {})
+                if "name" not in param or param["name"] in INJECTED_PARAMS:
+                    continue
+                params[(param["name"], param.get("in"))] = {
+                    "name": param["name"],
+                    "in": param.get("in", "query"),
+                    "type": _type_name(param.get("schema"), components),
+                    "required": bool(param.get("required")),
+                    "description": _short(param.get("description")),
+                }
+            body = _json_schema(operation.get("requestBody", {}).get("content"))
+            for field in _fields(body, components):
+                params.setdefault(
+                    (field["name"], "body"),
+                    {**field, "in": "body", "description": ""},
+                )
+
+            tools.append(
+                {
+                    "name": name,
+                    "tag": (operation.get("tags") or ["other"])[0],
+                    "method": method.upper(),
+                    "path": path,
+                    "summary": operation.get("summary", ""),
+                    "description": _short(operation.get("description")),
+                    "parameters": sorted(
+                        params.values(), key=lambda p: (not p["required"], p["in"])
+                    ),
+                    "result": _result_fields(operation, components),
+                }
+            )
+
+    return tools
+
+
+def server_tool(tool: Any, tag: str) -> Dict:
+    """
+    Entrada de una tool registrada en el servidor FastMCP (no viene del
+    spec): sin método ni path, los parámetros son argumentos de la tool.
+    """
+    schema = tool.parameters or {}
+    components = schema.get("$defs", {})
+    required = set(schema.get("required", []))
+    return {
+        "name": tool.name,
+        "tag": tag,
+        "method": "MCP",
+        "path": "",
+        "summary": "",
+        "description": _short(tool.description),
+        "parameters": sorted(
+            (
+                {
+                    "name": name,
+                    "in": "argument",
+                    "type": _type_name(prop, components),
+                    "required": name in required,
+                    "description": _short(prop.get("description")),
+                }
+                for name, prop in schema.get("properties", {}).items()
+            ),
+            key=lambda p: not p["required"],
+        ),
+        "result": [],
+    }
+
+
+class ToolIndex:
+    """
+    Índice en construcción. La versión es un hash del formato, del spec ya
+    procesado (con los schemas de respuesta) y de las tools del servidor:
+    cualquier cambio de los YAML, de ALLOWED_TOOLS o de la pipeline que
+    afecte a las tools cambia la versión.
+    """
+
+    def __init__(self):
+        self._digest = hashlib.sha256(f"format:{INDEX_FORMAT}".encode())
+        self.tools: List[Dict] = []
+
+    def _update(self, content: Any) -> None:
+        canonical = json.dumps(content, sort_keys=True, default=str)
+        self._digest.update(hashlib.sha256(canonical.encode()).digest())
+
+    def add_spec(self, spec: Dict) -> None:
+        """Llamar ANTES de quitar los schemas de respuesta del spec"""
+        self._update(spec)
+        self.tools.extend(spec_tools(spec))
+
+    def add_server_tools(self, tools: Iterable[Any], tag: str) -> None:
+        """Tools FastMCP que aún no están en el índice (las del spec se omiten)"""
+        known = {entry["name"] for entry in self.tools}
+        entries = [server_tool(tool, tag) for tool in tools if tool.name not in known]
+        self._update(entries)
+        self.tools.extend(entries)
+
+    @property
+    def version(self) -> str:
+        return self._digest.hexdigest()[:16]
+
+    def build(self) -> Dict:
+        return {
+            "format": INDEX_FORMAT,
+            "version": self.version,
+            "generated_at": int(time.time()),
+            "tools": self.tools,
+        }
+
+    def write(self, path: Path) -> None:
+        """Reescribe el índice solo si cambió la versión"""
+        if read_index_version(path) == self.version:
+            logger.info(f"📚 Tool index v{self.version} is up to date")
+        else:
+            write_tool_index(self.build(), path)
+
+
+def write_tool_index(index: Dict, path: Path) -> None:
+    """Escritura atómica: el servidor OAuth nunca lee un archivo a medias"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+    logger.info(
+        f"📚 Tool index v{index['version']} written: "
+        f"{len(index['tools'])} tools → {path}"
+    )
@@ -1,10 +1,22 @@
+import asyncio
 import json
 import logging
 import re
-from typing import Any
-from urllib.parse import unquote
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import quote, unquote
 
 import httpx
+from src.batch import IDS_PARAM, BatchOperation, fetch_batch, parse_ids
+from src.compaction import Compactor
+from src.lookups import LookupBatcher
+from src.operations import OperationIndex
+from src.pagination import PaginationOptions, collect_pages, records_key
+from src.projection import FIELDS_PARAM, Projector, compile_projector
+from src.rate_limiter import RateLimiter
+from src.result_budget import BUDGET_PARAM, ResultBudget
+from src.scan import plan_scan, scan_pages
+from src.tabular import FORMAT_PARAM, TABLE_FORMATS, choose_columns, encode_table
 
 logger = logging.getLogger(__name__)
 
@@ -26,19 +38,17 @@ def simplify_zoho_response(response_json):
         logger.info(f"📋 List response detected, returning with code converted")
         return response_json
     
-    # Simplificar respuestas de objetos únicos
+    # Simplificar respuestas de objetos únicos: code/message + el objeto
     main_keys = ["contact", "invoice", "item", "bill", "estimate", 
                  "expense", "sales_order", "purchase_order", "payment",
                  "vendor_payment", "user", "project"]
     
     for key in main_keys:
         if key in response_json:
-            main_object = response_json[key]
             simplified = {
                 "code": str(response_json.get("code", 0)),
                 "message": response_json.get("message", "Success"),
-                f"{key}_id": main_object.get(f"{key}_id"),
-                "full_data": main_object
+                key: response_json[key],
             }
             logger.info(f"✂️ Simplified {key} response")
             return simplified
@@ -49,10 +59,79 @@ def simplify_zoho_response(response_json):
 class ZohoAsyncClient(httpx.AsyncClient):
     """Cliente personalizado para Zoho Books API"""
 
+    def __init__(
+        self,
+        *args: Any,
+        credentials_provider: Optional[Callable[[], Dict[str, str]]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        scan_shards: int = 1,
+        operations: Optional[OperationIndex] = None,
+        compactor: Optional[Compactor] = None,
+        table_views: Optional[Dict[str, List[str]]] = None,
+        result_budget: Optional[ResultBudget] = None,
+        batches: Optional[Dict[str, BatchOperation]] = None,
+        batch_concurrency: int = 5,
+        lookups: Optional[LookupBatcher] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        # Si hay proveedor, las credenciales se leen en cada request
+        self._credentials_provider = credentials_provider
+        self._applied_credentials: Optional[tuple] = None
+        # Límite de Zoho por organización, compartido por todas las peticiones
+        self._rate_limiter = rate_limiter
+        # Tramos en paralelo de un scan por fechas (1 = desactivado)
+        self._scan_shards = scan_shards
+        # operationId de cada petición (para métricas por tool)
+        self._operations = operations
+        # Compactación de respuestas (vacíos, defaults, estructuras repetidas)
+        self._compactor = compactor
+        # Columnas por defecto de output_format=table/csv, por operationId
+        self._table_views = table_views or {}
+        # Presupuesto de tamaño de los resultados (resto para fetch_more)
+        self._result_budget = result_budget
+        # Tools get_*_batch: path sintético -> get_* individual
+        self._batches = batches or {}
+        self._batch_concurrency = batch_concurrency
+        # GET por id concurrentes -> una lectura masiva cuando el spec la tiene
+        self._lookups = lookups
+
+    async def _apply_credentials(self) -> None:
+        """
+        Aplica token, organización y dominio de la cuenta activa. El proveedor
+        es síncrono (SQLite, Redis o HTTP al servidor OAuth si el token está
+        por expirar) y se ejecuta en un hilo para no bloquear el event loop.
+        """
+        credentials = await asyncio.to_thread(self._credentials_provider)
+        current = (
+            credentials["access_token"],
+            credentials["organization_id"],
+            credentials["api_domain"],
+        )
+        if current == self._applied_credentials:
+            return
+
+        access_token, organization_id, api_domain = current
+        self.headers["Authorization"] = f"Zoho-oauthtoken {access_token}"
+        self.params = self.params.set("organization_id", organization_id)
+        self.base_url = api_domain
+        self._applied_credentials = current
+        logger.info(f"🔑 Credentials applied for org {organization_id}")
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        if self._rate_limiter is None:
+            return await super().send(request, **kwargs)
+        organization_id = request.url.params.get("organization_id", "")
+        async with self._rate_limiter.slot(organization_id):
+            return await super().send(request, **kwargs)
+
     async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
         logger.info("=" * 80)
         logger.info(f"🔵 {method} {url}")
 
+        if self._credentials_provider is not None:
+            await self._apply_credentials()
+
         # Fix path parameters
         decoded_url = unquote(url)
         placeholders = re.findall(r"\{([^}]+)\}", decoded_url)
@@ -82,7 +161,46 @@ class ZohoAsyncClient(httpx.AsyncClient):
                         except:
                             pass
 
-        response = await super().request(method, url, **kwargs)
+        # Proyección `fields` y formato de salida (se aplican aquí, Zoho no los conoce)
+        projector = None
+        fields = None
+        output_format = None
+        max_result_tokens = None
+        if isinstance(kwargs.get("params"), dict):
+            max_result_tokens = kwargs["params"].pop(BUDGET_PARAM, None)
+            if self._result_budget is not None:
+                self._result_budget.limit_bytes(max_result_tokens)  # valida antes de ir a Zoho
+            fields = kwargs["params"].pop(FIELDS_PARAM, None)
+            if fields:
+                projector = compile_projector(str(fields))
+            output_format = kwargs["params"].pop(FORMAT_PARAM, None)
+            if output_format not in (None, "", "json", *TABLE_FORMATS):
+                raise ValueError(
+                    f"{FORMAT_PARAM} must be json, table or csv, got {output_format!r}"
+                )
+
+        # Auto-paginación opt-in de las tools list_*
+        pagination = None
+        if method.upper() == "GET" and isinstance(kwargs.get("params"), dict):
+            pagination = PaginationOptions.pop_from(kwargs["params"])
+        if pagination is not None and self._result_budget is not None:
+            # No leer de Zoho más de lo que cabe en el resultado: el cursor sigue
+            budget = self._result_budget.limit_bytes(max_result_tokens)
+            if pagination.max_bytes > budget:
+                pagination = replace(pagination, max_bytes=budget)
+
+        batch = self._batches.get(url) if method.upper() == "GET" else None
+        if batch is not None:
+            response = await self._request_batch(url, batch, projector, **kwargs)
+        elif pagination is not None:
+            # Cada página se proyecta antes de contar registros y bytes
+            response = await self._request_pages(
+                method, url, pagination, projector, **kwargs
+            )
+        else:
+            response = await self._get(method, url, **kwargs)
+            if projector is not None:
+                self._project(response, projector)
 
         logger.info(f"📊 Status: {response.status_code}")
 
@@ -94,14 +212,213 @@ class ZohoAsyncClient(httpx.AsyncClient):
             simplified = simplify_zoho_response(response_json)
             
             logger.info(f"📄 Simplified response has 'code': {simplified.get('code')}")
-            
-            # Reemplazar contenido
-            response._content = json.dumps(simplified, ensure_ascii=False).encode("utf-8")
-            logger.info(f"✅ Response content replaced")
-
         except Exception as e:
             logger.error(f"❌ Error simplifying response: {e}")
+            logger.info("=" * 80)
+            return response
+
+        # Tabla / compactación y presupuesto: un ValueError (p. ej. un
+        # max_result_tokens inválido) llega al caller como error de la tool
+        try:
+            response._content = self._encode_response(
+                method,
+                url,
+                response,
+                simplified,
+                fields,
+                output_format,
+                max_result_tokens,
+            )
+            logger.info(f"✅ Response content replaced")
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error encoding response: {e}")
 
         logger.info("=" * 80)
 
         return response
+
+    def _encode_response(
+        self,
+        method: str,
+        url: str,
+        response: httpx.Response,
+        simplified: Any,
+        fields: Optional[str],
+        output_format: Optional[str],
+        max_result_tokens: Any,
+    ) -> bytes:
+        """Contenido final: tabla o JSON compactado, recortado al presupuesto"""
+        tool = self._operations.resolve(method, url) if self._operations else None
+        key = records_key(simplified) if output_format in TABLE_FORMATS else None
+
+        if key is not None and response.is_success:
+            # Tabla / CSV: ya es compacta, los vacíos quedan como celdas null
+            columns = choose_columns(
+                simplified[key], fields, self._table_views.get(tool)
+            )
+
+            def encode(payload: Any) -> bytes:
+                return encode_table(payload, key, columns, output_format)
+
+            def encode_items(path: tuple, items: List[Any]) -> Any:
+                """Resto para fetch_more, en el mismo formato"""
+                if path != (key,):
+                    return items
+                return json.loads(encode({key: items}))[key]
+
+            logger.info(f"📊 {len(simplified[key])} {key} as {output_format}")
+            content = encode(simplified)
+        else:
+            encode_items = None
+            compact = self._compactor is not None and self._compactor.enabled
+
+            def encode(payload: Any) -> bytes:
+                return json.dumps(
+                    payload,
+                    ensure_ascii=False,
+                    separators=(",", ":") if compact else None,
+                ).encode("utf-8")
+
+            if compact:
+                # Compactar (una pasada) antes de serializar; las métricas
+                # miden solo esta etapa: JSON sin compactar -> compactado
+                bytes_in = len(
+                    json.dumps(simplified, ensure_ascii=False).encode("utf-8")
+                )
+                simplified = self._compactor.compact(simplified)
+                content = encode(simplified)
+                self._compactor.record(tool, bytes_in, len(content))
+            else:
+                content = encode(simplified)
+
+        # Recortado si supera el presupuesto
+        if self._result_budget is not None and response.is_success:
+            content = self._result_budget.fit(
+                simplified, content, max_result_tokens, encode, encode_items
+            )
+        return content
+
+    @staticmethod
+    def _project(response: httpx.Response, projector: Projector) -> None:
+        """Reemplaza el cuerpo de una respuesta correcta por su proyección"""
+        if not response.is_success:
+            return
+        try:
+            payload = response.json()
+        except ValueError:
+            return  # No es JSON (PDF...): nada que proyectar
+        projected = projector(payload)
+        response._content = json.dumps(projected, ensure_ascii=False).encode("utf-8")
+
+    async def _get(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Petición a Zoho; los GET por id sin más parámetros pasan por el batcher"""
+        match = None
+        if (
+            self._lookups is not None
+            and self._lookups.enabled
+            and method.upper() == "GET"
+            and not kwargs.get("params")
+            and kwargs.get("json") is None
+        ):
+            match = self._lookups.match(url)
+        if match is None:
+            return await super().request(method, url, **kwargs)
+
+        lookup, record_id = match
+        send = super().request
+
+        async def fetch_many(ids: List[str]) -> httpx.Response:
+            return await send(
+                "GET", lookup.list_path, params={lookup.ids_param: ",".join(ids)}
+            )
+
+        async def fetch_one() -> httpx.Response:
+            return await send(method, url, **kwargs)
+
+        return await self._lookups.load(
+            lookup,
+            self.params.get("organization_id", ""),
+            record_id,
+            self.build_request(method, url),
+            fetch_many,
+            fetch_one,
+        )
+
+    async def _request_batch(
+        self,
+        url: str,
+        batch: BatchOperation,
+        projector: Optional[Projector] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """GET individual de cada id en paralelo, combinados en una respuesta"""
+        params = dict(kwargs.pop("params", None) or {})
+        ids = parse_ids(params.pop(IDS_PARAM, None))
+
+        async def fetch_one(record_id: str) -> httpx.Response:
+            record_url = batch.path.replace(
+                f"{{{batch.id_param}}}", quote(record_id, safe="")
+            )
+            response = await self._get("GET", record_url, params=params, **kwargs)
+            if projector is not None:
+                self._project(response, projector)
+            return response
+
+        # Con lectura masiva los GET se agrupan: no limitar cuántos esperan
+        concurrency = self._batch_concurrency
+        if self._lookups is not None and self._lookups.enabled and not params:
+            if self._lookups.match(batch.path) is not None:
+                concurrency = len(ids)
+
+        logger.info(f"📦 {len(ids)} {batch.key} from {batch.path}")
+        return await fetch_batch(
+            fetch_one,
+            ids,
+            batch.key,
+            self.build_request("GET", url, params=params),
+            concurrency,
+        )
+
+    async def _request_pages(
+        self,
+        method: str,
+        url: str,
+        options: PaginationOptions,
+        projector: Optional[Projector] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Recorre las páginas de un list_* y devuelve la respuesta combinada"""
+        params = kwargs.pop("params")
+
+        async def fetch_page(
+            page: int, per_page: int, shard_params: Optional[Dict[str, Any]] = None
+        ) -> httpx.Response:
+            logger.info(f"📑 {url} page {page} {shard_params or ''}")
+            response = await super(ZohoAsyncClient, self).request(
+                method,
+                url,
+                params={
+                    **params,
+                    **(shard_params or {}),
+                    "page": page,
+                    "per_page": per_page,
+                },
+                **kwargs,
+            )
+            if projector is not None:
+                self._project(response, projector)
+            return response
+
+        # Con date_start/date_end el rango se recorre en tramos paralelos
+        plan = plan_scan(params, options, self._scan_shards)
+        if plan is not None:
+            return await scan_pages(
+                lambda shard_params, page, per_page: fetch_page(
+                    page, per_page, shard_params
+                ),
+                options,
+                plan,
+            )
+        return await collect_pages(fetch_page, options)
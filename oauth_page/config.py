@@ -15,6 +15,22 @@ ZOHO_REDIRECT_URI = os.getenv("ZOHO_REDIRECT_URI")
 OAUTH_PORT = int(os.getenv("OAUTH_PORT", "8081"))
 MCP_PORT = int(os.getenv("MCP_PORT", "8080"))
 
+# Refresco de tokens en segundo plano
+TOKEN_REFRESH_MARGIN = int(os.getenv("TOKEN_REFRESH_MARGIN", "600"))  # segundos
+TOKEN_REFRESH_CONCURRENCY = int(os.getenv("TOKEN_REFRESH_CONCURRENCY", "4"))
+TOKEN_REFRESH_RESYNC = int(os.getenv("TOKEN_REFRESH_RESYNC", "60"))  # segundos
+
+# Flush en lote de last_used (segundos)
+LAST_USED_FLUSH_INTERVAL = int(os.getenv("LAST_USED_FLUSH_INTERVAL", "30"))
+
+# Descubrimiento del túnel ngrok en segundo plano
+NGROK_REFRESH_INTERVAL = int(os.getenv("NGROK_REFRESH_INTERVAL", "30"))  # segundos
+
+# Índice de tools que escribe el servidor MCP (para /tools/docs)
+TOOL_INDEX_PATH = Path(
+    os.getenv("TOOL_INDEX_PATH", str(Path(__file__).parent / "tool_index.json"))
+)
+
 REGION_DISPLAY = {
     "com": "🌍 Global (.com)",
     "in": "🇮🇳 India (.in)",
@@ -1,5 +1,7 @@
+import asyncio
 import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -7,19 +9,63 @@ from fastapi import FastAPI
 # Add parent directory (project root) to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from config import LAST_USED_FLUSH_INTERVAL
+from src.auth import wait_for_refreshes
+from src.http_clients import get_http_clients
 from src.routes import setup_routes
+from src.scheduler import TokenRefreshScheduler
+from src.utils import watch_ngrok_public_url
 
-from shared.token_db import get_db
+from shared.token_db import AsyncTokenDB, get_db
 
 # Load env vars
 MCP_PORT = int(os.getenv("MCP_PORT", "8080"))
 OAUTH_PORT = int(os.getenv("OAUTH_PORT", "8081"))
 
-# Initialize FastAPI app
-app = FastAPI()
+# Initialize database (async API, queries run on a dedicated DB thread)
+db = AsyncTokenDB(get_db())
+
+# Background token refresh for all accounts
+scheduler = TokenRefreshScheduler(db)
+
+
+async def flush_last_used_periodically():
+    """Persist buffered last_used timestamps in batches"""
+    while True:
+        await asyncio.sleep(LAST_USED_FLUSH_INTERVAL)
+        try:
+            await db.flush_last_used()
+        except Exception as e:
+            print(f"⚠️ last_used flush failed: {e}")
 
-# Initialize database
-db = get_db()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    http_clients = get_http_clients()  # Pooled clients for Zoho and ngrok
+    scheduler.start()
+    # Changes from this or other replicas (new accounts, refreshed tokens).
+    # Our own token refreshes are skipped: the scheduler already reschedules them
+    loop = asyncio.get_running_loop()
+    unsubscribe = db.subscribe(
+        lambda event, user_id: loop.call_soon_threadsafe(scheduler.request_resync),
+        ignore_local=("tokens",),
+    )
+    ngrok_watcher = asyncio.create_task(watch_ngrok_public_url())
+    last_used_flusher = asyncio.create_task(flush_last_used_periodically())
+    yield
+    unsubscribe()
+    ngrok_watcher.cancel()
+    last_used_flusher.cancel()
+    await asyncio.gather(ngrok_watcher, last_used_flusher, return_exceptions=True)
+    await db.flush_last_used()
+    await scheduler.stop()
+    await wait_for_refreshes()
+    await http_clients.close()
+    db.close()
+
+
+# Initialize FastAPI app
+app = FastAPI(lifespan=lifespan)
 
 # Setup routes
 setup_routes(app, db)
@@ -1,9 +1,9 @@
+import asyncio
 import secrets
+import time
 import traceback
-from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
 
-import httpx
 from config import (
     MCP_PORT,
     ZOHO_CLIENT_ID,
@@ -12,6 +12,7 @@ from config import (
 )
 from fastapi import Request
 from fastapi.responses import HTMLResponse
+from src.http_clients import get_http_clients
 from src.templates import (
     render_error_page,
     render_setup_required_page,
@@ -22,93 +23,79 @@ from src.utils import extract_region_from_domain, get_base_url
 
 async def exchange_code_for_tokens(code: str) -> Dict:
     """Exchange authorization code for access tokens"""
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            "https://accounts.zoho.com/oauth/v2/token",
-            data={
-                "grant_type": "authorization_code",
-                "client_id": ZOHO_CLIENT_ID,
-                "client_secret": ZOHO_CLIENT_SECRET,
-                "redirect_uri": ZOHO_REDIRECT_URI,
-                "code": code,
-            },
-        )
+    client = get_http_clients().accounts
+    resp = await client.post(
+        "/oauth/v2/token",
+        data={
+            "grant_type": "authorization_code",
+            "client_id": ZOHO_CLIENT_ID,
+            "client_secret": ZOHO_CLIENT_SECRET,
+            "redirect_uri": ZOHO_REDIRECT_URI,
+            "code": code,
+        },
+    )
 
-        if resp.status_code != 200:
-            error_data = (
-                resp.json()
-                if resp.headers.get("content-type") == "application/json"
-                else resp.text
-            )
-            raise Exception(f"Token exchange failed: {error_data}")
+    if resp.status_code != 200:
+        error_data = (
+            resp.json()
+            if resp.headers.get("content-type") == "application/json"
+            else resp.text
+        )
+        raise Exception(f"Token exchange failed: {error_data}")
 
-        tokens = resp.json()
+    tokens = resp.json()
 
-        # Check if we got an error in the token response
-        if "error" in tokens:
-            raise Exception(f"Zoho OAuth error: {tokens.get('error')}")
+    # Check if we got an error in the token response
+    if "error" in tokens:
+        raise Exception(f"Zoho OAuth error: {tokens.get('error')}")
 
-        return tokens
+    return tokens
 
 
 async def get_organization_data(api_domain: str, access_token: str) -> Optional[Dict]:
     """Get organization data from Zoho Books API"""
-    async with httpx.AsyncClient() as client:
-        org_resp = await client.get(
-            f"{api_domain}/books/v3/organizations",
-            headers={"Authorization": f"Zoho-oauthtoken {access_token}"},
-        )
+    client = get_http_clients().api
+    org_resp = await client.get(
+        f"{api_domain}/books/v3/organizations",
+        headers={"Authorization": f"Zoho-oauthtoken {access_token}"},
+    )
 
-        if org_resp.status_code != 200:
-            error_data = (
-                org_resp.json()
-                if org_resp.headers.get("content-type") == "application/json"
-                else org_resp.text
-            )
-            raise Exception(
-                f"Failed to get organization (status {org_resp.status_code}): {error_data}"
-            )
+    if org_resp.status_code != 200:
+        error_data = (
+            org_resp.json()
+            if org_resp.headers.get("content-type") == "application/json"
+            else org_resp.text
+        )
+        raise Exception(
+            f"Failed to get organization (status {org_resp.status_code}): {error_data}"
+        )
 
-        org_response = org_resp.json()
+    org_response = org_resp.json()
 
-        # Check if we have organizations
-        if "organizations" not in org_response or not org_response["organizations"]:
-            return None
+    # Check if we have organizations
+    if "organizations" not in org_response or not org_response["organizations"]:
+        return None
 
-        return org_response["organizations"][0]
+    return org_response["organizations"][0]
 
 
-def check_duplicate_organization(
+async def check_duplicate_organization(
     db, organization_id: str
 ) -> Tuple[bool, Optional[str]]:
     """
     Check if organization already exists.
     Returns: (is_duplicate, company_name)
     """
-    conn = db._get_conn()
-    cursor = conn.execute(
-        "SELECT user_id, company_name FROM users WHERE organization_id = ? AND is_active >= 0",
-        (organization_id,),
-    )
-    existing = cursor.fetchone()
+    existing = await db.find_by_organization(organization_id)
 
     if existing:
-        return True, existing[1]
+        return True, existing["company_name"]
     return False, None
 
 
-def save_and_activate_account(db, user_id: str, account_data: Dict) -> None:
-    """Save account and set as active"""
-    # Save account
-    db.save_user(user_id, account_data)
-
-    # Ensure only ONE account is active
-    conn = db._get_conn()
-    # First, deactivate all accounts
-    conn.execute("UPDATE users SET is_active = 0 WHERE is_active >= 0")
-    # Then activate the new account
-    conn.execute("UPDATE users SET is_active = 1 WHERE user_id = ?", (user_id,))
-    conn.commit()
+async def save_and_activate_account(db, user_id: str, account_data: Dict) -> None:
+    """Save account and set as active (ensures only ONE account is active)"""
+    await db.save_and_activate(user_id, account_data)
 
 
 async def process_oauth_callback(
@@ -138,7 +125,7 @@ async def process_oauth_callback(
         organization_id = org_data["organization_id"]
 
         # Step 5: Check for duplicates
-        is_duplicate, existing_company = check_duplicate_organization(
+        is_duplicate, existing_company = await check_duplicate_organization(
             db, organization_id
         )
         if is_duplicate:
@@ -155,18 +142,16 @@ async def process_oauth_callback(
         account_data = {
             "access_token": tokens["access_token"],
             "refresh_token": tokens["refresh_token"],
-            "expires_at": (
-                datetime.now() + timedelta(seconds=tokens["expires_in"])
-            ).isoformat(),
+            "expires_at": int(time.time()) + tokens["expires_in"],
             "organization_id": organization_id,
             "api_domain": api_domain,
             "region": region,
-            "connected_at": datetime.now().isoformat(),
+            "connected_at": int(time.time()),
             "email": org_data.get("email", ""),
             "company_name": org_data.get("name", ""),
         }
 
-        save_and_activate_account(db, user_id, account_data)
+        await save_and_activate_account(db, user_id, account_data)
         print(f"✅ Account connected: {org_data.get('name')} ({organization_id})")
 
         # Step 7: Build MCP URL and return success page
@@ -203,35 +188,96 @@ def generate_auth_url() -> Tuple[str, str]:
     return auth_url, user_id
 
 
+# Single-flight: un solo refresh en curso por cuenta
+_refresh_in_flight: Dict[str, asyncio.Task] = {}
+
+
+async def _post_refresh_grant(db, account: Dict) -> Dict:
+    """POST the refresh_token grant to Zoho and persist the new token"""
+    # El caller pudo leer la fila antes de que otro refresh la actualizara:
+    # si ya hay un token más nuevo (o la cuenta ya no existe) no se pide otro
+    current = await db.get_account(account["user_id"])
+    if not current:
+        raise Exception(f"Account {account['user_id']} no longer exists")
+    if current["expires_at"] > account["expires_at"]:
+        return {
+            "access_token": current["access_token"],
+            "expires_at": current["expires_at"],
+        }
+
+    client = get_http_clients().accounts
+    resp = await client.post(
+        "/oauth/v2/token",
+        data={
+            "grant_type": "refresh_token",
+            "client_id": ZOHO_CLIENT_ID,
+            "client_secret": ZOHO_CLIENT_SECRET,
+            "refresh_token": current["refresh_token"],
+        },
+    )
+
+    if resp.status_code != 200:
+        raise Exception(f"Token refresh failed: {resp.status_code} - {resp.text}")
+
+    new_tokens = resp.json()
+    if "error" in new_tokens:
+        raise Exception(f"Zoho OAuth error: {new_tokens.get('error')}")
+
+    new_expires = int(time.time()) + new_tokens["expires_in"]
+    refreshed = {"access_token": new_tokens["access_token"], "expires_at": new_expires}
+
+    # Compare-and-set: si otra réplica ya guardó un token nuevo, usamos ese
+    stored = await db.update_tokens(
+        account["user_id"],
+        new_tokens["access_token"],
+        new_expires,
+        expected_expires_at=current["expires_at"],
+    )
+    if not stored:
+        current = await db.get_account(account["user_id"])
+        if current:
+            refreshed = {
+                "access_token": current["access_token"],
+                "expires_at": current["expires_at"],
+            }
+
+    return refreshed
+
+
+async def refresh_access_token(db, account: Dict) -> Dict:
+    """
+    Refresh the access token using the account's refresh_token grant.
+    Persists the new token and returns the updated account dict.
+    Concurrent callers for the same account share a single request to Zoho.
+    Raises Exception if Zoho rejects the refresh.
+    """
+    user_id = account["user_id"]
+    task = _refresh_in_flight.get(user_id)
+    if task is None:
+        task = asyncio.create_task(_post_refresh_grant(db, dict(account)))
+        _refresh_in_flight[user_id] = task
+        task.add_done_callback(lambda _: _refresh_in_flight.pop(user_id, None))
+
+    # shield: si un caller se cancela, el refresh compartido sigue
+    account.update(await asyncio.shield(task))
+    return account
+
+
+async def wait_for_refreshes() -> None:
+    """Espera los refresh en curso (al apagar, antes de cerrar clientes y base)"""
+    await asyncio.gather(*list(_refresh_in_flight.values()), return_exceptions=True)
+
+
 async def refresh_token_if_needed(db, account: Dict) -> Dict:
     """
     Refresh access token if it's about to expire.
     Returns updated account dict.
     """
-    expires_at = datetime.fromisoformat(account["expires_at"])
-
     # Refresh if token expires in less than 5 minutes
-    if datetime.now() + timedelta(minutes=5) >= expires_at:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                "https://accounts.zoho.com/oauth/v2/token",
-                data={
-                    "grant_type": "refresh_token",
-                    "client_id": ZOHO_CLIENT_ID,
-                    "client_secret": ZOHO_CLIENT_SECRET,
-                    "refresh_token": account["refresh_token"],
-                },
-            )
-            if resp.status_code == 200:
-                new_tokens = resp.json()
-                new_expires = (
-                    datetime.now() + timedelta(seconds=new_tokens["expires_in"])
-                ).isoformat()
-                db.update_tokens(
-                    account["user_id"], new_tokens["access_token"], new_expires
-                )
-                account["access_token"] = new_tokens["access_token"]
-            else:
-                print(f"⚠️ Token refresh failed: {resp.status_code} - {resp.text}")
+    if time.time() + 300 >= account["expires_at"]:
+        try:
+            account = await refresh_access_token(db, account)
+        except Exception as e:
+            print(f"⚠️ {e}")
 
     return account
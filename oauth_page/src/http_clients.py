@@ -0,0 +1,75 @@
+from typing import Optional
+
+import httpx
+
+# HTTP/2 solo si el paquete opcional `h2` está instalado (httpx[http2])
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+ZOHO_ACCOUNTS_URL = "https://accounts.zoho.com"
+
+# Timeouts y pools ajustados por destino
+ZOHO_TIMEOUT = httpx.Timeout(connect=5.0, read=20.0, write=10.0, pool=5.0)
+NGROK_TIMEOUT = httpx.Timeout(1.0)
+ZOHO_LIMITS = httpx.Limits(
+    max_connections=50, max_keepalive_connections=10, keepalive_expiry=120.0
+)
+NGROK_LIMITS = httpx.Limits(max_connections=4, max_keepalive_connections=2)
+
+
+class HTTPClients:
+    """
+    Clientes httpx compartidos del servidor OAuth.
+
+    Se abren en el lifespan de FastAPI y se reutilizan en cada callback OAuth,
+    refresh de token o consulta a ngrok, manteniendo conexiones TLS calientes.
+    """
+
+    def __init__(self):
+        self.accounts: Optional[httpx.AsyncClient] = None
+        self.api: Optional[httpx.AsyncClient] = None
+        self.ngrok: Optional[httpx.AsyncClient] = None
+
+    def start(self) -> None:
+        if self.accounts is not None:
+            return
+
+        # accounts.zoho.com: token exchange y refresh
+        self.accounts = httpx.AsyncClient(
+            base_url=ZOHO_ACCOUNTS_URL,
+            http2=HTTP2_AVAILABLE,
+            timeout=ZOHO_TIMEOUT,
+            limits=ZOHO_LIMITS,
+        )
+        # Dominios regionales (www.zohoapis.com, .eu, .in, ...): un pool por host
+        self.api = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE, timeout=ZOHO_TIMEOUT, limits=ZOHO_LIMITS
+        )
+        # API local de ngrok: timeouts cortos, nunca debe frenar al dashboard
+        self.ngrok = httpx.AsyncClient(timeout=NGROK_TIMEOUT, limits=NGROK_LIMITS)
+
+    async def close(self) -> None:
+        for client in (self.accounts, self.api, self.ngrok):
+            if client is not None:
+                await client.aclose()
+        self.accounts = self.api = self.ngrok = None
+
+
+# -------------------------
+#   SINGLETON GLOBAL
+# -------------------------
+
+_clients = HTTPClients()
+
+
+def get_http_clients() -> HTTPClients:
+    """
+    Obtiene los clientes compartidos.
+    Si el lifespan aún no los abrió (scripts, tests), se abren al vuelo.
+    """
+    _clients.start()
+    return _clients
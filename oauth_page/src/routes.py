@@ -1,91 +1,88 @@
-import sqlite3
-from datetime import datetime
+from typing import Optional
 
 from config import MCP_PORT
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from src.auth import (
     generate_auth_url,
     process_oauth_callback,
     refresh_token_if_needed,
 )
-from src.docs import render_tools_docs_page  # Importa la nueva función
-from src.templates import render_home_page
-from src.utils import get_base_url, get_ngrok_public_url
+from src.docs import ToolDocs
+from src.templates import STYLE_ASSET, render_home_page
+from src.utils import get_base_url, get_cached_ngrok_url
 
+from shared.token_db import AsyncTokenDB
 
-def setup_routes(app: FastAPI, db):
+
+def setup_routes(app: FastAPI, db: AsyncTokenDB):
     """Configure all application routes"""
 
+    # Docs de tools: se renderizan y comprimen una vez por versión del spec
+    tool_docs = ToolDocs()
+    tool_docs.asset()
+
     @app.get("/")
     async def home(request: Request):
-        """Dashboard showing all connected accounts"""
-        conn = db._get_conn()
-
-        # Get all accounts (excluding deleted ones)
-        cursor = conn.execute("""
-            SELECT * FROM users
-            WHERE is_active >= 0
-            ORDER BY is_active DESC, last_used DESC, connected_at DESC
-        """)
-        accounts = [dict(row) for row in cursor.fetchall()]
-
-        # Get active account
-        cursor = conn.execute("SELECT * FROM users WHERE is_active = 1")
-        row = cursor.fetchone()
-        active_account = dict(row) if row else None
+        """Dashboard: the account list is fetched page by page from /accounts"""
+        active_account = await db.get_active_account()
 
         # Construir MCP URL automáticamente
         base_url = get_base_url(request)
         mcp_url = f"{base_url}:{MCP_PORT}/mcp"
 
         # Si hay un tunnel ngrok activo, usar esa URL en vez de localhost
-        ngrok_url = get_ngrok_public_url()
+        ngrok_url = get_cached_ngrok_url()
         if ngrok_url:
             mcp_url = f"{ngrok_url}/mcp"
 
-        return HTMLResponse(render_home_page(accounts, active_account, mcp_url))
+        return HTMLResponse(render_home_page(active_account, mcp_url))
+
+    @app.get("/accounts")
+    async def list_accounts(
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = None,
+        q: Optional[str] = Query(None, max_length=100),
+    ):
+        """
+        Paginated accounts (keyset): active first, then newest connection.
+        Pass `next_cursor` back as `cursor` for the next page; `q` searches
+        company name and email. `total` is only sent with the first page.
+        """
+        search = q.strip() if q else None
+        try:
+            page = await db.page_accounts(limit, cursor, search)
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
+
+        if cursor is None:
+            page["total"] = await db.count_accounts(search)
+        return page
 
     @app.get("/tools/docs")  # Nueva ruta para la documentación
-    async def tools_docs():
-        """Render the MCP Tools Documentation page"""
-        return HTMLResponse(render_tools_docs_page())
+    async def tools_docs(request: Request):
+        """MCP Tools Documentation page (prerendered, ETag + gzip)"""
+        return tool_docs.asset().response(request)
+
+    @app.get("/static/style.css")
+    async def base_style(request: Request):
+        """Shared stylesheet, versioned by content hash"""
+        return STYLE_ASSET.response(request)
 
     @app.post("/account/{user_id}/activate")
     async def activate_account(user_id: str):
         """Set an account as active"""
-        conn = db._get_conn()
-
-        # Check if account exists
-        cursor = conn.execute(
-            "SELECT 1 FROM users WHERE user_id = ? AND is_active >= 0", (user_id,)
-        )
-        if not cursor.fetchone():
+        if not await db.activate(user_id):
             raise HTTPException(404, "Account not found")
 
-        # Deactivate all accounts first
-        conn.execute("UPDATE users SET is_active = 0 WHERE is_active >= 0")
-
-        # Activate selected account
-        conn.execute("UPDATE users SET is_active = 1 WHERE user_id = ?", (user_id,))
-        conn.commit()
-
         return {"success": True, "message": "Account activated"}
 
     @app.delete("/account/{user_id}")
     async def delete_account(user_id: str):
         """Delete an account"""
-        conn = db._get_conn()
-
-        cursor = conn.execute(
-            "SELECT 1 FROM users WHERE user_id = ? AND is_active >= 0", (user_id,)
-        )
-        if not cursor.fetchone():
-            raise HTTPException(404, "Account not found")
-
         # Mark as deleted (soft delete with is_active = -1)
-        conn.execute("UPDATE users SET is_active = -1 WHERE user_id = ?", (user_id,))
-        conn.commit()
+        if not await db.soft_delete(user_id):
+            raise HTTPException(404, "Account not found")
 
         return {"success": True, "message": "Account deleted"}
 
@@ -101,30 +98,26 @@ def setup_routes(app: FastAPI, db):
         user_id = state
         return await process_oauth_callback(code, user_id, request, db)
 
+    @app.get("/metrics/db")
+    async def db_metrics():
+        """TokenDB connection pool metrics (checkouts and wait times)"""
+        return db.pool_stats()
+
     @app.get("/token")
     async def get_token():
         """Get token for active account - used by MCP server"""
-        conn = db._get_conn()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.execute("SELECT * FROM users WHERE is_active = 1")
-        row = cursor.fetchone()
+        account = await db.get_active_account()
 
-        if not row:
+        if not account:
             raise HTTPException(
                 404, "No active account found. Please select an account."
             )
 
-        account = dict(row)
-
         # Refresh token if needed
         account = await refresh_token_if_needed(db, account)
 
-        # Update last used
-        conn.execute(
-            "UPDATE users SET last_used = ? WHERE user_id = ?",
-            (datetime.now().isoformat(), account["user_id"]),
-        )
-        conn.commit()
+        # Update last used (write-behind, flushed in batches)
+        db.touch(account["user_id"])
 
         return {
             "access_token": account["access_token"],
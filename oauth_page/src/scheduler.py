@@ -0,0 +1,191 @@
+import asyncio
+import heapq
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    TOKEN_REFRESH_CONCURRENCY,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_REFRESH_RESYNC,
+)
+from src.auth import refresh_access_token
+
+# Backoff tras un refresh fallido (segundos)
+BACKOFF_BASE = 30
+BACKOFF_MAX = 3600
+
+
+class TokenRefreshScheduler:
+    """
+    Refresca en segundo plano los tokens de TODAS las cuentas conectadas.
+
+    Mantiene un min-heap ordenado por el momento en que cada token debe
+    refrescarse (expires_at - margin). Solo despierta cuando vence el primero,
+    refresca con concurrencia acotada y aplica backoff exponencial si falla.
+    Así /token siempre encuentra un token listo.
+    """
+
+    def __init__(
+        self,
+        db,
+        margin: int = TOKEN_REFRESH_MARGIN,
+        concurrency: int = TOKEN_REFRESH_CONCURRENCY,
+        resync_interval: int = TOKEN_REFRESH_RESYNC,
+    ):
+        self.db = db
+        self.margin = margin
+        self.resync_interval = resync_interval
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}  # user_id -> timestamp de refresco
+        # user_id -> (fallos seguidos, expires_at del token que falló)
+        self._failures: Dict[str, Tuple[int, int]] = {}
+        self._in_flight: set = set()
+        self._tasks: set = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_resync = 0.0
+
+    # -------------------------
+    #   PROGRAMACIÓN
+    # -------------------------
+
+    def schedule(self, user_id: str, expires_at: int) -> None:
+        """Programa (o reprograma) el refresco de una cuenta"""
+        due = expires_at - self.margin
+        self._push(user_id, due)
+
+    def _push(self, user_id: str, due: float) -> None:
+        self._due[user_id] = due
+        heapq.heappush(self._heap, (due, user_id))
+        # Si es el nuevo mínimo, despertar el loop para recalcular la espera
+        if self._heap[0][1] == user_id:
+            self._wakeup.set()
+
+    def request_resync(self) -> None:
+        """
+        Forzar un resync en la próxima vuelta del loop (cambios en el store).
+        Llamar desde el event loop: desde otros hilos usar call_soon_threadsafe.
+        """
+        self._last_resync = 0.0
+        self._wakeup.set()
+
+    async def _resync(self) -> None:
+        """Sincroniza el heap con la base de datos (altas, bajas y refrescos externos)"""
+        rows = {
+            row["user_id"]: row["expires_at"]
+            for row in await self.db.list_expirations()
+        }
+
+        # Cuentas eliminadas: el heap las descarta al sacarlas
+        for user_id in list(self._due):
+            if user_id not in rows:
+                self._due.pop(user_id, None)
+                self._failures.pop(user_id, None)
+
+        for user_id, expires_at in rows.items():
+            if user_id in self._in_flight:
+                continue
+            if user_id in self._failures:
+                # Sigue en backoff salvo que el token haya cambiado (re-autorizada)
+                if self._failures[user_id][1] == expires_at:
+                    continue
+                del self._failures[user_id]
+            due = expires_at - self.margin
+            if self._due.get(user_id) != due:
+                self._push(user_id, due)
+
+        self._last_resync = time.time()
+
+    def _pop_due(self, now: float) -> List[str]:
+        """Saca del heap todas las cuentas vencidas (descarta entradas obsoletas)"""
+        ready = []
+        while self._heap and self._heap[0][0] <= now:
+            due, user_id = heapq.heappop(self._heap)
+            if self._due.get(user_id) != due:
+                continue
+            del self._due[user_id]
+            ready.append(user_id)
+        return ready
+
+    # -------------------------
+    #   REFRESCO
+    # -------------------------
+
+    async def _refresh(self, user_id: str) -> None:
+        async with self._semaphore:
+            account = None
+            try:
+                account = await self.db.get_account(user_id)
+                if not account:
+                    return
+                account = await refresh_access_token(self.db, account)
+                self._failures.pop(user_id, None)
+                self.schedule(user_id, account["expires_at"])
+                print(f"🔄 Token refreshed in background: {user_id}")
+            except Exception as e:
+                failures = self._failures.get(user_id, (0, 0))[0] + 1
+                expires_at = account["expires_at"] if account else 0
+                self._failures[user_id] = (failures, expires_at)
+                delay = min(BACKOFF_BASE * 2 ** (failures - 1), BACKOFF_MAX)
+                delay += random.uniform(0, delay / 10)
+                self._push(user_id, time.time() + delay)
+                print(
+                    f"⚠️ Background refresh failed for {user_id} "
+                    f"(attempt {failures}, retry in {int(delay)}s): {e}"
+                )
+            finally:
+                self._in_flight.discard(user_id)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                now = time.time()
+                if now - self._last_resync >= self.resync_interval:
+                    await self._resync()
+
+                for user_id in self._pop_due(now):
+                    self._in_flight.add(user_id)
+                    task = asyncio.create_task(self._refresh(user_id))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+                # Dormir hasta el próximo vencimiento o el próximo resync
+                timeout = self._last_resync + self.resync_interval - time.time()
+                if self._heap:
+                    timeout = min(timeout, self._heap[0][0] - time.time())
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(timeout, 0))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Token scheduler error: {e}")
+                await asyncio.sleep(self.resync_interval)
+
+    # -------------------------
+    #   CICLO DE VIDA
+    # -------------------------
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            print(f"⏱️ Token refresh scheduler started (margin {self.margin}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Esperar a los refrescos cancelados: si no, el grant (bajo shield)
+        # podría escribir después de cerrar los clientes HTTP y la base
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
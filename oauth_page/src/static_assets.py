@@ -0,0 +1,98 @@
+import gzip
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Brotli solo si el paquete opcional `brotli` está instalado
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# URLs versionadas (?v=hash): el contenido nunca cambia para esa URL
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+# URLs fijas: el navegador revalida siempre y recibe un 304 si no cambió
+CACHE_REVALIDATE = "no-cache"
+
+# Debajo de esto comprimir no compensa las cabeceras extra
+MIN_COMPRESS_SIZE = 512
+
+
+class StaticAsset:
+    """
+    Respuesta precalculada: el cuerpo se comprime una sola vez (gzip y, si
+    está disponible, Brotli) y se sirve con ETag fuerte y Cache-Control.
+    Cada petición solo negocia la codificación y compara el ETag.
+    """
+
+    def __init__(
+        self, body: bytes, media_type: str, cache_control: str = CACHE_REVALIDATE
+    ):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.version = hashlib.sha256(body).hexdigest()[:16]
+
+        # codificación -> (cuerpo, ETag); cada representación tiene su ETag
+        self._variants: Dict[str, Tuple[bytes, str]] = {
+            "identity": (body, f'"{self.version}"')
+        }
+        if len(body) >= MIN_COMPRESS_SIZE:
+            if BROTLI_AVAILABLE:
+                self._variants["br"] = (
+                    brotli.compress(body, quality=11),
+                    f'"{self.version}-br"',
+                )
+            self._variants["gzip"] = (
+                gzip.compress(body, compresslevel=9, mtime=0),
+                f'"{self.version}-gz"',
+            )
+
+    @classmethod
+    def html(cls, html: str, cache_control: str = CACHE_REVALIDATE) -> "StaticAsset":
+        return cls(html.encode("utf-8"), "text/html; charset=utf-8", cache_control)
+
+    def _negotiate(self, accept_encoding: str) -> str:
+        accepted = set()
+        for token in accept_encoding.lower().split(","):
+            name, _, params = token.partition(";")
+            q = params.strip().removeprefix("q=")
+            try:
+                if params and float(q) <= 0:
+                    continue
+            except ValueError:
+                pass
+            accepted.add(name.strip())
+
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self._variants:
+                return encoding
+        return "identity"
+
+    def _not_modified(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        # Mismo contenido en cualquier codificación: todas las variantes valen
+        return any(etag in etags for _, etag in self._variants.values())
+
+    def response(self, request: Request) -> Response:
+        encoding = self._negotiate(request.headers.get("accept-encoding", ""))
+        body, etag = self._variants[encoding]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if self._not_modified(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type=self.media_type, headers=headers)
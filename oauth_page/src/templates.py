@@ -1,13 +1,16 @@
-from typing import Dict, List, Optional
+import json
+from typing import Dict, Optional
 
 from config import REGION_DISPLAY
+from src.static_assets import CACHE_IMMUTABLE, StaticAsset
 from src.utils import get_ngrok_public_url
 
+# Cuentas por página en el dashboard
+ACCOUNTS_PAGE_SIZE = 20
 
-def get_base_style() -> str:
-    """Dark theme CSS - GitHub inspired"""
-    return """
-        <style>
+
+# Dark theme CSS - GitHub inspired (servido como /static/style.css)
+BASE_CSS = """
             * { margin: 0; padding: 0; box-sizing: border-box; }
             body {
                 font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
@@ -195,14 +198,36 @@ def get_base_style() -> str:
                 margin: 10px 0;
                 line-height: 1.6;
             }
+            .search-input {
+                width: 100%;
+                padding: 10px 14px;
+                margin: 10px 0 15px;
+                background: #0d1117;
+                border: 1px solid #30363d;
+                border-radius: 6px;
+                color: #c9d1d9;
+                font-size: 14px;
+            }
+            .search-input:focus {
+                outline: none;
+                border-color: #58a6ff;
+            }
             a { color: #58a6ff; text-decoration: none; }
             a:hover { text-decoration: underline; }
 
             @media (max-width: 768px) {
                 .grid { grid-template-columns: 1fr; }
             }
-        </style>
-    """
+"""
+
+STYLE_ASSET = StaticAsset(
+    BASE_CSS.encode("utf-8"), "text/css; charset=utf-8", CACHE_IMMUTABLE
+)
+
+
+def get_base_style() -> str:
+    """Link to the shared stylesheet (versioned URL, cached by the browser)"""
+    return f'<link rel="stylesheet" href="/static/style.css?v={STYLE_ASSET.version}">'
 
 
 def render_setup_required_page(region: str) -> str:
@@ -288,10 +313,11 @@ def render_setup_required_page(region: str) -> str:
     """
 
 
-def render_home_page(
-    accounts: List[Dict], active_account: Optional[Dict], mcp_url: str
-) -> str:
-    """Render main dashboard page"""
+def render_home_page(active_account: Optional[Dict], mcp_url: str) -> str:
+    """
+    Render main dashboard page.
+    Accounts are loaded incrementally from /accounts (keyset pagination).
+    """
 
     # Active account alert with MCP URL
     if active_account:
@@ -321,67 +347,6 @@ def render_home_page(
         </div>
         """
 
-    # Accounts list
-    accounts_html = ""
-    for acc in accounts:
-        is_active = acc.get("is_active", 0) == 1
-        last_used = acc.get("last_used", "")[:19] if acc.get("last_used") else "Never"
-        connected_at = (
-            acc.get("connected_at", "")[:19] if acc.get("connected_at") else "Unknown"
-        )
-        region_display = REGION_DISPLAY.get(
-            acc.get("region", "com"), f"🌐 {acc.get('region', 'com')}"
-        )
-
-        active_badge = '<span class="badge">✓ ACTIVE</span>' if is_active else ""
-        card_class = "account-card active" if is_active else "account-card"
-
-        action_btn = ""
-        if is_active:
-            action_btn = '<button class="btn" disabled>✓ Active</button>'
-        else:
-            action_btn = f'<button class="btn btn-primary" onclick="setActive(\'{acc["user_id"]}\')">Set Active</button>'
-
-        accounts_html += f"""
-        <div class="{card_class}">
-            <div style="display: flex; justify-content: space-between; align-items: start;">
-                <div style="flex: 1;">
-                    <div style="margin-bottom: 15px;">
-                        <strong style="font-size: 20px;">🏢 {acc.get("company_name", "N/A")}</strong>
-                        {active_badge}
-                    </div>
-                    <div class="grid">
-                        <div class="info-item">
-                            <strong>📧 Email</strong>
-                            {acc.get("email", "N/A")}
-                        </div>
-                        <div class="info-item">
-                            <strong>🌐 Region</strong>
-                            {region_display}
-                        </div>
-                        <div class="info-item">
-                            <strong>🏷️ Organization ID</strong>
-                            <code>{acc.get("organization_id", "")[:25]}...</code>
-                        </div>
-                        <div class="info-item">
-                            <strong>⏰ Last Used</strong>
-                            {last_used}
-                        </div>
-                    </div>
-                </div>
-                <div class="actions" style="margin-left: 20px;">
-                    {action_btn}
-                    <button class="btn btn-danger" onclick="deleteAccount('{acc["user_id"]}', '{acc.get("company_name", acc["user_id"])}')">
-                        🗑️ Delete
-                    </button>
-                </div>
-            </div>
-        </div>
-        """
-
-    if not accounts_html:
-        accounts_html = '<p style="color: #8b949e; text-align: center; padding: 40px;">No accounts connected yet</p>'
-
     return f"""
     <!DOCTYPE html>
     <html>
@@ -405,8 +370,14 @@ def render_home_page(
             {active_info}
 
             <div class="card">
-                <h2>📋 Connected Accounts ({len(accounts)})</h2>
-                {accounts_html}
+                <h2>📋 Connected Accounts (<span id="accounts-total">…</span>)</h2>
+                <input id="accounts-search" type="search" class="search-input"
+                       placeholder="🔍 Search by company or email" autocomplete="off">
+                <div id="accounts-list"></div>
+                <p id="accounts-empty" style="display: none; color: #8b949e; text-align: center; padding: 40px;">No accounts connected yet</p>
+                <div style="text-align: center;">
+                    <button id="accounts-more" class="btn btn-primary" style="display: none;">Load more</button>
+                </div>
             </div>
 
             <div class="card" style="text-align: center;">
@@ -419,6 +390,130 @@ def render_home_page(
         </div>
 
         <script>
+            const REGION_DISPLAY = {json.dumps(REGION_DISPLAY)};
+            const PAGE_SIZE = {ACCOUNTS_PAGE_SIZE};
+            const listEl = document.getElementById('accounts-list');
+            const moreBtn = document.getElementById('accounts-more');
+            const emptyEl = document.getElementById('accounts-empty');
+            const totalEl = document.getElementById('accounts-total');
+            const searchEl = document.getElementById('accounts-search');
+            let nextCursor = null;
+            let query = '';
+            let loading = false;
+            let generation = 0;
+
+            function esc(value) {{
+                const div = document.createElement('div');
+                div.textContent = value == null ? '' : String(value);
+                return div.innerHTML;
+            }}
+
+            function formatTs(ts, fallback) {{
+                if (!ts) return fallback;
+                const d = new Date(ts * 1000);
+                const p = n => String(n).padStart(2, '0');
+                return d.getFullYear() + '-' + p(d.getMonth() + 1) + '-' + p(d.getDate()) +
+                    ' ' + p(d.getHours()) + ':' + p(d.getMinutes()) + ':' + p(d.getSeconds());
+            }}
+
+            function renderAccount(acc) {{
+                const isActive = acc.is_active === 1;
+                const region = acc.region || 'com';
+                const card = document.createElement('div');
+                card.className = isActive ? 'account-card active' : 'account-card';
+                card.innerHTML = `
+                    <div style="display: flex; justify-content: space-between; align-items: start;">
+                        <div style="flex: 1;">
+                            <div style="margin-bottom: 15px;">
+                                <strong style="font-size: 20px;">🏢 ${{esc(acc.company_name || 'N/A')}}</strong>
+                                ${{isActive ? '<span class="badge">✓ ACTIVE</span>' : ''}}
+                            </div>
+                            <div class="grid">
+                                <div class="info-item">
+                                    <strong>📧 Email</strong>
+                                    ${{esc(acc.email || 'N/A')}}
+                                </div>
+                                <div class="info-item">
+                                    <strong>🌐 Region</strong>
+                                    ${{esc(REGION_DISPLAY[region] || '🌐 ' + region)}}
+                                </div>
+                                <div class="info-item">
+                                    <strong>🏷️ Organization ID</strong>
+                                    <code>${{esc((acc.organization_id || '').slice(0, 25))}}...</code>
+                                </div>
+                                <div class="info-item">
+                                    <strong>⏰ Last Used</strong>
+                                    ${{esc(formatTs(acc.last_used, 'Never'))}}
+                                </div>
+                            </div>
+                        </div>
+                        <div class="actions" style="margin-left: 20px;">
+                            ${{isActive
+                                ? '<button class="btn" disabled>✓ Active</button>'
+                                : '<button class="btn btn-primary" data-action="activate">Set Active</button>'}}
+                            <button class="btn btn-danger" data-action="delete">🗑️ Delete</button>
+                        </div>
+                    </div>`;
+                const activateBtn = card.querySelector('[data-action="activate"]');
+                if (activateBtn) activateBtn.addEventListener('click', () => setActive(acc.user_id));
+                card.querySelector('[data-action="delete"]').addEventListener(
+                    'click', () => deleteAccount(acc.user_id, acc.company_name || acc.user_id)
+                );
+                return card;
+            }}
+
+            function loadPage(reset) {{
+                if (loading && !reset) return;
+                if (reset) {{
+                    generation++;
+                    nextCursor = null;
+                    listEl.innerHTML = '';
+                }}
+                const current = generation;
+                const params = new URLSearchParams({{ limit: PAGE_SIZE }});
+                if (nextCursor) params.set('cursor', nextCursor);
+                if (query) params.set('q', query);
+                loading = true;
+                moreBtn.disabled = true;
+                fetch('/accounts?' + params)
+                    .then(r => r.json())
+                    .then(page => {{
+                        if (current !== generation) return;
+                        page.accounts.forEach(acc => listEl.appendChild(renderAccount(acc)));
+                        if (page.total !== undefined) totalEl.textContent = page.total;
+                        nextCursor = page.next_cursor;
+                        moreBtn.style.display = nextCursor ? 'inline-block' : 'none';
+                        emptyEl.style.display = listEl.children.length ? 'none' : 'block';
+                        emptyEl.textContent = query ? 'No accounts match your search' : 'No accounts connected yet';
+                    }})
+                    .catch(e => alert('❌ Error loading accounts: ' + e))
+                    .finally(() => {{
+                        if (current !== generation) return;
+                        loading = false;
+                        moreBtn.disabled = false;
+                    }});
+            }}
+
+            moreBtn.addEventListener('click', () => loadPage(false));
+
+            // Carga automática al llegar al final de la lista
+            if ('IntersectionObserver' in window) {{
+                new IntersectionObserver(entries => {{
+                    if (entries[0].isIntersecting && nextCursor) loadPage(false);
+                }}).observe(moreBtn);
+            }}
+
+            let searchTimer = null;
+            searchEl.addEventListener('input', () => {{
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(() => {{
+                    query = searchEl.value.trim();
+                    loadPage(true);
+                }}, 300);
+            }});
+
+            loadPage(true);
+
             function setActive(userId) {{
                 if (confirm('Set this account as active?')) {{
                     fetch('/account/' + encodeURIComponent(userId) + '/activate', {{ method: 'POST' }})
@@ -1,7 +1,10 @@
+import asyncio
 import time
+from typing import Optional
 
-import requests
+from config import NGROK_REFRESH_INTERVAL
 from fastapi import Request
+from src.http_clients import get_http_clients
 
 
 def get_base_url(request: Request) -> str:
@@ -38,7 +41,7 @@ def extract_region_from_domain(api_domain: str) -> str:
     return "com"
 
 
-def get_ngrok_public_url() -> str:
+async def get_ngrok_public_url() -> str:
     """
     Obtiene la URL pública del túnel ngrok.
     Funciona en:
@@ -54,9 +57,10 @@ def get_ngrok_public_url() -> str:
         "http://ngrok:4040/api/tunnels",  # Modo Docker Compose
     ]
 
+    client = get_http_clients().ngrok
     for url in urls_to_try:
         try:
-            response = requests.get(url, timeout=5)
+            response = await client.get(url)
             if response.status_code == 200:
                 data = response.json()
                 tunnels = data.get("tunnels", [])
@@ -69,3 +73,34 @@ def get_ngrok_public_url() -> str:
             continue  # Intentar siguiente URL
 
     return None
+
+
+# URL pública de ngrok cacheada por la tarea en segundo plano
+_ngrok_public_url: Optional[str] = None
+
+
+def get_cached_ngrok_url() -> Optional[str]:
+    """
+    Devuelve la última URL pública de ngrok descubierta.
+    No hace I/O: es seguro llamarla desde cualquier handler.
+    """
+    return _ngrok_public_url
+
+
+async def watch_ngrok_public_url(interval: int = NGROK_REFRESH_INTERVAL) -> None:
+    """
+    Tarea en segundo plano: consulta la API de ngrok periódicamente
+    y actualiza la URL cacheada.
+    """
+    global _ngrok_public_url
+
+    while True:
+        try:
+            url = await get_ngrok_public_url()
+            if url != _ngrok_public_url:
+                print(f"🌐 ngrok public URL: {url or 'not available'}")
+            _ngrok_public_url = url
+        except Exception as e:
+            print(f"⚠️ ngrok discovery failed: {e}")
+
+        await asyncio.sleep(interval)
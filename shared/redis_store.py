@@ -0,0 +1,415 @@
+import json
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from shared.token_store import TokenStore, list_key
+
+# Dependencia opcional: solo se necesita con TOKEN_STORE=redis
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+# Columnas de la tabla `users` (mismo formato de cuenta que TokenDB)
+ACCOUNT_FIELDS = (
+    "user_id",
+    "access_token",
+    "refresh_token",
+    "organization_id",
+    "api_domain",
+    "region",
+    "expires_at",
+    "connected_at",
+    "last_used",
+    "email",
+    "company_name",
+    "is_active",
+)
+INT_FIELDS = ("expires_at", "connected_at", "last_used", "is_active")
+
+# Red de seguridad si se pierde un mensaje de pub/sub
+SNAPSHOT_TTL = 5.0
+
+
+class RedisTokenStore(TokenStore):
+    """
+    Almacén de tokens sobre Redis, para varias réplicas OAuth/MCP.
+
+    Claves (con prefijo):
+      account:{user_id}   hash con las columnas de la cuenta
+      accounts            zset user_id -> expires_at (cuentas no eliminadas)
+      org:{org_id}        user_id de la cuenta de esa organización
+      active              user_id de la cuenta activa
+      events              canal pub/sub de notificaciones
+
+    Los cambios que dependen del estado (activar, eliminar, compare-and-set
+    de tokens) usan WATCH/MULTI y se reintentan si otra réplica escribe en
+    medio. Cada cambio se publica en `events`; todas las réplicas invalidan
+    su snapshot de la cuenta activa y avisan a sus suscriptores.
+
+    Para pruebas basta con pasar un cliente de `fakeredis`.
+    """
+
+    def __init__(self, client, prefix: str = "zoho_tokens:"):
+        super().__init__()
+        self._client = client
+        self._prefix = prefix
+        self._channel = f"{prefix}events"
+        # Identifica los eventos que publicó esta instancia
+        self._origin = uuid.uuid4().hex
+        # Snapshot en memoria de la cuenta activa
+        self._active_snapshot: Optional[Dict] = None
+        self._active_loaded_at = 0.0
+        self._snapshot_lock = threading.Lock()
+
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self._channel: self._on_event})
+        self._listener = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        print(f"✅ Redis token store initialized (prefix {prefix!r})")
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisTokenStore":
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("TOKEN_STORE=redis requires the 'redis' package")
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    # -------------------------
+    #   CLAVES Y FORMATO
+    # -------------------------
+
+    def _key(self, *parts: str) -> str:
+        return self._prefix + ":".join(parts)
+
+    def _account_key(self, user_id: str) -> str:
+        return self._key("account", user_id)
+
+    @staticmethod
+    def _decode(raw: Dict) -> Optional[Dict]:
+        """Hash de Redis → dict con las mismas columnas que SQLite"""
+        if not raw:
+            return None
+        account = {field: raw.get(field) for field in ACCOUNT_FIELDS}
+        for field in INT_FIELDS:
+            if account[field] not in (None, ""):
+                account[field] = int(account[field])
+            else:
+                account[field] = None
+        return account
+
+    def _read(self, user_id: str) -> Optional[Dict]:
+        return self._decode(self._client.hgetall(self._account_key(user_id)))
+
+    def _read_many(self, user_ids: List[str]) -> List[Dict]:
+        pipe = self._client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.hgetall(self._account_key(user_id))
+        return [account for account in map(self._decode, pipe.execute()) if account]
+
+    # -------------------------
+    #   NOTIFICACIONES
+    # -------------------------
+
+    def _publish(self, event: str, user_id: str) -> None:
+        self._invalidate_active()
+        self._client.publish(
+            self._channel,
+            json.dumps({"event": event, "user_id": user_id, "origin": self._origin}),
+        )
+
+    def _on_event(self, message: Dict) -> None:
+        """Listener pub/sub (hilo propio): cambios de cualquier réplica"""
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        self._invalidate_active()
+        self._notify(
+            payload.get("event", ""),
+            payload.get("user_id", ""),
+            local=payload.get("origin") == self._origin,
+        )
+
+    def _invalidate_active(self) -> None:
+        with self._snapshot_lock:
+            self._active_snapshot = None
+            self._active_loaded_at = 0.0
+
+    # -------------------------
+    #   ESCRITURA
+    # -------------------------
+
+    def _save(self, user_id: str, data: Dict, activate: bool) -> None:
+        """
+        Guardar una cuenta en una sola transacción WATCH/MULTI. Con `activate`
+        queda como la única activa; si no, solo si no hay otra activa.
+        """
+        key = self._account_key(user_id)
+        active_key = self._key("active")
+
+        def txn(pipe):
+            previous_org = pipe.hget(key, "organization_id")
+            connected_at = pipe.hget(key, "connected_at")
+            active = pipe.get(active_key)
+            is_active = activate or active in (None, user_id)
+
+            mapping = {
+                "user_id": user_id,
+                "access_token": data["access_token"],
+                "refresh_token": data["refresh_token"],
+                "organization_id": data["organization_id"],
+                "api_domain": data["api_domain"],
+                "region": data.get("region", ""),
+                "expires_at": data["expires_at"],
+                "connected_at": connected_at
+                or data.get("connected_at", int(time.time())),
+                "email": data.get("email", ""),
+                "company_name": data.get("company_name", ""),
+                "is_active": 1 if is_active else 0,
+            }
+
+            pipe.multi()
+            if previous_org and previous_org != data["organization_id"]:
+                pipe.delete(self._key("org", previous_org))
+            pipe.hset(key, mapping=mapping)
+            pipe.zadd(self._key("accounts"), {user_id: data["expires_at"]})
+            pipe.set(self._key("org", data["organization_id"]), user_id)
+            if is_active:
+                if active and active != user_id:
+                    pipe.hset(self._account_key(active), "is_active", 0)
+                pipe.set(active_key, user_id)
+
+        self._client.transaction(txn, key, active_key)
+
+    def save_user(self, user_id: str, data: Dict) -> None:
+        """Guardar o actualizar una cuenta (activación: ver TokenStore.save_user)"""
+        self._save(user_id, data, activate=False)
+        self._publish("save", user_id)
+        print(f"💾 Saved user: {user_id}")
+
+    def save_and_activate(self, user_id: str, data: Dict) -> None:
+        """Guardar una cuenta y dejarla como la única activa (una transacción)"""
+        self._save(user_id, data, activate=True)
+        self._publish("save", user_id)
+        self._publish("activate", user_id)
+        print(f"💾 Saved and activated user: {user_id}")
+
+    def update_tokens(
+        self,
+        user_id: str,
+        access_token: str,
+        expires_at: int,
+        expected_expires_at: Optional[int] = None,
+    ) -> bool:
+        """
+        Actualizar solo tokens (para refresh). No toca last_used: un refresh
+        en segundo plano no es un uso de la cuenta (eso lo registra touch()).
+        Con expected_expires_at solo escribe si el token guardado no cambió.
+        """
+        key = self._account_key(user_id)
+
+        def txn(pipe):
+            current, state = pipe.hmget(key, "expires_at", "is_active")
+            if state is None:
+                return False
+            if expected_expires_at is not None and int(current) != expected_expires_at:
+                return False
+
+            pipe.multi()
+            pipe.hset(
+                key, mapping={"access_token": access_token, "expires_at": expires_at}
+            )
+            if int(state) >= 0:
+                pipe.zadd(self._key("accounts"), {user_id: expires_at})
+            return True
+
+        if not self._client.transaction(txn, key, value_from_callable=True):
+            return False
+
+        self._publish("tokens", user_id)
+        return True
+
+    def activate(self, user_id: str) -> bool:
+        """
+        Marcar una cuenta como la ÚNICA activa.
+        Devuelve False si la cuenta no existe o fue eliminada.
+        """
+        key = self._account_key(user_id)
+        active_key = self._key("active")
+
+        def txn(pipe):
+            state = pipe.hget(key, "is_active")
+            if state is None or int(state) < 0:
+                return False
+            previous = pipe.get(active_key)
+
+            pipe.multi()
+            if previous and previous != user_id:
+                pipe.hset(self._account_key(previous), "is_active", 0)
+            pipe.hset(key, "is_active", 1)
+            pipe.set(active_key, user_id)
+            return True
+
+        if not self._client.transaction(txn, key, active_key, value_from_callable=True):
+            return False
+
+        self._publish("activate", user_id)
+        return True
+
+    def soft_delete(self, user_id: str) -> bool:
+        """
+        Eliminar una cuenta (soft delete con is_active = -1).
+        Devuelve False si la cuenta no existe o ya fue eliminada.
+        """
+        key = self._account_key(user_id)
+        active_key = self._key("active")
+
+        def txn(pipe):
+            state, organization_id = pipe.hmget(key, "is_active", "organization_id")
+            if state is None or int(state) < 0:
+                return False
+            active = pipe.get(active_key)
+
+            pipe.multi()
+            pipe.hset(key, "is_active", -1)
+            pipe.zrem(self._key("accounts"), user_id)
+            if organization_id:
+                pipe.delete(self._key("org", organization_id))
+            if active == user_id:
+                pipe.delete(active_key)
+            return True
+
+        if not self._client.transaction(txn, key, active_key, value_from_callable=True):
+            return False
+
+        self._publish("delete", user_id)
+        return True
+
+    def _write_last_used(self, pending: Dict[str, int]) -> None:
+        # Solo cuentas existentes: HSET sobre una clave nueva crearía un hash a medias
+        user_ids = list(pending)
+        pipe = self._client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.exists(self._account_key(user_id))
+        exists = pipe.execute()
+
+        pipe = self._client.pipeline(transaction=False)
+        for user_id, found in zip(user_ids, exists):
+            if found:
+                pipe.hset(self._account_key(user_id), "last_used", pending[user_id])
+        pipe.execute()
+
+    # -------------------------
+    #   LECTURA
+    # -------------------------
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        """Obtener usuario activo por user_id"""
+        account = self._read(user_id)
+        if not account or account["is_active"] != 1:
+            return None
+
+        self.touch(user_id)
+
+        return account
+
+    def get_account(self, user_id: str) -> Optional[Dict]:
+        """Obtener una cuenta no eliminada (activa o no)"""
+        account = self._read(user_id)
+        if not account or account["is_active"] < 0:
+            return None
+        return account
+
+    def get_active_account(self) -> Optional[Dict]:
+        """
+        Obtener la cuenta activa (la que usa el servidor MCP).
+        Se sirve desde memoria hasta que llegue una notificación de cambio.
+        """
+        with self._snapshot_lock:
+            if time.time() - self._active_loaded_at >= SNAPSHOT_TTL:
+                user_id = self._client.get(self._key("active"))
+                self._active_snapshot = self._read(user_id) if user_id else None
+                self._active_loaded_at = time.time()
+            snapshot = self._active_snapshot
+
+        return dict(snapshot) if snapshot else None
+
+    def list_users(self) -> List[Dict]:
+        """Listar todos los usuarios activos"""
+        fields = (
+            "user_id",
+            "organization_id",
+            "api_domain",
+            "connected_at",
+            "last_used",
+            "email",
+            "company_name",
+        )
+        users = [
+            {field: account[field] for field in fields}
+            for account in self.list_accounts()
+            if account["is_active"] == 1
+        ]
+        return sorted(users, key=lambda u: u["last_used"] or 0, reverse=True)
+
+    def list_accounts(self) -> List[Dict]:
+        """Listar todas las cuentas no eliminadas, en el orden de list_key"""
+        accounts = self._read_many(self._client.zrange(self._key("accounts"), 0, -1))
+        return sorted(
+            (account for account in accounts if account["is_active"] >= 0),
+            key=list_key,
+            reverse=True,
+        )
+
+    def list_expirations(self) -> List[Dict]:
+        """user_id y expires_at (epoch) de las cuentas no eliminadas, por vencimiento"""
+        return [
+            {"user_id": user_id, "expires_at": int(expires_at)}
+            for user_id, expires_at in self._client.zrange(
+                self._key("accounts"), 0, -1, withscores=True
+            )
+        ]
+
+    def find_by_organization(self, organization_id: str) -> Optional[Dict]:
+        """Buscar una cuenta no eliminada por organization_id"""
+        user_id = self._client.get(self._key("org", organization_id))
+        return self.get_account(user_id) if user_id else None
+
+    def get_stats(self) -> Dict:
+        """Estadísticas"""
+        now = int(time.time())
+        active = [a for a in self.list_accounts() if a["is_active"] == 1]
+        return {
+            "total_users": len(active),
+            "active_7d": sum(
+                1 for a in active if (a["last_used"] or 0) > now - 7 * 86400
+            ),
+            "active_30d": sum(
+                1 for a in active if (a["last_used"] or 0) > now - 30 * 86400
+            ),
+        }
+
+    # -------------------------
+    #   CICLO DE VIDA
+    # -------------------------
+
+    def pool_stats(self) -> Dict:
+        """Métricas del pool de conexiones de redis-py"""
+        pool = self._client.connection_pool
+        return {
+            "backend": "redis",
+            "max_connections": getattr(pool, "max_connections", None),
+            "idle": len(getattr(pool, "_available_connections", [])),
+            "in_use": len(getattr(pool, "_in_use_connections", [])),
+        }
+
+    def close(self) -> None:
+        """Persistir last_used pendientes y cerrar conexiones"""
+        self.flush_last_used()
+        self._listener.stop()
+        self._pubsub.close()
+        self._client.close()
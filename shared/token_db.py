@@ -1,165 +1,826 @@
+import asyncio
+import os
 import secrets
 import sqlite3
 import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
+from shared.token_store import (
+    PAGE_FIELDS,
+    ChangeCallback,
+    TokenStore,
+    decode_cursor,
+    encode_cursor,
+)
 
-class TokenDB:
-    """Base de datos multi-tenant para tokens de Zoho"""
+PAGE_COLUMNS = ", ".join(PAGE_FIELDS)
 
-    def __init__(self, db_path: str):
+# Pragmas por conexión: WAL permite lectores concurrentes mientras se escribe
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",  # seguro con WAL, sin fsync en cada commit
+    "PRAGMA cache_size = -8000",  # ~8 MB de page cache
+    "PRAGMA mmap_size = 67108864",  # 64 MB mapeados en memoria
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Marca para "abre una conexión nueva" en el pool de lectoras
+_OPEN_NEW = object()
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones SQLite.
+
+    - Lectoras: hasta `size` conexiones de solo lectura, con checkout/return.
+      Si no hay libres, los hilos esperan en orden FIFO y la conexión devuelta
+      se entrega directamente al primero que espera.
+    - Escritora: UNA conexión protegida por lock; commit al salir del bloque,
+      rollback si hay excepción.
+
+    Las conexiones rotas se descartan y se reemplazan. Registra el tiempo de
+    espera de cada checkout para exponerlo como métrica.
+    """
+
+    def __init__(self, db_path: Path, size: int = 4, timeout: float = 10.0):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: List[sqlite3.Connection] = []  # LIFO: caché de páginas caliente
+        self._waiters: Deque[List] = deque()  # [Event, conexión entregada]
+        self._readers_open = 0
+        self._readers_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "reader": {"checkouts": 0, "wait_total": 0.0, "wait_max": 0.0},
+            "writer": {"checkouts": 0, "wait_total": 0.0, "wait_max": 0.0},
+            "replaced": 0,
+        }
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        if readonly:
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                timeout=self.timeout,
+            )
+        else:
+            conn = sqlite3.connect(
+                str(self.db_path), check_same_thread=False, timeout=self.timeout
+            )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _record_wait(self, kind: str, waited: float) -> None:
+        with self._metrics_lock:
+            metrics = self._metrics[kind]
+            metrics["checkouts"] += 1
+            metrics["wait_total"] += waited
+            metrics["wait_max"] = max(metrics["wait_max"], waited)
+
+    def _release_reader(self, conn: Optional[sqlite3.Connection]) -> None:
+        """
+        Devolver una conexión al pool (o None si se descartó).
+        Con None, el primer hilo en espera recibe permiso para abrir una nueva.
+        """
+        with self._readers_lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter[1] = conn if conn is not None else _OPEN_NEW
+                waiter[0].set()
+                return
+            if conn is not None:
+                self._idle.append(conn)
+            else:
+                self._readers_open -= 1
+
+    def _discard_reader(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._metrics_lock:
+            self._metrics["replaced"] += 1
+        self._release_reader(None)
+
+    def _checkout_reader(self) -> sqlite3.Connection:
+        while True:
+            waiter = None
+            with self._readers_lock:
+                if self._idle:
+                    conn = self._idle.pop()
+                elif self._readers_open < self.size:
+                    self._readers_open += 1
+                    conn = _OPEN_NEW
+                else:
+                    waiter = [threading.Event(), None]
+                    self._waiters.append(waiter)
+
+            if waiter is not None:
+                if not waiter[0].wait(self.timeout):
+                    with self._readers_lock:
+                        if waiter[1] is None:
+                            self._waiters.remove(waiter)
+                            raise sqlite3.OperationalError(
+                                "Timed out waiting for a TokenDB connection "
+                                f"({self.timeout}s)"
+                            )
+                conn = waiter[1]
+
+            if conn is _OPEN_NEW:
+                try:
+                    return self._connect(readonly=True)
+                except sqlite3.Error:
+                    self._release_reader(None)
+                    raise
+
+            if self._is_healthy(conn):
+                return conn
+            self._discard_reader(conn)
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Checkout de una conexión de solo lectura"""
+        start = time.perf_counter()
+        conn = self._checkout_reader()
+        self._record_wait("reader", time.perf_counter() - start)
+
+        healthy = True
+        try:
+            yield conn
+        except sqlite3.Error:
+            healthy = self._is_healthy(conn)
+            raise
+        finally:
+            if healthy:
+                self._release_reader(conn)
+            else:
+                self._discard_reader(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Checkout exclusivo de la conexión escritora (una transacción)"""
+        start = time.perf_counter()
+        if not self._writer_lock.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError(
+                f"Timed out waiting for the TokenDB writer ({self.timeout}s)"
+            )
+        self._record_wait("writer", time.perf_counter() - start)
+
+        try:
+            if self._writer is None or not self._is_healthy(self._writer):
+                if self._writer is not None:
+                    with self._metrics_lock:
+                        self._metrics["replaced"] += 1
+                self._writer = self._connect(readonly=False)
+
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        finally:
+            self._writer_lock.release()
+
+    def stats(self) -> Dict:
+        """Métricas: checkouts y tiempos de espera (ms) por tipo de conexión"""
+        with self._metrics_lock:
+            result = {"pool_size": self.size, "replaced": self._metrics["replaced"]}
+            for kind in ("reader", "writer"):
+                metrics = self._metrics[kind]
+                checkouts = metrics["checkouts"]
+                result[kind] = {
+                    "checkouts": checkouts,
+                    "wait_avg_ms": (
+                        metrics["wait_total"] / checkouts * 1000 if checkouts else 0.0
+                    ),
+                    "wait_max_ms": metrics["wait_max"] * 1000,
+                }
+        with self._readers_lock:
+            result["readers_open"] = self._readers_open
+            result["readers_idle"] = len(self._idle)
+            result["readers_waiting"] = len(self._waiters)
+        return result
+
+    def close(self) -> None:
+        with self._readers_lock:
+            idle, self._idle = self._idle, []
+            self._readers_open -= len(idle)
+        for conn in idle:
+            conn.close()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+# -------------------------
+#   MIGRACIONES
+# -------------------------
+# Cada migración corre una sola vez, en orden, dentro de su propia transacción.
+# La versión aplicada se guarda en PRAGMA user_version.
+
+
+def _migration_1_base_schema(conn: sqlite3.Connection) -> None:
+    """Esquema original (timestamps ISO en TEXT)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            access_token TEXT NOT NULL,
+            refresh_token TEXT NOT NULL,
+            organization_id TEXT NOT NULL,
+            api_domain TEXT NOT NULL,
+            region TEXT,
+            expires_at TEXT NOT NULL,
+            connected_at TEXT NOT NULL,
+            last_used TEXT,
+            email TEXT,
+            company_name TEXT,
+            is_active INTEGER DEFAULT 1
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_org_id ON users(organization_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_active ON users(is_active)")
+
+
+def _to_epoch(value: Any) -> Optional[int]:
+    """ISO (hora local, como se guardaba antes) o número → epoch en segundos"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        return None
+
+
+def _migration_2_epoch_timestamps(conn: sqlite3.Connection) -> None:
+    """
+    Timestamps como epoch INTEGER e índices parciales:
+      - idx_active_account: la cuenta activa (is_active = 1)
+      - idx_expires_at: vencimientos de cuentas no eliminadas (scheduler)
+    """
+    conn.execute("""
+        CREATE TABLE users_v2 (
+            user_id TEXT PRIMARY KEY,
+            access_token TEXT NOT NULL,
+            refresh_token TEXT NOT NULL,
+            organization_id TEXT NOT NULL,
+            api_domain TEXT NOT NULL,
+            region TEXT,
+            expires_at INTEGER NOT NULL,
+            connected_at INTEGER NOT NULL,
+            last_used INTEGER,
+            email TEXT,
+            company_name TEXT,
+            is_active INTEGER DEFAULT 1
+        )
+    """)
+
+    rows = []
+    for row in conn.execute("SELECT * FROM users"):
+        account = dict(row)
+        # Si no se puede leer el vencimiento, 0 fuerza un refresh inmediato
+        account["expires_at"] = _to_epoch(account["expires_at"]) or 0
+        account["connected_at"] = _to_epoch(account["connected_at"]) or int(time.time())
+        account["last_used"] = _to_epoch(account["last_used"])
+        rows.append(account)
+
+    conn.executemany(
+        """
+        INSERT INTO users_v2
+        (user_id, access_token, refresh_token, organization_id, api_domain,
+         region, expires_at, connected_at, last_used, email, company_name,
+         is_active)
+        VALUES
+        (:user_id, :access_token, :refresh_token, :organization_id, :api_domain,
+         :region, :expires_at, :connected_at, :last_used, :email, :company_name,
+         :is_active)
+        """,
+        rows,
+    )
+
+    conn.execute("DROP TABLE users")
+    conn.execute("ALTER TABLE users_v2 RENAME TO users")
+
+    conn.execute("CREATE INDEX idx_org_id ON users(organization_id)")
+    conn.execute(
+        "CREATE INDEX idx_active_account ON users(is_active) WHERE is_active = 1"
+    )
+    conn.execute(
+        "CREATE INDEX idx_expires_at ON users(expires_at, user_id)"
+        " WHERE is_active >= 0"
+    )
+
+
+def _migration_3_accounts_page_index(conn: sqlite3.Connection) -> None:
+    """Índice compuesto en el orden de page_accounts (keyset)"""
+    conn.execute(
+        "CREATE INDEX idx_accounts_page ON users(is_active, connected_at, user_id)"
+        " WHERE is_active >= 0"
+    )
+
+
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (1, _migration_1_base_schema),
+    (2, _migration_2_epoch_timestamps),
+    (3, _migration_3_accounts_page_index),
+]
+
+
+def migrate(pool: "ConnectionPool") -> List[int]:
+    """Aplicar las migraciones pendientes. Devuelve las versiones aplicadas."""
+    applied = []
+    for version, migration in MIGRATIONS:
+        with pool.writer() as conn:
+            # IMMEDIATE: si otro proceso está migrando, esperamos a que termine
+            conn.execute("BEGIN IMMEDIATE")
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            if current >= version:
+                continue
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+        applied.append(version)
+    return applied
+
+
+class TokenDB(TokenStore):
+    """
+    Base de datos multi-tenant para tokens de Zoho (SQLite).
+
+    Las notificaciones de cambios solo llegan a los suscriptores de este
+    proceso; otros procesos detectan los commits con PRAGMA data_version.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = None):
+        super().__init__()
         # Ruta absoluta segura
         self.db_path = Path(db_path).resolve()
-        self.local = threading.local()
+        if pool_size is None:
+            pool_size = int(os.getenv("TOKEN_DB_POOL_SIZE", "4"))
+        self._pool = ConnectionPool(self.db_path, pool_size)
+        # Snapshot en memoria de la cuenta activa
+        self._active_snapshot: Optional[Dict] = None
+        self._active_version: Optional[int] = None
+        self._snapshot_lock = threading.Lock()
+        self._version_conn: Optional[sqlite3.Connection] = None
         self._init_db()
 
-    def _get_conn(self):
-        """Thread-safe connection"""
-        if not hasattr(self.local, "conn"):
-            self.local.conn = sqlite3.connect(
+    def pool_stats(self) -> Dict:
+        """Métricas del pool de conexiones"""
+        return self._pool.stats()
+
+    def close(self) -> None:
+        """Cerrar todas las conexiones"""
+        self.flush_last_used()
+        self._pool.close()
+        with self._snapshot_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+
+    def _data_version(self) -> int:
+        """
+        PRAGMA data_version desde una conexión que nunca escribe: cambia cada vez
+        que CUALQUIER otra conexión (de este u otro proceso) hace commit.
+        Llamar con _snapshot_lock tomado.
+        """
+        if self._version_conn is None:
+            self._version_conn = sqlite3.connect(
                 str(self.db_path), check_same_thread=False, timeout=10.0
             )
-            self.local.conn.row_factory = sqlite3.Row
-        return self.local.conn
+        return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
 
-    def _init_db(self):
-        """Crear tablas si no existen"""
-        conn = self._get_conn()
-
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT PRIMARY KEY,
-                access_token TEXT NOT NULL,
-                refresh_token TEXT NOT NULL,
-                organization_id TEXT NOT NULL,
-                api_domain TEXT NOT NULL,
-                region TEXT,
-                expires_at TEXT NOT NULL,
-                connected_at TEXT NOT NULL,
-                last_used TEXT,
-                email TEXT,
-                company_name TEXT,
-                is_active INTEGER DEFAULT 1
-            )
-        """)
+    def _invalidate_active(self) -> None:
+        """Descartar el snapshot de la cuenta activa"""
+        with self._snapshot_lock:
+            self._active_version = None
+            self._active_snapshot = None
 
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_org_id ON users(organization_id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_active ON users(is_active)")
+    def _init_db(self):
+        """Crear o migrar el esquema hasta la última versión"""
+        with self._pool.writer() as conn:
+            # WAL es persistente en el archivo: basta con activarlo una vez
+            conn.execute("PRAGMA journal_mode = WAL")
 
-        conn.commit()
+        applied = migrate(self._pool)
+        if applied:
+            print(f"🔧 Database migrated to schema v{applied[-1]}")
         print(f"✅ Database initialized at: {self.db_path}")
 
+    @staticmethod
+    def _upsert_user(conn: sqlite3.Connection, user_id: str, data: Dict) -> None:
+        """
+        INSERT o UPDATE de la cuenta, dentro de la transacción de `conn`.
+        Activa solo si no hay otra cuenta activa (ver TokenStore.save_user).
+        """
+        conn.execute(
+            """
+            INSERT INTO users
+            (user_id, access_token, refresh_token, organization_id,
+             api_domain, region, expires_at, connected_at, email, company_name,
+             is_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    NOT EXISTS (SELECT 1 FROM users
+                                WHERE is_active = 1 AND user_id != ?))
+            ON CONFLICT(user_id) DO UPDATE SET
+                access_token = excluded.access_token,
+                refresh_token = excluded.refresh_token,
+                organization_id = excluded.organization_id,
+                api_domain = excluded.api_domain,
+                region = excluded.region,
+                expires_at = excluded.expires_at,
+                email = excluded.email,
+                company_name = excluded.company_name,
+                is_active = excluded.is_active
+            """,
+            (
+                user_id,
+                data["access_token"],
+                data["refresh_token"],
+                data["organization_id"],
+                data["api_domain"],
+                data.get("region", ""),
+                data["expires_at"],
+                data.get("connected_at", int(time.time())),
+                data.get("email", ""),
+                data.get("company_name", ""),
+                user_id,
+            ),
+        )
+
     def save_user(self, user_id: str, data: Dict) -> None:
-        """Guardar o actualizar usuario"""
-        conn = self._get_conn()
+        """Guardar o actualizar usuario (activación: ver TokenStore.save_user)"""
+        with self._pool.writer() as conn:
+            self._upsert_user(conn, user_id, data)
+        self._invalidate_active()
+        self._notify("save", user_id)
+        print(f"💾 Saved user: {user_id}")
+
+    def save_and_activate(self, user_id: str, data: Dict) -> None:
+        """Guardar una cuenta y dejarla como la única activa (una transacción)"""
+        with self._pool.writer() as conn:
+            self._upsert_user(conn, user_id, data)
+            self._activate(conn, user_id)
+        self._invalidate_active()
+        self._notify("save", user_id)
+        self._notify("activate", user_id)
+        print(f"💾 Saved and activated user: {user_id}")
 
-        cursor = conn.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,))
-        exists = cursor.fetchone()
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        """Obtener usuario por user_id"""
+        with self._pool.reader() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM users WHERE user_id = ? AND is_active = 1", (user_id,)
+            )
+            row = cursor.fetchone()
+
+        if not row:
+            return None
 
-        if exists:
-            conn.execute(
+        self.touch(user_id)
+
+        return dict(row)
+
+    def _write_last_used(self, pending: Dict[str, int]) -> None:
+        with self._pool.writer() as conn:
+            conn.executemany(
+                "UPDATE users SET last_used = ? WHERE user_id = ?",
+                [(last_used, user_id) for user_id, last_used in pending.items()],
+            )
+
+    def update_tokens(
+        self,
+        user_id: str,
+        access_token: str,
+        expires_at: int,
+        expected_expires_at: Optional[int] = None,
+    ) -> bool:
+        """
+        Actualizar solo tokens (para refresh). No toca last_used: un refresh
+        en segundo plano no es un uso de la cuenta (eso lo registra touch()).
+        Con expected_expires_at solo escribe si el token guardado no cambió.
+        """
+        with self._pool.writer() as conn:
+            cursor = conn.execute(
                 """
-                UPDATE users SET
-                    access_token = ?, refresh_token = ?, organization_id = ?,
-                    api_domain = ?, region = ?, expires_at = ?,
-                    email = ?, company_name = ?, is_active = 1
-                WHERE user_id = ?
+                UPDATE users
+                SET access_token = ?, expires_at = ?
+                WHERE user_id = ? AND (? IS NULL OR expires_at = ?)
                 """,
                 (
-                    data["access_token"],
-                    data["refresh_token"],
-                    data["organization_id"],
-                    data["api_domain"],
-                    data.get("region", ""),
-                    data["expires_at"],
-                    data.get("email", ""),
-                    data.get("company_name", ""),
+                    access_token,
+                    expires_at,
                     user_id,
+                    expected_expires_at,
+                    expected_expires_at,
                 ),
             )
-        else:
-            conn.execute(
-                """
-                INSERT INTO users
-                (user_id, access_token, refresh_token, organization_id,
-                 api_domain, region, expires_at, connected_at, email, company_name)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        if cursor.rowcount == 0:
+            return False
+
+        self._invalidate_active()
+        self._notify("tokens", user_id)
+        return True
+
+    def list_users(self) -> List[Dict]:
+        """Listar todos los usuarios activos"""
+        with self._pool.reader() as conn:
+            cursor = conn.execute("""
+                SELECT user_id, organization_id, api_domain, connected_at,
+                       last_used, email, company_name
+                FROM users
+                WHERE is_active = 1
+                ORDER BY last_used DESC
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+
+    # -------------------------
+    #   CUENTAS (dashboard / OAuth)
+    # -------------------------
+
+    def get_account(self, user_id: str) -> Optional[Dict]:
+        """Obtener una cuenta no eliminada (activa o no)"""
+        with self._pool.reader() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM users WHERE user_id = ? AND is_active >= 0", (user_id,)
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def get_active_account(self) -> Optional[Dict]:
+        """
+        Obtener la cuenta activa (la que usa el servidor MCP).
+        Se sirve desde memoria mientras la base de datos no cambie.
+        """
+        with self._snapshot_lock:
+            version = self._data_version()
+            if self._active_version != version:
+                with self._pool.reader() as conn:
+                    row = conn.execute(
+                        "SELECT * FROM users WHERE is_active = 1"
+                    ).fetchone()
+                self._active_snapshot = dict(row) if row else None
+                self._active_version = version
+            snapshot = self._active_snapshot
+
+        return dict(snapshot) if snapshot else None
+
+    def list_accounts(self) -> List[Dict]:
+        """Listar todas las cuentas no eliminadas, en el orden de list_key"""
+        with self._pool.reader() as conn:
+            cursor = conn.execute("""
+                SELECT * FROM users
+                WHERE is_active >= 0
+                ORDER BY is_active DESC, IFNULL(last_used, 0) DESC,
+                         IFNULL(connected_at, 0) DESC, user_id DESC
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _search_clause(search: Optional[str]) -> Tuple[str, Tuple]:
+        """Filtro LIKE por empresa o email (escapando % y _)"""
+        if not search:
+            return "", ()
+        pattern = (
+            "%"
+            + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            + "%"
+        )
+        return (
+            " AND (company_name LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\')",
+            (pattern, pattern),
+        )
+
+    def page_accounts(
+        self, limit: int, cursor: Optional[str] = None, search: Optional[str] = None
+    ) -> Dict:
+        """
+        Página de cuentas no eliminadas, la activa primero y luego por conexión
+        más reciente. Recorre idx_accounts_page desde el cursor (keyset).
+        """
+        where, params = self._search_clause(search)
+        if cursor:
+            where += " AND (is_active, connected_at, user_id) < (?, ?, ?)"
+            params += decode_cursor(cursor)
+
+        with self._pool.reader() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {PAGE_COLUMNS} FROM users
+                WHERE is_active >= 0{where}
+                ORDER BY is_active DESC, connected_at DESC, user_id DESC
+                LIMIT ?
                 """,
-                (
-                    user_id,
-                    data["access_token"],
-                    data["refresh_token"],
-                    data["organization_id"],
-                    data["api_domain"],
-                    data.get("region", ""),
-                    data["expires_at"],
-                    data.get("connected_at", datetime.now().isoformat()),
-                    data.get("email", ""),
-                    data.get("company_name", ""),
-                ),
+                params + (limit + 1,),
+            ).fetchall()
+
+        page = [dict(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(page[-1]) if len(rows) > limit else None
+        return {"accounts": page, "next_cursor": next_cursor}
+
+    def count_accounts(self, search: Optional[str] = None) -> int:
+        """Número de cuentas no eliminadas que coinciden con la búsqueda"""
+        where, params = self._search_clause(search)
+        with self._pool.reader() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM users WHERE is_active >= 0{where}", params
+            ).fetchone()[0]
+
+    def list_expirations(self) -> List[Dict]:
+        """user_id y expires_at (epoch) de las cuentas no eliminadas, por vencimiento"""
+        with self._pool.reader() as conn:
+            cursor = conn.execute(
+                "SELECT user_id, expires_at FROM users WHERE is_active >= 0"
+                " ORDER BY expires_at"
             )
+            return [dict(row) for row in cursor.fetchall()]
 
-        conn.commit()
-        print(f"💾 Saved user: {user_id}")
+    def find_by_organization(self, organization_id: str) -> Optional[Dict]:
+        """Buscar una cuenta no eliminada por organization_id"""
+        with self._pool.reader() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM users WHERE organization_id = ? AND is_active >= 0",
+                (organization_id,),
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
-    def get_user(self, user_id: str) -> Optional[Dict]:
-        """Obtener usuario por user_id"""
-        conn = self._get_conn()
+    def activate(self, user_id: str) -> bool:
+        """
+        Marcar una cuenta como la ÚNICA activa.
+        Devuelve False si la cuenta no existe o fue eliminada.
+        """
+        with self._pool.writer() as conn:
+            if not self._activate(conn, user_id):
+                return False
+        self._invalidate_active()
+        self._notify("activate", user_id)
+        return True
+
+    @staticmethod
+    def _activate(conn: sqlite3.Connection, user_id: str) -> bool:
+        """Deja `user_id` como única activa, dentro de la transacción de `conn`"""
         cursor = conn.execute(
-            "SELECT * FROM users WHERE user_id = ? AND is_active = 1", (user_id,)
+            "SELECT 1 FROM users WHERE user_id = ? AND is_active >= 0", (user_id,)
         )
-        row = cursor.fetchone()
+        if not cursor.fetchone():
+            return False
 
-        if not row:
-            return None
+        conn.execute("UPDATE users SET is_active = 0 WHERE is_active >= 0")
+        conn.execute("UPDATE users SET is_active = 1 WHERE user_id = ?", (user_id,))
+        return True
 
-        conn.execute(
-            "UPDATE users SET last_used = ? WHERE user_id = ?",
-            (datetime.now().isoformat(), user_id),
-        )
-        conn.commit()
+    def soft_delete(self, user_id: str) -> bool:
+        """
+        Eliminar una cuenta (soft delete con is_active = -1).
+        Devuelve False si la cuenta no existe o ya fue eliminada.
+        """
+        with self._pool.writer() as conn:
+            cursor = conn.execute(
+                "UPDATE users SET is_active = -1 WHERE user_id = ? AND is_active >= 0",
+                (user_id,),
+            )
+        if cursor.rowcount == 0:
+            return False
 
-        return dict(row)
+        self._invalidate_active()
+        self._notify("delete", user_id)
+        return True
 
-    def update_tokens(self, user_id: str, access_token: str, expires_at: str) -> None:
-        """Actualizar solo tokens (para refresh)"""
-        conn = self._get_conn()
-        conn.execute(
-            """
-            UPDATE users
-            SET access_token = ?, expires_at = ?, last_used = ?
-            WHERE user_id = ?
+    def get_stats(self) -> Dict:
+        """Estadísticas"""
+        with self._pool.reader() as conn:
+            cursor = conn.execute(
+                """
+                SELECT
+                    COUNT(*) as total_users,
+                    COUNT(CASE WHEN last_used > ? THEN 1 END) as active_7d,
+                    COUNT(CASE WHEN last_used > ? THEN 1 END) as active_30d
+                FROM users WHERE is_active = 1
             """,
-            (access_token, expires_at, datetime.now().isoformat(), user_id),
+                (int(time.time()) - 7 * 86400, int(time.time()) - 30 * 86400),
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else {}
+
+
+class AsyncTokenDB:
+    """
+    API asíncrona sobre TokenDB para los handlers de FastAPI.
+
+    Todas las consultas corren en un único hilo dedicado, así el event loop
+    nunca se bloquea esperando a SQLite y los commits quedan serializados.
+    """
+
+    def __init__(self, db: TokenStore):
+        self.db = db
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="token-db"
         )
-        conn.commit()
 
-    def list_users(self) -> List[Dict]:
-        """Listar todos los usuarios activos"""
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            SELECT user_id, organization_id, api_domain, connected_at,
-                   last_used, email, company_name
-            FROM users
-            WHERE is_active = 1
-            ORDER BY last_used DESC
-        """)
-        return [dict(row) for row in cursor.fetchall()]
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
 
-    def get_stats(self) -> Dict:
-        """Estadísticas"""
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            SELECT
-                COUNT(*) as total_users,
-                COUNT(CASE WHEN last_used > datetime('now', '-7 days') THEN 1 END) as active_7d,
-                COUNT(CASE WHEN last_used > datetime('now', '-30 days') THEN 1 END) as active_30d
-            FROM users WHERE is_active = 1
-        """)
-        row = cursor.fetchone()
-        return dict(row) if row else {}
+    async def get_account(self, user_id: str) -> Optional[Dict]:
+        return await self._run(self.db.get_account, user_id)
+
+    async def get_active_account(self) -> Optional[Dict]:
+        return await self._run(self.db.get_active_account)
+
+    async def list_accounts(self) -> List[Dict]:
+        return await self._run(self.db.list_accounts)
+
+    async def page_accounts(
+        self, limit: int, cursor: Optional[str] = None, search: Optional[str] = None
+    ) -> Dict:
+        return await self._run(self.db.page_accounts, limit, cursor, search)
+
+    async def count_accounts(self, search: Optional[str] = None) -> int:
+        return await self._run(self.db.count_accounts, search)
+
+    async def list_expirations(self) -> List[Dict]:
+        return await self._run(self.db.list_expirations)
+
+    async def find_by_organization(self, organization_id: str) -> Optional[Dict]:
+        return await self._run(self.db.find_by_organization, organization_id)
+
+    async def activate(self, user_id: str) -> bool:
+        return await self._run(self.db.activate, user_id)
+
+    async def soft_delete(self, user_id: str) -> bool:
+        return await self._run(self.db.soft_delete, user_id)
+
+    async def save_and_activate(self, user_id: str, data: Dict) -> None:
+        await self._run(self.db.save_and_activate, user_id, data)
+
+    async def update_tokens(
+        self,
+        user_id: str,
+        access_token: str,
+        expires_at: int,
+        expected_expires_at: Optional[int] = None,
+    ) -> bool:
+        return await self._run(
+            self.db.update_tokens,
+            user_id,
+            access_token,
+            expires_at,
+            expected_expires_at,
+        )
+
+    async def flush_last_used(self) -> int:
+        return await self._run(self.db.flush_last_used)
+
+    def touch(self, user_id: str) -> None:
+        """Solo memoria: no necesita pasar por el hilo de la DB"""
+        self.db.touch(user_id)
+
+    def pool_stats(self) -> Dict:
+        """Solo memoria: métricas del pool de conexiones"""
+        return self.db.pool_stats()
+
+    def subscribe(
+        self, callback: ChangeCallback, ignore_local: Collection[str] = ()
+    ) -> Callable[[], None]:
+        """El callback corre en el hilo que hizo el cambio (o en el listener)"""
+        return self.db.subscribe(callback, ignore_local)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.db.close()
 
 
 # -------------------------
@@ -169,17 +830,29 @@ class TokenDB:
 _db_instance = None
 
 
-def get_db(db_path: str = None) -> TokenDB:
+def get_db(db_path: str = None) -> TokenStore:
     """
-    Obtiene instancia singleton de TokenDB.
+    Obtiene instancia singleton del almacén de tokens.
 
-    Si no se envía db_path, usa automáticamente:
-       oauth_page/zoho_tokens.db
+    TOKEN_STORE=sqlite (default) → TokenDB. Si no se envía db_path, usa
+       TOKEN_DB_PATH o automáticamente: oauth_page/zoho_tokens.db
+    TOKEN_STORE=redis → RedisTokenStore sobre REDIS_URL
     """
     global _db_instance
 
     if _db_instance is None:
+        if os.getenv("TOKEN_STORE", "sqlite").lower() == "redis":
+            from shared.redis_store import RedisTokenStore
+
+            _db_instance = RedisTokenStore.from_url(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            )
+            return _db_instance
+
         if db_path is None:
+            db_path = os.getenv("TOKEN_DB_PATH")
+
+        if not db_path:
             # ruta del proyecto → oauth_page/zoho_tokens.db
             project_root = Path(__file__).resolve().parents[1]
             db_path = project_root / "oauth_page" / "zoho_tokens.db"
@@ -0,0 +1,281 @@
+import atexit
+import base64
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+
+# Callback de notificación: (evento, user_id)
+# Eventos: "save", "tokens", "activate", "delete"
+ChangeCallback = Callable[[str, str], None]
+
+# Columnas que se exponen en listados paginados (nunca los tokens)
+PAGE_FIELDS = (
+    "user_id",
+    "company_name",
+    "email",
+    "organization_id",
+    "region",
+    "is_active",
+    "connected_at",
+    "last_used",
+)
+
+
+def page_key(account: Dict) -> Tuple[int, int, str]:
+    """
+    Orden de los listados paginados: la activa primero y luego por conexión
+    más reciente. No usa last_used porque cambia en cada /token y movería
+    cuentas entre páginas.
+    """
+    return (account["is_active"], account["connected_at"] or 0, account["user_id"])
+
+
+def list_key(account: Dict) -> Tuple[int, int, int, str]:
+    """
+    Orden de list_accounts (descendente): la activa primero, luego por uso y
+    conexión más recientes; user_id desempata. TokenDB lo replica en su
+    ORDER BY (NULL cuenta como 0).
+    """
+    return (
+        account["is_active"],
+        account["last_used"] or 0,
+        account["connected_at"] or 0,
+        account["user_id"],
+    )
+
+
+def encode_cursor(account: Dict) -> str:
+    """Cursor opaco (keyset) que apunta justo después de esta cuenta"""
+    raw = json.dumps(page_key(account), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int, str]:
+    """Lanza ValueError si el cursor no es válido"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        is_active, connected_at, user_id = json.loads(raw)
+        return int(is_active), int(connected_at), str(user_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def matches_search(account: Dict, search: Optional[str]) -> bool:
+    """Búsqueda por empresa o email (subcadena, sin distinguir mayúsculas)"""
+    if not search:
+        return True
+    search = search.lower()
+    return any(
+        search in (account.get(field) or "").lower()
+        for field in ("company_name", "email")
+    )
+
+
+class TokenStore(ABC):
+    """
+    Interfaz de almacenamiento de cuentas y tokens de Zoho.
+
+    Implementaciones:
+      - TokenDB (shared/token_db.py): SQLite, un solo host
+      - RedisTokenStore (shared/redis_store.py): Redis, varias réplicas
+
+    Las cuentas se devuelven como dicts con las columnas de la tabla `users`
+    (timestamps en epoch). `is_active` vale 1 para la cuenta activa, 0 para
+    las demás y -1 para las eliminadas.
+    """
+
+    def __init__(self):
+        # Write-behind de last_used: user_id -> timestamp pendiente de guardar
+        self._pending_last_used: Dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+        # (callback, eventos propios que no recibe)
+        self._subscribers: List[Tuple[ChangeCallback, Collection[str]]] = []
+        self._subscribers_lock = threading.Lock()
+        atexit.register(self.flush_last_used)
+
+    # -------------------------
+    #   ESCRITURA
+    # -------------------------
+
+    @abstractmethod
+    def save_user(self, user_id: str, data: Dict) -> None:
+        """
+        Guardar o actualizar una cuenta (atómico). Queda activa solo si no
+        hay OTRA cuenta activa: la primera cuenta se activa sola y la activa
+        sigue activa al re-guardarla, pero nunca quita la activa a otra (para
+        eso save_and_activate). Una cuenta eliminada se restaura.
+        """
+
+    @abstractmethod
+    def update_tokens(
+        self,
+        user_id: str,
+        access_token: str,
+        expires_at: int,
+        expected_expires_at: Optional[int] = None,
+    ) -> bool:
+        """
+        Actualizar solo tokens (para refresh), sin tocar last_used.
+        Con expected_expires_at es un compare-and-set: solo escribe si el
+        expires_at guardado sigue siendo ese. Devuelve False si no escribió.
+        """
+
+    @abstractmethod
+    def activate(self, user_id: str) -> bool:
+        """Marcar una cuenta como la ÚNICA activa (atómico)"""
+
+    @abstractmethod
+    def soft_delete(self, user_id: str) -> bool:
+        """Eliminar una cuenta (soft delete con is_active = -1)"""
+
+    @abstractmethod
+    def save_and_activate(self, user_id: str, data: Dict) -> None:
+        """Guardar una cuenta y dejarla como la única activa (atómico)"""
+
+    # -------------------------
+    #   LECTURA
+    # -------------------------
+
+    @abstractmethod
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        """Obtener la cuenta activa por user_id (registra su uso)"""
+
+    @abstractmethod
+    def get_account(self, user_id: str) -> Optional[Dict]:
+        """Obtener una cuenta no eliminada (activa o no)"""
+
+    @abstractmethod
+    def get_active_account(self) -> Optional[Dict]:
+        """Obtener la cuenta activa (la que usa el servidor MCP)"""
+
+    @abstractmethod
+    def list_users(self) -> List[Dict]:
+        """Listar los usuarios activos"""
+
+    @abstractmethod
+    def list_accounts(self) -> List[Dict]:
+        """Listar todas las cuentas no eliminadas, en el orden de list_key"""
+
+    def page_accounts(
+        self, limit: int, cursor: Optional[str] = None, search: Optional[str] = None
+    ) -> Dict:
+        """
+        Página de cuentas no eliminadas (keyset, ver page_key) con PAGE_FIELDS.
+        Devuelve {"accounts": [...], "next_cursor": str | None}.
+        Implementación genérica en memoria; los backends pueden usar índices.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        accounts = sorted(
+            (
+                account
+                for account in self.list_accounts()
+                if matches_search(account, search)
+            ),
+            key=page_key,
+            reverse=True,
+        )
+        if after is not None:
+            accounts = [account for account in accounts if page_key(account) < after]
+
+        page = [
+            {field: account[field] for field in PAGE_FIELDS}
+            for account in accounts[:limit]
+        ]
+        next_cursor = encode_cursor(page[-1]) if len(accounts) > limit else None
+        return {"accounts": page, "next_cursor": next_cursor}
+
+    def count_accounts(self, search: Optional[str] = None) -> int:
+        """Número de cuentas no eliminadas que coinciden con la búsqueda"""
+        return sum(
+            1 for account in self.list_accounts() if matches_search(account, search)
+        )
+
+    @abstractmethod
+    def list_expirations(self) -> List[Dict]:
+        """user_id y expires_at de las cuentas no eliminadas, por vencimiento"""
+
+    @abstractmethod
+    def find_by_organization(self, organization_id: str) -> Optional[Dict]:
+        """Buscar una cuenta no eliminada por organization_id"""
+
+    @abstractmethod
+    def get_stats(self) -> Dict:
+        """Estadísticas"""
+
+    # -------------------------
+    #   LAST_USED (write-behind)
+    # -------------------------
+
+    def touch(self, user_id: str) -> None:
+        """
+        Registrar uso de una cuenta sin escribir en el backend.
+        Se persiste en lote con flush_last_used().
+        """
+        with self._pending_lock:
+            self._pending_last_used[user_id] = int(time.time())
+
+    def flush_last_used(self) -> int:
+        """Persistir los last_used pendientes en una sola operación"""
+        with self._pending_lock:
+            pending = self._pending_last_used
+            self._pending_last_used = {}
+
+        if not pending:
+            return 0
+
+        self._write_last_used(pending)
+        return len(pending)
+
+    @abstractmethod
+    def _write_last_used(self, pending: Dict[str, int]) -> None:
+        """Guardar un lote user_id -> last_used"""
+
+    # -------------------------
+    #   NOTIFICACIONES
+    # -------------------------
+
+    def subscribe(
+        self, callback: ChangeCallback, ignore_local: Collection[str] = ()
+    ) -> Callable[[], None]:
+        """
+        Registrar un callback que se llama tras cada cambio.
+        `ignore_local`: eventos que no se notifican si los originó este mismo
+        proceso (p. ej. "tokens" para no reaccionar a los refrescos propios).
+        Puede llamarse desde otro hilo. Devuelve la función para desuscribirse.
+        """
+        subscriber = (callback, tuple(ignore_local))
+        with self._subscribers_lock:
+            self._subscribers.append(subscriber)
+
+        def unsubscribe() -> None:
+            with self._subscribers_lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+        return unsubscribe
+
+    def _notify(self, event: str, user_id: str, local: bool = True) -> None:
+        """`local`: el cambio lo hizo este proceso (no otra réplica)"""
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for callback, ignore_local in subscribers:
+            if local and event in ignore_local:
+                continue
+            try:
+                callback(event, user_id)
+            except Exception as e:
+                print(f"⚠️ Token store subscriber failed: {e}")
+
+    # -------------------------
+    #   CICLO DE VIDA
+    # -------------------------
+
+    @abstractmethod
+    def pool_stats(self) -> Dict:
+        """Métricas de conexiones del backend"""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Persistir lo pendiente y cerrar conexiones"""
@@ -0,0 +1,143 @@
+"""
+ConnectionPool (shared/token_db.py): límite de lectoras, timeout cuando se
+agota, orden FIFO de las esperas, reemplazo de conexiones rotas y la
+transacción de la escritora.
+
+    python -m pytest tests   (o python -m unittest discover tests)
+"""
+
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from shared.token_db import ConnectionPool
+
+
+class PoolTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        db_path = Path(directory.name) / "pool.db"
+        # Las lectoras abren en mode=ro: el archivo tiene que existir
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+        self.pool = ConnectionPool(db_path, size=2, timeout=0.2)
+        self.addCleanup(self.pool.close)
+
+    def wait_for(self, condition, timeout: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("condition not reached")
+            time.sleep(0.005)
+
+
+class TestReaders(PoolTestCase):
+    def test_bounded_by_size(self):
+        with self.pool.reader() as first, self.pool.reader() as second:
+            self.assertIsNot(first, second)
+            self.assertEqual(self.pool.stats()["readers_open"], 2)
+
+        # Al devolverlas quedan libres para el siguiente checkout
+        with self.pool.reader():
+            stats = self.pool.stats()
+        self.assertEqual(stats["readers_open"], 2)
+        self.assertEqual(stats["readers_idle"], 1)
+
+    def test_exhausted_pool_times_out(self):
+        with self.pool.reader(), self.pool.reader():
+            with self.assertRaisesRegex(sqlite3.OperationalError, "Timed out"):
+                with self.pool.reader():
+                    pass
+            self.assertEqual(self.pool.stats()["readers_waiting"], 0)
+
+        # El pool sigue usable después del timeout
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT 1").fetchone()[0], 1)
+
+    def test_waiters_are_served_in_order(self):
+        self.pool.timeout = 5.0
+        served = []
+
+        def wait_for_reader(name: str) -> None:
+            with self.pool.reader():
+                served.append(name)
+
+        with self.pool.reader():
+            with self.pool.reader():
+                threads = []
+                for name in ("first", "second", "third"):
+                    thread = threading.Thread(target=wait_for_reader, args=(name,))
+                    thread.start()
+                    threads.append(thread)
+                    expected = len(threads)
+                    self.wait_for(
+                        lambda: self.pool.stats()["readers_waiting"] == expected
+                    )
+
+            # Una sola conexión devuelta pasa de mano en mano, en orden
+            for thread in threads:
+                thread.join(timeout=5)
+            self.assertEqual(served, ["first", "second", "third"])
+        self.assertEqual(self.pool.stats()["readers_open"], 2)
+
+    def test_broken_connection_is_replaced(self):
+        with self.pool.reader() as conn:
+            broken = conn
+        broken.close()
+
+        with self.pool.reader() as conn:
+            self.assertIsNot(conn, broken)
+            self.assertEqual(conn.execute("SELECT 1").fetchone()[0], 1)
+
+        stats = self.pool.stats()
+        self.assertEqual(stats["replaced"], 1)
+        self.assertEqual(stats["readers_open"], 1)
+
+    def test_readers_are_read_only(self):
+        with self.pool.reader() as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO items (id) VALUES (1)")
+
+
+class TestWriter(PoolTestCase):
+    def count(self) -> int:
+        with self.pool.reader() as conn:
+            return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def test_commits_on_exit(self):
+        with self.pool.writer() as conn:
+            conn.execute("INSERT INTO items (id) VALUES (1)")
+        self.assertEqual(self.count(), 1)
+
+    def test_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.pool.writer() as conn:
+                conn.execute("INSERT INTO items (id) VALUES (1)")
+                raise RuntimeError("boom")
+        self.assertEqual(self.count(), 0)
+
+    def test_single_writer_times_out(self):
+        with self.pool.writer():
+            errors = []
+
+            def second_writer() -> None:
+                try:
+                    with self.pool.writer():
+                        pass
+                except sqlite3.OperationalError as error:
+                    errors.append(str(error))
+
+            thread = threading.Thread(target=second_writer)
+            thread.start()
+            thread.join(timeout=5)
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Timed out", errors[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,228 @@
+"""
+LookupBatcher (mcp_server/src/lookups.py): los GET por id concurrentes se
+resuelven con una lectura masiva y cada llamada recibe su registro; los ids
+que faltan y los errores caen al GET individual de cada llamada.
+
+    python -m pytest tests   (o python -m unittest discover tests)
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "mcp_server"))
+
+from src.lookups import BulkLookup, LookupBatcher  # noqa: E402
+
+ITEMS = BulkLookup(
+    path="/items/{item_id}",
+    id_param="item_id",
+    list_path="/itemdetails",
+    ids_param="item_ids",
+    object_key="item",
+)
+
+
+class FakeZoho:
+    """/itemdetails y /items/{item_id} con los items de `known`"""
+
+    def __init__(self, known=("1", "2", "3", "4"), bulk_error=None, broken=()):
+        self.known = set(known)
+        self.bulk_error = bulk_error
+        self.broken = set(broken)
+        self.bulk_calls = []
+        self.single_calls = []
+
+    async def fetch_many(self, ids):
+        await asyncio.sleep(0)
+        self.bulk_calls.append(list(ids))
+        if isinstance(self.bulk_error, Exception):
+            raise self.bulk_error
+        if self.bulk_error is not None:
+            return httpx.Response(self.bulk_error, json={"code": 1})
+        items = [{"item_id": i, "name": f"item {i}"} for i in ids if i in self.known]
+        return httpx.Response(200, json={"code": 0, "items": items})
+
+    def fetch_one(self, record_id):
+        async def fetch():
+            await asyncio.sleep(0)
+            self.single_calls.append(record_id)
+            if record_id in self.broken:
+                raise httpx.ConnectError(f"item {record_id} unreachable")
+            request = httpx.Request("GET", f"https://zoho.test/items/{record_id}")
+            if record_id not in self.known:
+                return httpx.Response(404, json={"code": 1002}, request=request)
+            item = {"item_id": record_id, "name": f"item {record_id}"}
+            return httpx.Response(200, json={"code": 0, "item": item}, request=request)
+
+        return fetch
+
+
+def load_all(batcher, zoho, ids, organization_id="org_1"):
+    async def load(record_id):
+        request = httpx.Request("GET", f"https://zoho.test/items/{record_id}")
+        return await batcher.load(
+            ITEMS,
+            organization_id,
+            record_id,
+            request,
+            zoho.fetch_many,
+            zoho.fetch_one(record_id),
+        )
+
+    async def main():
+        return await asyncio.gather(
+            *(load(record_id) for record_id in ids), return_exceptions=True
+        )
+
+    return asyncio.run(main())
+
+
+def item_id(response: httpx.Response) -> str:
+    return response.json()["item"]["item_id"]
+
+
+class TestFanOut(unittest.TestCase):
+    def setUp(self):
+        self.batcher = LookupBatcher([ITEMS], window=0.01)
+
+    def test_one_bulk_request_for_the_window(self):
+        zoho = FakeZoho()
+        responses = load_all(self.batcher, zoho, ["1", "2", "3"])
+
+        self.assertEqual(zoho.bulk_calls, [["1", "2", "3"]])
+        self.assertEqual(zoho.single_calls, [])
+        self.assertEqual([item_id(r) for r in responses], ["1", "2", "3"])
+        for record_id, response in zip(["1", "2", "3"], responses):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.request.url.path, f"/items/{record_id}")
+
+    def test_repeated_id_is_shared(self):
+        zoho = FakeZoho()
+        responses = load_all(self.batcher, zoho, ["1", "2", "1"])
+
+        self.assertEqual(zoho.bulk_calls, [["1", "2"]])
+        self.assertEqual([item_id(r) for r in responses], ["1", "2", "1"])
+
+    def test_single_id_uses_single_get(self):
+        zoho = FakeZoho()
+        responses = load_all(self.batcher, zoho, ["1"])
+
+        self.assertEqual(zoho.bulk_calls, [])
+        self.assertEqual(zoho.single_calls, ["1"])
+        self.assertEqual(item_id(responses[0]), "1")
+
+    def test_missing_ids_fall_back_to_single_get(self):
+        zoho = FakeZoho(known=("1", "2"))
+        responses = load_all(self.batcher, zoho, ["1", "2", "9"])
+
+        self.assertEqual(zoho.single_calls, ["9"])
+        self.assertEqual([r.status_code for r in responses], [200, 200, 404])
+
+    def test_groups_by_organization(self):
+        zoho = FakeZoho()
+
+        async def main():
+            async def load(record_id, organization_id):
+                request = httpx.Request("GET", f"https://zoho.test/items/{record_id}")
+                return await self.batcher.load(
+                    ITEMS,
+                    organization_id,
+                    record_id,
+                    request,
+                    zoho.fetch_many,
+                    zoho.fetch_one(record_id),
+                )
+
+            return await asyncio.gather(
+                load("1", "org_1"),
+                load("2", "org_1"),
+                load("3", "org_2"),
+                load("4", "org_2"),
+            )
+
+        responses = asyncio.run(main())
+
+        self.assertEqual(sorted(zoho.bulk_calls), [["1", "2"], ["3", "4"]])
+        self.assertEqual([item_id(r) for r in responses], ["1", "2", "3", "4"])
+
+    def test_max_batch_dispatches_early(self):
+        batcher = LookupBatcher([ITEMS], window=10, max_batch=2)
+        zoho = FakeZoho()
+
+        async def main():
+            # Con una ventana de 10 s, solo max_batch puede despachar a tiempo
+            return await asyncio.wait_for(
+                asyncio.gather(
+                    *(
+                        batcher.load(
+                            ITEMS,
+                            "org_1",
+                            record_id,
+                            httpx.Request(
+                                "GET", f"https://zoho.test/items/{record_id}"
+                            ),
+                            zoho.fetch_many,
+                            zoho.fetch_one(record_id),
+                        )
+                        for record_id in ("1", "2")
+                    )
+                ),
+                timeout=1,
+            )
+
+        responses = asyncio.run(main())
+
+        self.assertEqual(zoho.bulk_calls, [["1", "2"]])
+        self.assertEqual([item_id(r) for r in responses], ["1", "2"])
+
+    def test_match(self):
+        self.assertEqual(
+            self.batcher.match("/items/42?organization_id=1"), (ITEMS, "42")
+        )
+        self.assertEqual(self.batcher.match("/items/a%20b/"), (ITEMS, "a b"))
+        self.assertIsNone(self.batcher.match("/items/42/image"))
+        self.assertIsNone(self.batcher.match("/itemdetails"))
+
+
+class TestErrors(unittest.TestCase):
+    def setUp(self):
+        self.batcher = LookupBatcher([ITEMS], window=0.01)
+
+    def test_bulk_exception_falls_back(self):
+        zoho = FakeZoho(bulk_error=httpx.ReadTimeout("slow"))
+        responses = load_all(self.batcher, zoho, ["1", "2", "3"])
+
+        self.assertEqual(sorted(zoho.single_calls), ["1", "2", "3"])
+        self.assertEqual([item_id(r) for r in responses], ["1", "2", "3"])
+
+    def test_bulk_error_status_falls_back(self):
+        zoho = FakeZoho(bulk_error=500)
+        responses = load_all(self.batcher, zoho, ["1", "2"])
+
+        self.assertEqual(sorted(zoho.single_calls), ["1", "2"])
+        self.assertEqual([item_id(r) for r in responses], ["1", "2"])
+
+    def test_single_get_error_reaches_its_caller(self):
+        zoho = FakeZoho(known=("1",), broken=("2",))
+        responses = load_all(self.batcher, zoho, ["1", "2", "2"])
+
+        self.assertEqual(item_id(responses[0]), "1")
+        self.assertIsInstance(responses[1], httpx.ConnectError)
+        self.assertIsInstance(responses[2], httpx.ConnectError)
+        self.assertEqual(zoho.single_calls, ["2"])
+
+    def test_nothing_left_pending(self):
+        zoho = FakeZoho(bulk_error=httpx.ReadTimeout("slow"), broken=("1", "2"))
+        responses = load_all(self.batcher, zoho, ["1", "2"])
+
+        self.assertTrue(all(isinstance(r, httpx.ConnectError) for r in responses))
+        self.assertEqual(self.batcher._pending, {})
+        self.assertEqual(self.batcher._tasks, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
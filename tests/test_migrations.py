@@ -0,0 +1,154 @@
+"""
+Migraciones de TokenDB: una base creada con el esquema original (timestamps
+ISO en TEXT, user_version = 0) se migra a la última versión sin perder datos.
+
+    python -m pytest tests   (o python -m unittest discover tests)
+"""
+
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from shared.token_db import MIGRATIONS, TokenDB
+
+# Esquema anterior a las migraciones, tal como lo creaba TokenDB
+BASELINE_SCHEMA = (
+    """
+    CREATE TABLE users (
+        user_id TEXT PRIMARY KEY,
+        access_token TEXT NOT NULL,
+        refresh_token TEXT NOT NULL,
+        organization_id TEXT NOT NULL,
+        api_domain TEXT NOT NULL,
+        region TEXT,
+        expires_at TEXT NOT NULL,
+        connected_at TEXT NOT NULL,
+        last_used TEXT,
+        email TEXT,
+        company_name TEXT,
+        is_active INTEGER DEFAULT 1
+    )
+    """,
+    "CREATE INDEX idx_org_id ON users(organization_id)",
+    "CREATE INDEX idx_active ON users(is_active)",
+)
+
+EXPIRES_AT = datetime(2025, 6, 1, 12, 30)
+CONNECTED_AT = datetime(2025, 5, 1, 9, 0)
+LAST_USED = datetime(2025, 5, 20, 18, 45)
+
+
+def create_baseline_db(path: Path) -> None:
+    with sqlite3.connect(path) as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.execute(statement)
+        conn.executemany(
+            """
+            INSERT INTO users
+            (user_id, access_token, refresh_token, organization_id, api_domain,
+             region, expires_at, connected_at, last_used, email, company_name,
+             is_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    "user_a",
+                    "access_a",
+                    "refresh_a",
+                    "org_a",
+                    "https://www.zohoapis.com",
+                    "com",
+                    EXPIRES_AT.isoformat(),
+                    CONNECTED_AT.isoformat(),
+                    LAST_USED.isoformat(),
+                    "a@example.com",
+                    "Company A",
+                    1,
+                ),
+                (
+                    "user_b",
+                    "access_b",
+                    "refresh_b",
+                    "org_b",
+                    "https://www.zohoapis.eu",
+                    "eu",
+                    "not a date",
+                    CONNECTED_AT.isoformat(),
+                    None,
+                    "b@example.com",
+                    "Company B",
+                    0,
+                ),
+            ],
+        )
+
+
+class TestBaselineMigration(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "tokens.db"
+        create_baseline_db(self.path)
+
+        self.db = TokenDB(str(self.path))
+        self.addCleanup(self.db.close)
+
+    def query(self, sql: str) -> list:
+        with sqlite3.connect(self.path) as conn:
+            return conn.execute(sql).fetchall()
+
+    def test_reaches_latest_version(self):
+        self.assertEqual(self.query("PRAGMA user_version")[0][0], MIGRATIONS[-1][0])
+
+    def test_timestamps_become_epoch(self):
+        account = self.db.get_account("user_a")
+
+        self.assertEqual(account["expires_at"], int(EXPIRES_AT.timestamp()))
+        self.assertEqual(account["connected_at"], int(CONNECTED_AT.timestamp()))
+        self.assertEqual(account["last_used"], int(LAST_USED.timestamp()))
+        types = self.query("SELECT typeof(expires_at), typeof(connected_at) FROM users")
+        self.assertEqual(set(types), {("integer", "integer")})
+
+    def test_unreadable_expiry_forces_refresh(self):
+        account = self.db.get_account("user_b")
+
+        self.assertEqual(account["expires_at"], 0)
+        self.assertIsNone(account["last_used"])
+
+    def test_data_is_preserved(self):
+        account = self.db.get_account("user_b")
+
+        self.assertEqual(account["access_token"], "access_b")
+        self.assertEqual(account["refresh_token"], "refresh_b")
+        self.assertEqual(account["organization_id"], "org_b")
+        self.assertEqual(account["api_domain"], "https://www.zohoapis.eu")
+        self.assertEqual(account["region"], "eu")
+        self.assertEqual(account["company_name"], "Company B")
+        self.assertEqual(account["is_active"], 0)
+        self.assertEqual(self.db.get_active_account()["user_id"], "user_a")
+
+    def test_indexes(self):
+        indexes = {
+            row[0]
+            for row in self.query("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+
+        self.assertIn("idx_active_account", indexes)
+        self.assertIn("idx_expires_at", indexes)
+        self.assertIn("idx_accounts_page", indexes)
+        self.assertNotIn("idx_active", indexes)
+
+    def test_reopen_does_not_migrate_again(self):
+        self.db.close()
+        reopened = TokenDB(str(self.path))
+        self.addCleanup(reopened.close)
+
+        self.assertEqual(
+            reopened.get_account("user_a")["expires_at"], int(EXPIRES_AT.timestamp())
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
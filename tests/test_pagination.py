@@ -0,0 +1,120 @@
+"""
+Cursor de auto-paginación (mcp_server/src/pagination.py): ida y vuelta,
+cursores inválidos y validación de los filtros con que se creó.
+
+    python -m pytest tests   (o python -m unittest discover tests)
+"""
+
+import base64
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "mcp_server"))
+
+from src.pagination import (  # noqa: E402
+    DEFAULT_MAX_RECORDS,
+    MAX_PER_PAGE,
+    PageCursor,
+    PaginationOptions,
+    filters_digest,
+)
+
+
+def raw_cursor(values) -> str:
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+class TestPageCursor(unittest.TestCase):
+    def test_round_trip(self):
+        cursors = [
+            PageCursor(3, 50, 7),
+            PageCursor(1, 200, 0, filters="abc123"),
+            PageCursor(2, 200, 10, ("2024-01-01", "2024-03-31"), filters="abc123"),
+            PageCursor(
+                4,
+                100,
+                0,
+                ("2024-01-01", "2024-03-31"),
+                ("2024-01-01", "2024-12-31", "D"),
+                "abc123",
+            ),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                encoded = cursor.encode()
+                self.assertNotIn("=", encoded)
+                self.assertEqual(PageCursor.decode(encoded), cursor)
+
+    def test_invalid_cursors(self):
+        invalid = [
+            "not a cursor!",
+            raw_cursor({"page": 1}),
+            raw_cursor(5),
+            raw_cursor([1]),
+            raw_cursor([0, 200, 0]),  # página < 1
+            raw_cursor([1, MAX_PER_PAGE + 1, 0]),
+            raw_cursor([1, 50, 50]),  # skip fuera de la página
+            raw_cursor([1, 50, 0, "", "2024-01-01"]),  # tramo incompleto
+            raw_cursor([1, 50, 0, "", "2024-01-01", "2024-01-31", "a", "b", "X"]),
+        ]
+        for cursor in invalid:
+            with self.subTest(cursor=cursor):
+                with self.assertRaisesRegex(ValueError, "Invalid cursor"):
+                    PageCursor.decode(cursor)
+
+    def test_advance(self):
+        cursor = PageCursor(2, 50, 10, filters="abc123")
+
+        self.assertEqual(cursor.advance(30), PageCursor(2, 50, 40, filters="abc123"))
+        self.assertEqual(cursor.advance(40), PageCursor(3, 50, 0, filters="abc123"))
+        self.assertEqual(cursor.advance(145), PageCursor(5, 50, 5, filters="abc123"))
+
+
+class TestPaginationOptions(unittest.TestCase):
+    def test_without_auto_paginate(self):
+        params = {"status": "paid", "max_records": "10"}
+
+        self.assertIsNone(PaginationOptions.pop_from(params))
+        self.assertEqual(params, {"status": "paid"})
+
+    def test_pops_pagination_params(self):
+        params = {"status": "paid", "auto_paginate": "true", "page": "3"}
+        options = PaginationOptions.pop_from(params)
+
+        self.assertEqual(params, {"status": "paid"})
+        self.assertEqual(options.start.page, 3)
+        self.assertEqual(options.start.per_page, MAX_PER_PAGE)
+        self.assertEqual(options.start.filters, filters_digest({"status": "paid"}))
+        self.assertEqual(options.max_records, DEFAULT_MAX_RECORDS)
+
+    def test_cursor_with_same_filters(self):
+        first = PaginationOptions.pop_from({"status": "paid", "auto_paginate": "1"})
+        cursor = first.start.advance(250).encode()
+
+        params = {"status": "paid", "cursor": cursor}
+        options = PaginationOptions.pop_from(params)
+
+        self.assertEqual(options.start, first.start.advance(250))
+        self.assertEqual(params, {"status": "paid"})
+
+    def test_cursor_with_different_filters(self):
+        first = PaginationOptions.pop_from({"status": "paid", "auto_paginate": "1"})
+        cursor = first.start.encode()
+
+        for params in ({"status": "draft"}, {}, {"status": "paid", "search_text": "x"}):
+            with self.subTest(params=params):
+                with self.assertRaisesRegex(ValueError, "different filters"):
+                    PaginationOptions.pop_from({**params, "cursor": cursor})
+
+    def test_invalid_limits(self):
+        for params in ({"max_records": "0"}, {"max_bytes": "lots"}):
+            with self.subTest(params=params):
+                with self.assertRaises(ValueError):
+                    PaginationOptions.pop_from({**params, "auto_paginate": "true"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+"""
+RedisTokenStore contra fakeredis: transacciones WATCH/MULTI (también con
+escrituras concurrentes entre la lectura y el EXEC) y notificaciones.
+
+    python -m pytest tests   (o python -m unittest discover tests)
+"""
+
+import time
+import unittest
+
+import fakeredis
+
+from shared.redis_store import RedisTokenStore
+
+
+def account(organization_id: str, expires_at: int = 2_000_000_000, **extra) -> dict:
+    return {
+        "access_token": f"access_{organization_id}",
+        "refresh_token": f"refresh_{organization_id}",
+        "organization_id": organization_id,
+        "api_domain": "https://www.zohoapis.com",
+        "region": "com",
+        "expires_at": expires_at,
+        "email": f"{organization_id}@example.com",
+        "company_name": f"Company {organization_id}",
+        **extra,
+    }
+
+
+class RedisStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.store = self.make_store()
+
+    def tearDown(self):
+        self.store.close()
+
+    def make_store(self) -> RedisTokenStore:
+        return RedisTokenStore(
+            fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        )
+
+    def other_client(self) -> fakeredis.FakeRedis:
+        """Conexión de "otra réplica" al mismo servidor"""
+        return fakeredis.FakeRedis(server=self.server, decode_responses=True)
+
+    def interfere(self, write) -> list:
+        """
+        Ejecuta `write` (desde otra conexión) dentro de la primera pasada de la
+        próxima transacción, después de sus lecturas con WATCH y antes del
+        EXEC. Devuelve la lista de pasadas de la transacción.
+        """
+        client = self.store._client
+        original = client.transaction
+        attempts = []
+
+        def transaction(func, *watches, **kwargs):
+            def wrapped(pipe):
+                attempts.append(len(attempts) + 1)
+                if len(attempts) == 1:
+                    # Las lecturas de func van antes de pipe.multi()
+                    multi = pipe.multi
+
+                    def interfered_multi():
+                        pipe.multi = multi  # el pipe se reutiliza al reintentar
+                        write(self.other_client())
+                        multi()
+
+                    pipe.multi = interfered_multi
+                return func(pipe)
+
+            return original(wrapped, *watches, **kwargs)
+
+        client.transaction = transaction
+        self.addCleanup(setattr, client, "transaction", original)
+        return attempts
+
+    def active_ids(self) -> list:
+        return [a["user_id"] for a in self.store.list_accounts() if a["is_active"] == 1]
+
+
+class TestSaveUser(RedisStoreTestCase):
+    def test_first_account_becomes_active(self):
+        self.store.save_user("a", account("org_a"))
+        self.store.save_user("b", account("org_b"))
+
+        self.assertEqual(self.store.get_active_account()["user_id"], "a")
+        self.assertEqual(self.active_ids(), ["a"])
+        self.assertEqual(self.store.find_by_organization("org_b")["user_id"], "b")
+
+    def test_resave_keeps_connected_at_and_moves_organization(self):
+        self.store.save_user("a", account("org_a", connected_at=100))
+        self.store.save_user("a", account("org_new", connected_at=200))
+
+        saved = self.store.get_account("a")
+        self.assertEqual(saved["connected_at"], 100)
+        self.assertIsNone(self.store.find_by_organization("org_a"))
+        self.assertEqual(self.store.find_by_organization("org_new")["user_id"], "a")
+
+    def test_concurrent_activation_is_retried(self):
+        self.store.save_user("a", account("org_a"))
+        self.store.soft_delete("a")
+
+        # Otra réplica deja activa "c" entre la lectura de `active` y el EXEC
+        def write(client):
+            client.hset(self.store._account_key("c"), mapping={"is_active": 1})
+            client.set(self.store._key("active"), "c")
+
+        attempts = self.interfere(write)
+        self.store.save_user("b", account("org_b"))
+
+        self.assertEqual(attempts, [1, 2])
+        self.assertEqual(self.store.get_account("b")["is_active"], 0)
+        self.assertEqual(self.other_client().get(self.store._key("active")), "c")
+
+
+class TestSaveAndActivate(RedisStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store.save_user("a", account("org_a"))
+
+    def test_new_account_becomes_the_only_active(self):
+        self.store.save_and_activate("b", account("org_b"))
+
+        self.assertEqual(self.active_ids(), ["b"])
+        self.assertEqual(self.store.get_active_account()["user_id"], "b")
+
+    def test_single_transaction(self):
+        # Si la activación fuera una segunda transacción, este cambio entre
+        # la lectura y el EXEC no forzaría un reintento del guardado
+        def write(client):
+            client.hset(self.store._account_key("a"), "is_active", -1)
+            client.delete(self.store._key("active"))
+
+        attempts = self.interfere(write)
+        self.store.save_and_activate("b", account("org_b"))
+
+        self.assertEqual(attempts, [1, 2])
+        self.assertEqual(self.store.get_active_account()["user_id"], "b")
+        self.assertEqual(self.store._read("a")["is_active"], -1)
+
+
+class TestUpdateTokens(RedisStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store.save_user("a", account("org_a", expires_at=1000))
+
+    def test_compare_and_set(self):
+        self.assertFalse(self.store.update_tokens("a", "stale", 3000, 999))
+        self.assertEqual(self.store.get_account("a")["access_token"], "access_org_a")
+
+        self.assertTrue(self.store.update_tokens("a", "fresh", 2000, 1000))
+        saved = self.store.get_account("a")
+        self.assertEqual((saved["access_token"], saved["expires_at"]), ("fresh", 2000))
+        self.assertEqual(self.store.list_expirations()[0]["expires_at"], 2000)
+
+    def test_does_not_touch_last_used(self):
+        self.store.update_tokens("a", "fresh", 2000)
+        self.assertIsNone(self.store.get_account("a")["last_used"])
+
+    def test_unknown_account(self):
+        self.assertFalse(self.store.update_tokens("missing", "token", 2000))
+        self.assertFalse(self.other_client().exists(self.store._account_key("missing")))
+
+    def test_deleted_account_stays_out_of_expirations(self):
+        self.store.soft_delete("a")
+        self.assertTrue(self.store.update_tokens("a", "fresh", 2000))
+        self.assertEqual(self.store.list_expirations(), [])
+
+    def test_concurrent_refresh_wins(self):
+        # Otra réplica guarda su token entre la lectura de expires_at y el EXEC
+        def write(client):
+            client.hset(
+                self.store._account_key("a"),
+                mapping={"access_token": "other", "expires_at": 1500},
+            )
+
+        attempts = self.interfere(write)
+        stored = self.store.update_tokens("a", "mine", 2000, expected_expires_at=1000)
+
+        self.assertEqual(attempts, [1, 2])
+        self.assertFalse(stored)
+        self.assertEqual(self.store.get_account("a")["access_token"], "other")
+
+
+class TestActivate(RedisStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store.save_user("a", account("org_a"))
+        self.store.save_user("b", account("org_b"))
+
+    def test_single_active_account(self):
+        self.assertTrue(self.store.activate("b"))
+        self.assertEqual(self.active_ids(), ["b"])
+        self.assertEqual(self.store.get_active_account()["user_id"], "b")
+
+    def test_unknown_or_deleted(self):
+        self.store.soft_delete("b")
+        self.assertFalse(self.store.activate("b"))
+        self.assertFalse(self.store.activate("missing"))
+        self.assertEqual(self.active_ids(), ["a"])
+
+    def test_concurrent_delete_is_seen_on_retry(self):
+        def write(client):
+            client.hset(self.store._account_key("b"), "is_active", -1)
+
+        attempts = self.interfere(write)
+
+        self.assertFalse(self.store.activate("b"))
+        self.assertEqual(attempts, [1, 2])
+        self.assertEqual(self.active_ids(), ["a"])
+
+
+class TestSoftDelete(RedisStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store.save_user("a", account("org_a"))
+        self.store.save_user("b", account("org_b"))
+
+    def test_delete_active_account(self):
+        self.assertTrue(self.store.soft_delete("a"))
+
+        self.assertIsNone(self.store.get_active_account())
+        self.assertIsNone(self.store.get_account("a"))
+        self.assertIsNone(self.store.find_by_organization("org_a"))
+        self.assertEqual([a["user_id"] for a in self.store.list_expirations()], ["b"])
+        self.assertFalse(self.store.soft_delete("a"))
+
+    def test_concurrent_activation_is_seen_on_retry(self):
+        # "b" pasa a ser la activa justo antes del EXEC: el reintento la
+        # ve y borra también la clave `active`
+        def write(client):
+            client.hset(self.store._account_key("a"), "is_active", 0)
+            client.hset(self.store._account_key("b"), "is_active", 1)
+            client.set(self.store._key("active"), "b")
+
+        attempts = self.interfere(write)
+
+        self.assertTrue(self.store.soft_delete("b"))
+        self.assertEqual(attempts, [1, 2])
+        self.assertIsNone(self.other_client().get(self.store._key("active")))
+
+
+class TestNotifications(RedisStoreTestCase):
+    def wait_for(self, events: list, count: int) -> None:
+        deadline = time.time() + 5
+        while len(events) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_local_token_events_can_be_ignored(self):
+        replica = self.make_store()
+        self.addCleanup(replica.close)
+        events = []
+        self.store.subscribe(
+            lambda event, user_id: events.append((event, user_id)),
+            ignore_local=("tokens",),
+        )
+
+        self.store.save_user("a", account("org_a", expires_at=1000))
+        self.wait_for(events, 1)
+        self.store.update_tokens("a", "own", 2000)  # propio: se ignora
+        replica.update_tokens("a", "remote", 3000)  # otra réplica
+        self.wait_for(events, 2)
+        time.sleep(0.1)
+
+        self.assertEqual(events, [("save", "a"), ("tokens", "a")])
+
+
+if __name__ == "__main__":
+    unittest.main()
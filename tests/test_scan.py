@@ -0,0 +1,144 @@
+"""
+Scan por tramos de fechas (mcp_server/src/scan.py) contra un listado falso
+de Zoho: registros leídos por tramo y continuación desde el cursor.
+
+    python -m pytest tests   (o python -m unittest discover tests)
+"""
+
+import asyncio
+import sys
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "mcp_server"))
+
+from src.pagination import PageCursor, PaginationOptions  # noqa: E402
+from src.scan import plan_scan, scan_pages  # noqa: E402
+
+START = date(2024, 1, 1)
+# Dos facturas por día durante 2024
+INVOICES = [
+    {"invoice_id": f"{day:03d}-{n}", "date": (START + timedelta(days=day)).isoformat()}
+    for day in range(366)
+    for n in range(2)
+]
+
+
+class FakeZoho:
+    """GET /invoices con date_start / date_end / sort_order y paginación"""
+
+    def __init__(self):
+        self.served = 0
+
+    async def fetch_page(self, params: dict, page: int, per_page: int):
+        await asyncio.sleep(0)  # los tramos se intercalan como con Zoho real
+        records = [
+            invoice
+            for invoice in INVOICES
+            if params["date_start"] <= invoice["date"] <= params["date_end"]
+        ]
+        if params["sort_order"] == "D":
+            records.reverse()
+        chunk = records[(page - 1) * per_page : page * per_page]
+        self.served += len(chunk)
+        return httpx.Response(
+            200,
+            json={
+                "code": 0,
+                "invoices": chunk,
+                "page_context": {"has_more_page": page * per_page < len(records)},
+            },
+            request=httpx.Request("GET", "https://zoho.test/invoices"),
+        )
+
+
+def scan(zoho: FakeZoho, params: dict, shards: int = 4) -> dict:
+    params = dict(params)
+    options = PaginationOptions.pop_from(params)
+    plan = plan_scan(params, options, shards)
+    response = asyncio.run(scan_pages(zoho.fetch_page, options, plan, progress=None))
+    return response.json()
+
+
+class TestShardLimits(unittest.TestCase):
+    def test_shards_share_max_records(self):
+        zoho = FakeZoho()
+        result = scan(
+            zoho,
+            {
+                "auto_paginate": "true",
+                "date_start": "2024-01-01",
+                "date_end": "2024-12-31",
+                "per_page": "20",
+                "max_records": "100",
+            },
+        )
+
+        ids = [invoice["invoice_id"] for invoice in result["invoices"]]
+        self.assertEqual(ids, [invoice["invoice_id"] for invoice in INVOICES[:100]])
+        self.assertEqual(result["page_context"]["stopped_by"], "max_records")
+        # Sin el límite compartido cada tramo leía max_records (4 × 100)
+        self.assertLess(zoho.served, 4 * 100)
+
+
+class TestResumeFromCursor(unittest.TestCase):
+    def resume_all(self, sort_order: str, shards: int) -> list:
+        zoho = FakeZoho()
+        result = scan(
+            zoho,
+            {
+                "auto_paginate": "true",
+                "date_start": "2024-03-01",
+                "date_end": "2024-04-30",
+                "sort_order": sort_order,
+                "max_records": "45",
+            },
+        )
+        ids = [invoice["invoice_id"] for invoice in result["invoices"]]
+        cursor = result["page_context"]["next_cursor"]
+        while cursor:
+            self.assertIsNotNone(PageCursor.decode(cursor).scan)
+            # Solo el cursor: el rango y el orden viajan dentro
+            result = scan(zoho, {"cursor": cursor, "max_records": "45"}, shards)
+            ids += [invoice["invoice_id"] for invoice in result["invoices"]]
+            cursor = result["page_context"]["next_cursor"]
+        return ids
+
+    def expected(self, descending: bool) -> list:
+        ids = [
+            invoice["invoice_id"]
+            for invoice in INVOICES
+            if "2024-03-01" <= invoice["date"] <= "2024-04-30"
+        ]
+        return ids[::-1] if descending else ids
+
+    def test_ascending(self):
+        self.assertEqual(self.resume_all("A", shards=4), self.expected(False))
+
+    def test_descending(self):
+        self.assertEqual(self.resume_all("D", shards=4), self.expected(True))
+
+    def test_resume_without_sharding(self):
+        # El cursor de un scan sigue el scan aunque la réplica tenga SCAN_SHARDS=1
+        self.assertEqual(self.resume_all("A", shards=1), self.expected(False))
+
+    def test_cursor_with_other_range_is_rejected(self):
+        result = scan(
+            FakeZoho(),
+            {
+                "auto_paginate": "true",
+                "date_start": "2024-03-01",
+                "date_end": "2024-04-30",
+                "max_records": "10",
+            },
+        )
+        cursor = result["page_context"]["next_cursor"]
+        with self.assertRaisesRegex(ValueError, "date_end"):
+            scan(FakeZoho(), {"cursor": cursor, "date_end": "2024-05-31"})
+
+
+if __name__ == "__main__":
+    unittest.main()
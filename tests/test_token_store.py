@@ -0,0 +1,152 @@
+"""
+Contrato de TokenStore: TokenDB (SQLite) y RedisTokenStore (fakeredis)
+deben comportarse igual con las mismas llamadas.
+
+    python -m pytest tests   (o python -m unittest discover tests)
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import fakeredis
+
+from shared.redis_store import RedisTokenStore
+from shared.token_db import TokenDB
+from shared.token_store import TokenStore
+
+
+def account(organization_id: str, connected_at: int = 100, **extra) -> dict:
+    return {
+        "access_token": f"access_{organization_id}",
+        "refresh_token": f"refresh_{organization_id}",
+        "organization_id": organization_id,
+        "api_domain": "https://www.zohoapis.com",
+        "region": "com",
+        "expires_at": 2_000_000_000,
+        "connected_at": connected_at,
+        "email": f"{organization_id}@example.com",
+        "company_name": f"Company {organization_id}",
+        **extra,
+    }
+
+
+class StoreContract:
+    """Casos comunes; cada subclase crea su backend en make_store()"""
+
+    def make_store(self) -> TokenStore:
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+        self.addCleanup(self.store.close)
+
+    def active_ids(self) -> list:
+        return [a["user_id"] for a in self.store.list_accounts() if a["is_active"] == 1]
+
+    def test_save_user_activates_only_without_another_active(self):
+        self.store.save_user("a", account("org_a"))
+        self.store.save_user("b", account("org_b"))
+        self.store.save_user("b", account("org_b"))  # re-guardar no la activa
+        self.store.save_user("a", account("org_a"))  # la activa sigue activa
+
+        self.assertEqual(self.active_ids(), ["a"])
+        self.assertEqual(self.store.get_active_account()["user_id"], "a")
+
+    def test_save_user_activates_when_none_is_active(self):
+        self.store.save_user("a", account("org_a"))
+        self.store.save_user("b", account("org_b"))
+        self.store.soft_delete("a")
+        self.store.save_user("b", account("org_b"))
+
+        self.assertEqual(self.active_ids(), ["b"])
+
+    def test_save_user_restores_deleted_account(self):
+        self.store.save_user("a", account("org_a"))
+        self.store.save_user("b", account("org_b"))
+        self.store.soft_delete("b")
+        self.store.save_user("b", account("org_b"))
+
+        self.assertEqual(self.store.get_account("b")["is_active"], 0)
+        self.assertEqual(self.active_ids(), ["a"])
+
+    def test_save_and_activate_takes_over(self):
+        self.store.save_user("a", account("org_a"))
+        self.store.save_and_activate("b", account("org_b"))
+
+        self.assertEqual(self.active_ids(), ["b"])
+        self.assertEqual(self.store.get_active_account()["user_id"], "b")
+
+    def test_list_accounts_order(self):
+        self.store.save_user("a", account("org_a", connected_at=300))
+        for user_id in ("b", "c", "d", "e"):
+            self.store.save_user(user_id, account(f"org_{user_id}", connected_at=200))
+        self.store.touch("c")
+        self.store.flush_last_used()
+        self.store.activate("e")
+
+        # activa, último uso, conexión y user_id (desempate) descendentes
+        self.assertEqual(
+            [a["user_id"] for a in self.store.list_accounts()],
+            ["e", "c", "a", "d", "b"],
+        )
+
+    def walk_pages(self, limit: int, between_pages=None) -> list:
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = self.store.page_accounts(limit, cursor)
+            seen += [a["user_id"] for a in page["accounts"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                return seen
+            pages += 1
+            if between_pages:
+                between_pages(pages)
+
+    def page_all(self) -> list:
+        return self.store.page_accounts(100)["accounts"]
+
+    def test_page_accounts_walks_every_account_once(self):
+        self.store.save_user("a", account("org_a"))
+        for n in range(11):
+            # Empates en connected_at: el user_id desempata
+            self.store.save_user(f"u{n:02d}", account(f"org_{n}", connected_at=n // 3))
+
+        seen = self.walk_pages(limit=4)
+
+        self.assertEqual(seen[0], "a")
+        self.assertEqual(seen, [a["user_id"] for a in self.page_all()])
+        self.assertEqual(len(seen), 12)
+
+    def test_page_accounts_continuity_with_inserts(self):
+        for n in range(10):
+            self.store.save_user(f"u{n:02d}", account(f"org_{n}", connected_at=100 + n))
+        existing = {a["user_id"] for a in self.store.list_accounts()}
+
+        def insert(pages: int) -> None:
+            # Una más nueva (queda antes del cursor) y una más vieja (después)
+            self.store.save_user(f"new{pages}", account(f"org_new{pages}", 1000))
+            self.store.save_user(f"old{pages}", account(f"org_old{pages}", pages))
+
+        seen = self.walk_pages(limit=3, between_pages=insert)
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertLessEqual(existing, set(seen))
+        self.assertFalse([user_id for user_id in seen if user_id.startswith("new")])
+        self.assertTrue([user_id for user_id in seen if user_id.startswith("old")])
+
+
+class TestTokenDB(StoreContract, unittest.TestCase):
+    def make_store(self) -> TokenStore:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return TokenDB(str(Path(directory.name) / "tokens.db"))
+
+
+class TestRedisTokenStore(StoreContract, unittest.TestCase):
+    def make_store(self) -> TokenStore:
+        return RedisTokenStore(fakeredis.FakeRedis(decode_responses=True))
+
+
+if __name__ == "__main__":
+    unittest.main()